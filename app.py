@@ -3,11 +3,19 @@ Dashboard de Consertos - Aplicação Principal
 Arquitetura Multi-Página com Navegação
 """
 
-from dash import Dash, html, page_container, dcc, Input, Output, callback
+import sys
+
+from dash import Dash, html, page_container, dcc, Input, Output, ALL, clientside_callback, ClientsideFunction
 import dash_bootstrap_components as dbc
+from flask import Response, jsonify
+
+import cache_callbacks
+import data
+import metricas
+from config import MONITORAMENTO_ATIVO
 
 from components.sidebar import criar_sidebar
-from components.filtros import criar_filtros_consertos, criar_filtros_novo_dashboard, criar_filtros_atividades
+from components.filtros import criar_paineis_filtros
 
 # =====================================================================
 # INICIALIZAÇÃO DA APLICAÇÃO
@@ -22,34 +30,65 @@ app = Dash(
 
 server = app.server
 
+# Tempo da requisição e tamanho da resposta de cada callback (rota /metrics)
+metricas.instalar(server)
+
+# Recarga a quente da planilha (cada worker verifica o arquivo periodicamente)
+if MONITORAMENTO_ATIVO:
+    data.iniciar_monitoramento()
+
+# O cliente Supabase (supabase_service/espelho_atividades) só é importado no
+# primeiro uso de /atividades: as páginas de consertos não pagam esse custo
+
+
+@server.route("/metrics/cache")
+def metricas_cache():
+    """Contadores de hit/miss dos caches de callbacks e idade/falhas dos dados do Supabase"""
+    supabase_service = sys.modules.get("supabase_service")
+    espelho_atividades = sys.modules.get("espelho_atividades")
+    return jsonify({
+        **cache_callbacks.estatisticas(),
+        "tabelas_supabase": supabase_service.estatisticas_cache_tabelas() if supabase_service else None,
+        "coalescencia_supabase": supabase_service.estatisticas_concorrencia() if supabase_service else None,
+        "espelho_atividades": espelho_atividades.estatisticas() if espelho_atividades else None,
+    })
+
+
+@server.route("/metrics")
+def metricas_prometheus():
+    """Percentis das etapas dos callbacks, tamanho das respostas e contadores dos caches (Prometheus)"""
+    return Response(
+        metricas.texto_prometheus(caches=cache_callbacks.estatisticas()),
+        mimetype="text/plain; version=0.0.4"
+    )
+
 # =====================================================================
 # LAYOUT PRINCIPAL
 # =====================================================================
 
-app.layout = html.Div([
-    dcc.Location(id="url", refresh=False),  # Rastreamento de URL para filtros dinâmicos
-    criar_sidebar(),
-    page_container  # Container que renderiza as páginas registradas
-])
+def layout():
+    # Função: a cada carga da página os painéis de filtros refletem a versão atual dos dados
+    return html.Div([
+        dcc.Location(id="url", refresh=False),  # Rastreamento de URL para filtros dinâmicos
+        criar_sidebar(criar_paineis_filtros()),
+        page_container  # Container que renderiza as páginas registradas
+    ])
+
+
+app.layout = layout
 
 
 # =====================================================================
-# CALLBACK GLOBAL PARA ATUALIZAR FILTROS NA SIDEBAR
+# CALLBACK GLOBAL PARA ALTERNAR OS FILTROS NA SIDEBAR
 # =====================================================================
 
-@callback(
-    Output("filtros-container", "children"),
+# Os painéis de todas as páginas já estão no layout: o navegador só mostra o
+# da página atual (assets/interface.js), sem requisição ao servidor
+clientside_callback(
+    ClientsideFunction(namespace="interface", function_name="alternarFiltros"),
+    Output({"type": "filtros-painel", "pagina": ALL}, "style"),
     Input("url", "pathname")
 )
-def atualizar_filtros_sidebar(pathname):
-    """Atualiza os filtros na sidebar quando muda de página"""
-    if pathname == "/" or pathname is None:
-        return criar_filtros_consertos()
-    elif pathname == "/novo":
-        return criar_filtros_novo_dashboard()
-    elif pathname == "/atividades":
-        return criar_filtros_atividades()
-    return html.Div()
 
 
 # =====================================================================
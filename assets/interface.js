@@ -0,0 +1,25 @@
+/*
+ * Callbacks clientside (só interface, sem ida ao servidor)
+ * Registrados em Python com ClientsideFunction("interface", <nome>).
+ */
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    interface: {
+        /* Copia o modelo clicado no gráfico de modelos para a busca */
+        selecionarModelo: function (clickData) {
+            if (!clickData || !clickData.points || !clickData.points.length) {
+                return window.dash_clientside.no_update;
+            }
+            return clickData.points[0].y;
+        },
+
+        /* Mostra só o painel de filtros da página atual (os painéis já vêm renderizados) */
+        alternarFiltros: function (pathname) {
+            var caminho = pathname || "/";
+            var saidas = window.dash_clientside.callback_context.outputs_list;
+            return saidas.map(function (saida) {
+                return {display: saida.id.pagina === caminho ? "block" : "none"};
+            });
+        }
+    }
+});
@@ -0,0 +1,400 @@
+"""
+Benchmark dos callbacks dos dashboards com dados sintéticos (sem rede)
+
+Gera planilhas sintéticas com o mesmo esquema da planilha de consertos
+(10 mil, 100 mil e 1 milhão de linhas por padrão), processadas por
+data.processar_dados, e listas sintéticas de time_records servidas por um
+espelho SQLite local. Mede os callbacks de Consertos, Consertos Internos e
+Atividades sobre uma matriz de combinações de filtros e relata p50/p95/p99
+e o pico de memória. Os resultados podem ser gravados como linha de base e
+comparados nas execuções seguintes (sai com código 1 se houver regressão).
+
+Os callbacks rodam sem o cache de saídas (memoizar_callback) e sem as
+métricas: cada chamada mede o cálculo completo.
+
+Uso:
+    python benchmark_callbacks.py [--tamanhos 10000 100000] [--combinacoes 40]
+                                  [--repeticoes 3] [--salvar] [--tolerancia 0.25]
+"""
+
+import argparse
+import inspect
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS do processo
+    resource = None
+
+import app  # noqa: F401 (registra as páginas no Dash)
+import data
+import espelho_atividades
+import pages.dashboard_consertos as consertos
+import pages.dashboard_novo as novo
+import pages.dashboard_atividades as atividades
+from components.tabelas import pagina_tabela
+from config import TABELA_LINHAS_POR_PAGINA
+
+LINHA_BASE_PADRAO = "benchmark_callbacks_linha_base.json"
+QUANTIS = (50, 95, 99)
+
+MARCAS = ["rossi", "kwc", "cyma", "gamo", "crosman", "beeman", "umarex", "taurus", "cbc", "qgk"]
+CATEGORIAS = ["pistola airsoft co2", "rifle airsoft elétrico", "carabina airgun mola", "pistola airgun co2",
+              "carabina pcp", "revolver co2", "rifle airsoft gbb", "pistola airsoft spring",
+              "carabina airgun gas ram", "acessório"]
+TIPOS_DEFEITO = ["nao arma / engatilha", "problema no mecanismo do gatilho", "vazamento de gás",
+                 "perda de pressão", "mola quebrada", "cano empenado", "trava de segurança",
+                 "carregador não alimenta", "gearbox travada", "motor não gira"]
+CALIBRES = ["4,5 MM", "5,5 MM", "6,0 MM", "6,35 MM"]
+FUNCOES = ["Montagem", "Desmontagem", "Teste", "Limpeza", "Orçamento", "Embalagem",
+           "Diagnóstico", "Troca de peças", "Lubrificação", "Regulagem", "Atendimento", "Estoque"]
+
+
+# =====================================================================
+# DADOS SINTÉTICOS
+# =====================================================================
+
+def gerar_planilha(linhas, seed=0):
+    """
+    Gera uma planilha bruta de consertos (mesmas colunas e formatos da real)
+
+    Os valores de texto vêm em caixa variada e com espaços, como na
+    planilha, para exercitar a padronização de processar_dados.
+
+    Args:
+        linhas (int): Quantidade de linhas
+        seed (int): Semente do gerador
+
+    Returns:
+        pd.DataFrame: DataFrame bruto (antes de processar_dados)
+    """
+    rng = np.random.default_rng(seed)
+
+    # Modelos com marca e categoria fixas; popularidade em cauda longa (Zipf)
+    n_modelos = int(min(5000, max(500, linhas // 200)))
+    marca_modelo = rng.integers(len(MARCAS), size=n_modelos)
+    categoria_modelo = rng.integers(len(CATEGORIAS), size=n_modelos)
+    nomes_modelos = np.array([
+        f"{CATEGORIAS[c].split()[0]} {MARCAS[m]} modelo {i} {CALIBRES[i % len(CALIBRES)].lower()}"
+        for i, (m, c) in enumerate(zip(marca_modelo, categoria_modelo))
+    ], dtype=object)
+    modelo = np.minimum(rng.zipf(1.3, size=linhas) - 1, n_modelos - 1)
+
+    defeitos = np.array([f"{d} {i // len(TIPOS_DEFEITO)}" if i >= len(TIPOS_DEFEITO) else d
+                         for i, d in enumerate(TIPOS_DEFEITO * 6)], dtype=object)
+    n_clientes = int(min(20000, max(250, linhas // 80)))
+    nomes_clientes = np.array([f"cliente {i} ltda" for i in range(n_clientes)], dtype=object)
+    funcionarios = np.array([f"TECNICO {i:02d}" for i in range(15)], dtype=object)
+
+    # Saídas em dois anos completos; ~0,5% de datas inválidas (descartadas no processamento)
+    dias = pd.date_range("2024-01-01", "2025-12-31", freq="D")
+    datas = np.array(dias.strftime("%d/%m/%Y"), dtype=object)[rng.integers(len(dias), size=linhas)]
+    datas[rng.random(linhas) < 0.005] = "sem data"
+
+    interno = rng.random(linhas) < 0.3
+    nome = np.where(interno, funcionarios[rng.integers(len(funcionarios), size=linhas)],
+                    nomes_clientes[rng.integers(n_clientes, size=linhas)])
+
+    def com_ruido(valores):
+        # Parte dos textos em maiúsculas e com espaços sobrando
+        valores = valores.copy()
+        sujos = rng.random(len(valores)) < 0.2
+        valores[sujos] = np.array([f" {v.upper()} " for v in valores[sujos]], dtype=object)
+        return valores
+
+    protocolo_2 = rng.integers(10000, 99999, size=linhas).astype("float64")
+    protocolo_2[rng.random(linhas) < 0.85] = np.nan
+
+    return pd.DataFrame({
+        "Prot-1": np.arange(50000, 50000 + linhas),
+        "Prot-2": protocolo_2,
+        "Reincidencia": com_ruido(np.where(rng.random(linhas) < 0.08, "sim", "não").astype(object)),
+        "Descrição": com_ruido(nomes_modelos[modelo]),
+        "Categoria": com_ruido(np.array(CATEGORIAS, dtype=object)[categoria_modelo[modelo]]),
+        "Calibre": np.array(CALIBRES, dtype=object)[modelo % len(CALIBRES)],
+        "Marca": com_ruido(np.array(MARCAS, dtype=object)[marca_modelo[modelo]]),
+        "Defeito": com_ruido(defeitos[rng.integers(len(defeitos), size=linhas)]),
+        "Nro-Série": np.char.add("SN", rng.integers(10 ** 7, 10 ** 8, size=linhas).astype(str)).astype(object),
+        "Data-Inc": datas,
+        "Dt-Saida": datas,
+        "Dias": rng.integers(0, 400, size=linhas),
+        "Tipo": np.where(interno, "Interno", "Externo").astype(object),
+        "Garantia": np.where(rng.random(linhas) < 0.6, "sim", "não").astype(object),
+        "Func": rng.integers(1000, 130000, size=linhas),
+        "Nome": nome,
+        "Valor": rng.choice([0.0, 50.0, 75.0, 120.0, 150.0], size=linhas),
+        "Def Informado": np.array([f"relato {i}" for i in range(500)], dtype=object)[rng.integers(500, size=linhas)],
+    })
+
+
+def gerar_time_records(quantidade, seed=0):
+    """
+    Gera registros de time_records no formato do Supabase
+
+    Args:
+        quantidade (int): Quantidade de registros
+        seed (int): Semente do gerador
+
+    Returns:
+        list: Dicionários com id, employee_name, function_name, start_time e duration_ms
+    """
+    rng = np.random.default_rng(seed)
+    funcionarios = [f"Funcionário {i:02d}" for i in range(30)]
+    inicio = np.datetime64("2025-01-01T07:00")
+    minutos = rng.integers(0, 365 * 24 * 60, size=quantidade)
+    duracoes = rng.gamma(2.0, 20 * 60 * 1000, size=quantidade).round()
+    em_aberto = rng.random(quantidade) < 0.02
+    registros = []
+    for i in range(quantidade):
+        registros.append({
+            "id": i + 1,
+            "employee_name": funcionarios[rng.integers(len(funcionarios))],
+            "function_name": FUNCOES[rng.integers(len(FUNCOES))],
+            "start_time": str(inicio + np.timedelta64(int(minutos[i]), "m")) + ":00",
+            "duration_ms": None if em_aberto[i] else float(duracoes[i]),
+        })
+    return registros
+
+
+# =====================================================================
+# MATRIZ DE FILTROS
+# =====================================================================
+
+def _mais_frequentes(serie, quantidade):
+    return data.contar_valores(serie).index[:quantidade].tolist()
+
+
+def matriz_filtros(df, registros, combinacoes, seed=0):
+    """
+    Combinações de filtros de cada dashboard (amostra fixa pela semente)
+
+    Returns:
+        dict: Nome do dashboard -> lista de tuplas de argumentos do callback
+    """
+    ano = int(df["Ano"].max())
+    categorias = _mais_frequentes(df["Categoria"], 3)
+    busca = str(_mais_frequentes(df["Descrição"], 1)[0]).split()[1]
+    internos = df[df["Tipo"] == "Interno"]
+    funcionarios = _mais_frequentes(internos["Nome"], 3)
+    meses = [[], [3], [3, 4, 5]]
+
+    consertos_ = list(itertools.product(
+        [None, busca], ["all", ano], meses, [[], categorias[:1], categorias],
+        ["all", "Sim"], ["all", "Interno"]
+    ))
+    internos_ = list(itertools.product(
+        [None, busca], ["all", ano], meses, ["all", "Sim"],
+        [[], funcionarios[:1], funcionarios], [[], categorias[:1]]
+    ))
+    nomes = sorted({r["employee_name"] for r in registros})
+    periodos = [(None, None), ("2025-06-01", "2025-06-30"), ("2025-01-01", "2025-12-31")]
+    atividades_ = [
+        (f, fn, inicio, fim)
+        for f, fn, (inicio, fim) in itertools.product(
+            [[], nomes[:1], nomes[:5]], [[], FUNCOES[:1], FUNCOES[:4]], periodos
+        )
+    ]
+
+    sorteio = random.Random(seed)
+    amostra = lambda lista: sorteio.sample(lista, min(combinacoes, len(lista)))
+    return {"consertos": amostra(consertos_), "internos": amostra(internos_), "atividades": amostra(atividades_)}
+
+
+# =====================================================================
+# CALLBACKS
+# =====================================================================
+
+# Funções originais, sem memoizar_callback e sem medir_callback
+_ORIGINAIS = {
+    "consertos_kpis": inspect.unwrap(consertos.atualizar_kpis),
+    "consertos_evolucao": inspect.unwrap(consertos.atualizar_evolucao),
+    "consertos_modelos": inspect.unwrap(consertos.atualizar_modelos),
+    "consertos_secundarios": inspect.unwrap(consertos.atualizar_secundarios),
+}
+_INTERNO = inspect.unwrap(novo.update_dashboard_interno)
+_ATIVIDADES = inspect.unwrap(atividades.update_dashboard_atividades)
+
+
+def _pagina_consertos(args):
+    """Uma atualização da página de Consertos: os callbacks que disparam juntos com os filtros"""
+    # As fatias filtradas são compartilhadas só entre os callbacks da mesma atualização
+    for cache in (consertos._linhas_filtradas, consertos._ranking_modelos, consertos._contagem_defeitos):
+        cache.cache_clear()
+    tempos = {}
+    for nome, funcao in _ORIGINAIS.items():
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos[nome] = time.perf_counter() - inicio
+    # Tabela: mesmo cálculo do callback (que depende do contexto do Dash para saber o gatilho)
+    inicio = time.perf_counter()
+    pagina_tabela(consertos.contagem_defeitos(*args), 0, TABELA_LINHAS_POR_PAGINA)
+    tempos["consertos_tabela"] = time.perf_counter() - inicio
+    tempos["consertos"] = sum(tempos.values())
+    return tempos
+
+
+def _executar(dashboard, args):
+    if dashboard == "consertos":
+        return _pagina_consertos(args)
+    funcao = _INTERNO if dashboard == "internos" else _ATIVIDADES
+    inicio = time.perf_counter()
+    funcao(*args)
+    return {dashboard: time.perf_counter() - inicio}
+
+
+def _resumo(amostras):
+    percentis = np.percentile(amostras, QUANTIS) * 1000
+    resumo = {f"p{q}_ms": round(float(v), 3) for q, v in zip(QUANTIS, percentis)}
+    resumo["media_ms"] = round(statistics.fmean(amostras) * 1000, 3)
+    resumo["amostras"] = len(amostras)
+    return resumo
+
+
+def medir_tamanho(linhas, combinacoes, repeticoes, seed, pasta):
+    """
+    Gera os dados de um tamanho, publica e mede os três dashboards
+
+    Returns:
+        dict: Tempos de preparação, percentis por callback e pico de memória por dashboard
+    """
+    resultado = {}
+
+    inicio = time.perf_counter()
+    bruto = gerar_planilha(linhas, seed)
+    registros = gerar_time_records(max(1000, linhas // 4), seed)
+    resultado["geracao_s"] = round(time.perf_counter() - inicio, 3)
+
+    inicio = time.perf_counter()
+    df = data.processar_dados(bruto)
+    resultado["processamento_s"] = round(time.perf_counter() - inicio, 3)
+
+    inicio = time.perf_counter()
+    data.usar_dados(df, f"sintetico-{linhas}-{seed}-{time.time_ns()}")
+    espelho_atividades.carregar_offline(registros, os.path.join(pasta, f"atividades-{linhas}.sqlite"))
+    resultado["publicacao_s"] = round(time.perf_counter() - inicio, 3)
+    resultado["linhas"] = len(df)
+    resultado["time_records"] = len(registros)
+
+    matriz = matriz_filtros(df, registros, combinacoes, seed)
+    del bruto
+
+    # Aquecimento (imports tardios, templates, primeira conexão SQLite)
+    for dashboard, lista in matriz.items():
+        _executar(dashboard, lista[0])
+
+    amostras = {}
+    for _ in range(repeticoes):
+        for dashboard, lista in matriz.items():
+            for args in lista:
+                for nome, segundos in _executar(dashboard, args).items():
+                    amostras.setdefault(nome, []).append(segundos)
+    resultado["callbacks"] = {nome: _resumo(valores) for nome, valores in amostras.items()}
+
+    # Pico de memória numa passada separada (tracemalloc distorce os tempos)
+    resultado["pico_memoria_mb"] = {}
+    for dashboard, lista in matriz.items():
+        tracemalloc.start()
+        for args in lista:
+            _executar(dashboard, args)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultado["pico_memoria_mb"][dashboard] = round(pico / 2 ** 20, 2)
+    # tracemalloc não vê a memória do SQLite; o pico de RSS do processo (acumulado) cobre tudo
+    if resource is not None:
+        resultado["rss_maximo_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return resultado
+
+
+# =====================================================================
+# LINHA DE BASE
+# =====================================================================
+
+def comparar(atual, base, tolerancia):
+    """
+    Compara p50/p95 e pico de memória com a linha de base
+
+    Returns:
+        list: Descrições das regressões (vazia se nenhuma)
+    """
+    regressoes = []
+    for tamanho, medidas in atual["tamanhos"].items():
+        anterior = base.get("tamanhos", {}).get(tamanho)
+        if anterior is None:
+            continue
+        for nome, resumo in medidas["callbacks"].items():
+            for campo in ("p50_ms", "p95_ms"):
+                antes = anterior["callbacks"].get(nome, {}).get(campo)
+                if antes and resumo[campo] > antes * (1 + tolerancia):
+                    regressoes.append(f"{tamanho} linhas, {nome} {campo}: {antes:.2f} -> {resumo[campo]:.2f}")
+        for dashboard, pico in medidas["pico_memoria_mb"].items():
+            antes = anterior["pico_memoria_mb"].get(dashboard)
+            if antes and pico > antes * (1 + tolerancia):
+                regressoes.append(f"{tamanho} linhas, memória {dashboard}: {antes:.1f} MB -> {pico:.1f} MB")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--combinacoes", type=int, default=40, help="Combinações de filtros por dashboard")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--linha-base", default=LINHA_BASE_PADRAO, help="Arquivo JSON da linha de base")
+    parser.add_argument("--salvar", action="store_true", help="Grava o resultado como nova linha de base")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Piora relativa aceita (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    resultado = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "maquina": platform.node(),
+        "parametros": {"combinacoes": args.combinacoes, "repeticoes": args.repeticoes, "seed": args.seed},
+        "tamanhos": {},
+    }
+    with tempfile.TemporaryDirectory() as pasta:
+        for linhas in args.tamanhos:
+            medidas = medir_tamanho(linhas, args.combinacoes, args.repeticoes, args.seed, pasta)
+            resultado["tamanhos"][str(linhas)] = medidas
+            print(f"\n{linhas:,} linhas (processamento {medidas['processamento_s']:.2f}s, "
+                  f"{medidas['time_records']:,} time_records)")
+            print(f"{'callback':<24}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}")
+            for nome, resumo in medidas["callbacks"].items():
+                print(f"{nome:<24}{resumo['p50_ms']:>10.2f}{resumo['p95_ms']:>10.2f}{resumo['p99_ms']:>10.2f}")
+            print("pico de memória (MB): " + ", ".join(
+                f"{dashboard} {pico:.1f}" for dashboard, pico in medidas["pico_memoria_mb"].items()
+            ) + (f"; RSS máximo do processo {medidas['rss_maximo_mb']:.0f}" if "rss_maximo_mb" in medidas else ""))
+
+    regressoes = []
+    if os.path.exists(args.linha_base) and not args.salvar:
+        with open(args.linha_base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        if base.get("parametros") != resultado["parametros"]:
+            print("\nAviso: linha de base gravada com outros parâmetros; comparação pode não ser válida")
+        regressoes = comparar(resultado, base, args.tolerancia)
+        print(f"\nComparação com {args.linha_base} (tolerância {args.tolerancia:.0%}): "
+              f"{len(regressoes)} regressão(ões)")
+        for regressao in regressoes:
+            print(f"  {regressao}")
+
+    if args.salvar:
+        with open(args.linha_base, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+        print(f"\nLinha de base gravada em {args.linha_base}")
+
+    raise SystemExit(1 if regressoes else 0)
+
+
+if __name__ == "__main__":
+    main()
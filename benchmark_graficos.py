@@ -0,0 +1,124 @@
+"""
+Benchmark das figuras: Plotly Express x fábrica de figuras (components/graficos.py)
+
+Monta cada gráfico do dashboard de Consertos com os dados carregados, pelos
+dois caminhos, e mede o tempo de montagem + serialização JSON (o que o Dash
+faz a cada resposta). Também confere que os dois JSONs são idênticos.
+
+Uso:
+    python benchmark_graficos.py [--repeticoes 50]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import plotly.express as px
+from plotly.io.json import to_json_plotly
+
+from components import graficos
+from config import COLOR_SEQUENCE, COLOR_GRAPH_MAIN, COLOR_TEXT_TITLE
+from data import obter_dataset, contar_valores
+
+
+def _contagem(serie, nome, n=None):
+    df = contar_valores(serie)
+    df = (df.head(n) if n else df).reset_index()
+    df.columns = [nome, "Quantidade"]
+    return df
+
+
+def casos():
+    """Pares (px, fábrica) de funções que montam cada gráfico"""
+    dataset = obter_dataset()
+    df = dataset.df
+    df_chart = dataset.cubo.evolucao()
+    df_chart["Ano"] = df_chart["Ano"].astype(str)
+    df_modelos = _contagem(df["Descrição"], "Modelo", 50).sort_values("Quantidade", ascending=True)
+    df_cat = _contagem(df["Categoria"], "Categoria", 10).sort_values("Quantidade", ascending=True)
+    df_tipo = _contagem(df["Tipo"], "Tipo")
+    margem = dict(l=20, r=20, t=20, b=20)
+    fonte = {"color": COLOR_TEXT_TITLE}
+
+    def px_evolucao():
+        fig = px.bar(df_chart, x="Mes_nome", y="Quantidade", color="Ano", barmode="group",
+                     text_auto=True, template="plotly_white", color_discrete_sequence=COLOR_SEQUENCE)
+        fig.update_layout(xaxis={"title": ""}, yaxis={"title": "Qtd"},
+                          margin=dict(l=20, r=20, t=30, b=20), font=fonte)
+        return fig
+
+    def px_horizontal(dados, y, **layout):
+        fig = px.bar(dados, x="Quantidade", y=y, orientation="h", text="Quantidade", template="plotly_white")
+        fig.update_traces(marker_color=COLOR_GRAPH_MAIN, textposition="outside")
+        fig.update_layout(yaxis={"title": ""}, xaxis={"title": ""}, font=fonte, **layout)
+        return fig
+
+    def px_tipo():
+        fig = px.pie(df_tipo, values="Quantidade", names="Tipo", hole=0.6, template="plotly_white",
+                     color_discrete_sequence=COLOR_SEQUENCE)
+        fig.update_layout(margin=margem, showlegend=True, font=fonte)
+        return fig
+
+    altura = max(450, len(df_modelos) * 35)
+    return {
+        "evolução (barras agrupadas)": (
+            px_evolucao,
+            lambda: graficos.barras_agrupadas(
+                df_chart, x="Mes_nome", y="Quantidade", cor="Ano", cores=COLOR_SEQUENCE,
+                titulo_x="", titulo_y="Qtd", margem=dict(l=20, r=20, t=30, b=20), font=fonte
+            ),
+        ),
+        "top 50 modelos (horizontal)": (
+            lambda: px_horizontal(df_modelos, "Modelo", height=altura, autosize=True, bargap=0.2,
+                                  margin=dict(l=10, r=20, t=20, b=10)),
+            lambda: graficos.barras_horizontais(
+                df_modelos, x="Quantidade", y="Modelo", cor=COLOR_GRAPH_MAIN, titulo_x="", titulo_y="",
+                margem=dict(l=10, r=20, t=20, b=10), font=fonte, height=altura, autosize=True, bargap=0.2
+            ),
+        ),
+        "top 10 categorias (horizontal)": (
+            lambda: px_horizontal(df_cat, "Categoria", margin=margem),
+            lambda: graficos.barras_horizontais(
+                df_cat, x="Quantidade", y="Categoria", cor=COLOR_GRAPH_MAIN, titulo_x="", titulo_y="",
+                margem=margem, font=fonte
+            ),
+        ),
+        "tipo (rosca)": (
+            px_tipo,
+            lambda: graficos.rosca(
+                df_tipo["Tipo"], df_tipo["Quantidade"], nome_rotulo="Tipo", nome_valor="Quantidade",
+                hole=0.6, cores=COLOR_SEQUENCE, margem=margem, showlegend=True, font=fonte
+            ),
+        ),
+    }
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        to_json_plotly(funcao())
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    total_px = total_fabrica = 0.0
+    print(f"{'gráfico':<32}{'px (ms)':>10}{'fábrica (ms)':>14}{'ganho':>8}  JSON igual")
+    for nome, (com_px, com_fabrica) in casos().items():
+        igual = json.loads(to_json_plotly(com_px())) == json.loads(to_json_plotly(com_fabrica()))
+        t_px = medir(com_px, args.repeticoes)
+        t_fabrica = medir(com_fabrica, args.repeticoes)
+        total_px += t_px
+        total_fabrica += t_fabrica
+        print(f"{nome:<32}{t_px:>10.2f}{t_fabrica:>14.2f}{t_px / t_fabrica:>7.1f}x  {'sim' if igual else 'NÃO'}")
+    print(f"{'total por callback':<32}{total_px:>10.2f}{total_fabrica:>14.2f}{total_px / total_fabrica:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
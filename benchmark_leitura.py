@@ -0,0 +1,71 @@
+"""
+Benchmark da leitura da planilha: pd.read_excel (openpyxl) x leitor_xlsx
+
+Lê a planilha de consertos pelos caminhos antigo (read_excel com todas as
+colunas e conversão das datas depois) e novo (ler_xlsx só com as colunas
+usadas, datas convertidas na leitura), mede o tempo de cada um até o
+DataFrame processado e confere que os resultados são idênticos.
+
+Uso:
+    python benchmark_leitura.py [--repeticoes 5] [--arquivo "CONSERTOS 20242025.xlsx"]
+"""
+
+import argparse
+import statistics
+import time
+
+import pandas as pd
+
+from config import NOME_ARQUIVO_EXCEL
+from data import COLUNAS_LIDAS, processar_dados
+from leitor_xlsx import ler_xlsx
+
+
+def antes(arquivo):
+    return processar_dados(pd.read_excel(arquivo))
+
+
+def depois(arquivo):
+    return processar_dados(ler_xlsx(arquivo, COLUNAS_LIDAS, colunas_data=["Dt-Saida"]))
+
+
+def medir(funcao, arquivo, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(arquivo)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--arquivo", default=NOME_ARQUIVO_EXCEL)
+    args = parser.parse_args()
+
+    esperado = antes(args.arquivo)
+    obtido = depois(args.arquivo)
+    colunas = list(obtido.columns)
+    try:
+        pd.testing.assert_frame_equal(esperado[colunas], obtido)
+        igual = "sim"
+    except AssertionError as e:
+        igual = f"NÃO ({e})"
+
+    # Alternados para que a variação da máquina afete os dois caminhos
+    tempos_antes, tempos_depois = [], []
+    for _ in range(args.repeticoes):
+        tempos_antes.append(medir(antes, args.arquivo, 1))
+        tempos_depois.append(medir(depois, args.arquivo, 1))
+    t_antes = statistics.median(tempos_antes)
+    t_depois = statistics.median(tempos_depois)
+
+    print(f"{len(obtido):,} linhas, {len(colunas)} colunas")
+    print(f"{'read_excel + processar_dados':<36}{t_antes:>8.2f} s")
+    print(f"{'ler_xlsx + processar_dados':<36}{t_depois:>8.2f} s  ({t_antes / t_depois:.1f}x)")
+    print(f"DataFrame igual: {igual}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark do cliente Supabase: cliente novo por chamada x cliente único com pool
+
+Sobe um servidor HTTP local que imita o PostgREST (/rest/v1/<tabela>) com
+latência simulada de rede: o custo de abrir a conexão (TCP + TLS) é pago uma
+vez por conexão e o de ida e volta em toda requisição. Como o PostgREST, o
+servidor respeita o intervalo pedido (offset/limit ou cabeçalho Range) e
+devolve a contagem em Content-Range com `Prefer: count=exact`, então
+time_records é lido em várias páginas. Cada "callback" faz as três consultas
+da página de Atividades (employees, functions, time_records).
+
+Uso:
+    python benchmark_supabase.py [--callbacks 30] [--handshake-ms 60] [--rtt-ms 20]
+"""
+
+import argparse
+import json
+import statistics
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from supabase import create_client
+
+import supabase_service
+from supabase_config import SUPABASE_KEY
+
+TABELAS = {
+    "employees": [{"id": i, "name": f"Funcionário {i}"} for i in range(20)],
+    "functions": [{"id": i, "name": f"Função {i}"} for i in range(10)],
+    "time_records": [
+        {"id": i, "employee_name": f"Funcionário {i % 20}", "function_name": f"Função {i % 10}",
+         "start_time": "2025-01-01T08:00:00", "duration_ms": 3_600_000}
+        for i in range(2500)
+    ],
+}
+
+
+def _intervalo(parametros, cabecalho_range, quantidade):
+    """Fatia [inicio, fim) pedida por offset/limit ou pelo cabeçalho Range (items=a-b)"""
+    inicio, fim = 0, quantidade
+    encontrado = re.fullmatch(r"(?:items=)?(\d+)-(\d*)", (cabecalho_range or "").strip())
+    if encontrado:
+        inicio = int(encontrado.group(1))
+        fim = int(encontrado.group(2)) + 1 if encontrado.group(2) else quantidade
+    if "offset" in parametros:
+        inicio = int(parametros["offset"][0])
+    if "limit" in parametros:
+        fim = inicio + int(parametros["limit"][0])
+    return inicio, min(fim, quantidade)
+
+
+def criar_servidor(handshake, rtt):
+    """Servidor PostgREST falso com keep-alive (HTTP/1.1)"""
+    conexoes = {"abertas": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            conexoes["abertas"] += 1
+            time.sleep(handshake)
+
+        def do_GET(self):
+            time.sleep(rtt)
+            url = urlsplit(self.path)
+            linhas = TABELAS.get(url.path.rsplit("/", 1)[-1], [])
+            inicio, fim = _intervalo(parse_qs(url.query), self.headers.get("Range"), len(linhas))
+            pagina = linhas[inicio:fim]
+            corpo = json.dumps(pagina).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            total = len(linhas) if "count=exact" in (self.headers.get("Prefer") or "") else "*"
+            faixa = f"{inicio}-{inicio + len(pagina) - 1}" if pagina else "*"
+            self.send_header("Content-Range", f"{faixa}/{total}")
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, conexoes
+
+
+def simular_callback():
+    supabase_service.get_employees()
+    supabase_service.get_functions()
+    supabase_service.get_time_records()
+
+
+def medir(n):
+    tempos = []
+    for _ in range(n):
+        inicio = time.perf_counter()
+        simular_callback()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--callbacks", type=int, default=30)
+    parser.add_argument("--handshake-ms", type=float, default=60, help="Custo de abrir uma conexão (TCP + TLS)")
+    parser.add_argument("--rtt-ms", type=float, default=20, help="Ida e volta por requisição")
+    args = parser.parse_args()
+
+    servidor, conexoes = criar_servidor(args.handshake_ms / 1000, args.rtt_ms / 1000)
+    url = f"http://127.0.0.1:{servidor.server_address[1]}"
+    supabase_service.SUPABASE_URL = url
+
+    # Antes: um cliente (e um pool HTTP) novo a cada consulta
+    cliente_pooled = supabase_service.get_supabase_client
+    supabase_service.get_supabase_client = lambda: create_client(url, SUPABASE_KEY)
+    antes = medir(args.callbacks)
+    conexoes_antes = conexoes["abertas"]
+
+    # Depois: cliente único do processo com keep-alive
+    supabase_service.get_supabase_client = cliente_pooled
+    supabase_service.fechar_cliente()
+    conexoes["abertas"] = 0
+    depois = medir(args.callbacks)
+    conexoes_depois = conexoes["abertas"]
+
+    print(f"{args.callbacks} callbacks (3 consultas cada), handshake {args.handshake_ms:.0f} ms, "
+          f"rtt {args.rtt_ms:.0f} ms")
+    for nome, tempos, abertas in (("cliente por chamada", antes, conexoes_antes),
+                                  ("cliente único + pool", depois, conexoes_depois)):
+        print(f"  {nome:<22} mediana {statistics.median(tempos):7.1f} ms   "
+              f"p95 {sorted(tempos)[int(len(tempos) * 0.95) - 1]:7.1f} ms   conexões abertas {abertas}")
+    print(f"  economia por callback: {statistics.median(antes) - statistics.median(depois):.1f} ms (mediana)")
+
+    supabase_service.fechar_cliente()
+    servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Cache LRU das saídas dos callbacks do dashboard
+Guarda as saídas já serializadas, por combinação de filtros e versão dos dados
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+from plotly.io.json import to_json_plotly
+
+from cache_dados import escrever_atomico
+from metricas import etapa
+from config import PASTA_CACHE, CACHE_CALLBACKS_MAX_ITENS, CACHE_CALLBACKS_TTL, CACHE_CALLBACKS_DISCO
+
+# Caches registrados (expostos em /metrics/cache)
+CACHES = {}
+
+# Arquivos, dentro da pasta de cada versão, com o momento em que ela apareceu
+# e o momento em que foi substituída por uma versão mais nova
+ARQUIVO_MARCA = ".criado"
+ARQUIVO_DESCARTE = ".descartado"
+
+# Segundos que a pasta (vazia) de uma versão substituída é mantida
+RETENCAO_MARCA = 3600
+
+
+def normalizar_argumento(valor):
+    """
+    Normaliza o valor de um filtro para compor a chave do cache
+
+    Listas viram tuplas ordenadas (a ordem da seleção não muda o resultado)
+    e valores vazios viram None.
+    """
+    if isinstance(valor, (list, tuple)):
+        return tuple(sorted(valor, key=repr)) or None
+    if valor == "":
+        return None
+    return valor
+
+
+def _criada_em(pasta):
+    """Momento em que a versão apareceu pela primeira vez (marca gravada na pasta)"""
+    try:
+        with open(os.path.join(pasta, ARQUIVO_MARCA), encoding="utf-8") as arquivo:
+            return float(arquivo.read())
+    except (OSError, ValueError):
+        # Sem marca (ou sendo gravada agora): vale a data da pasta
+        try:
+            return os.path.getmtime(pasta)
+        except OSError:
+            return None
+
+
+def _marcar_pasta(pasta):
+    """Cria a pasta da versão e grava a marca de criação (só o primeiro worker grava)"""
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        with open(os.path.join(pasta, ARQUIVO_MARCA), "x", encoding="utf-8") as arquivo:
+            arquivo.write(repr(time.time()))
+    except FileExistsError:
+        pass
+    except OSError as e:
+        print(f"Erro ao marcar versão do cache de callbacks: {e}")
+        return None
+    return _criada_em(pasta)
+
+
+def _descartar_pasta(pasta):
+    """
+    Esvazia a pasta de uma versão antiga, mantendo a marca por RETENCAO_MARCA segundos
+
+    Com a marca, um worker atrasado que ainda grave nessa versão não recria
+    a pasta como se ela fosse nova (o que faria a versão atual ser apagada).
+    """
+    caminho_descarte = os.path.join(pasta, ARQUIVO_DESCARTE)
+    try:
+        with open(caminho_descarte, encoding="utf-8") as arquivo:
+            descartada = float(arquivo.read())
+    except (OSError, ValueError):
+        descartada = None
+    if descartada is not None and time.time() - descartada > RETENCAO_MARCA:
+        shutil.rmtree(pasta, ignore_errors=True)
+        return
+
+    try:
+        if descartada is None:
+            with open(caminho_descarte, "x", encoding="utf-8") as arquivo:
+                arquivo.write(repr(time.time()))
+    except FileExistsError:
+        pass
+    except OSError:
+        return
+    try:
+        nomes = os.listdir(pasta)
+    except OSError:
+        return
+    for nome in nomes:
+        if nome not in (ARQUIVO_MARCA, ARQUIVO_DESCARTE):
+            try:
+                os.remove(os.path.join(pasta, nome))
+            except OSError:
+                pass
+
+
+class CacheLRU:
+    """
+    Cache LRU com expiração (TTL) e camada opcional em disco
+
+    A camada em memória é própria de cada worker; a camada em disco
+    (PASTA_CACHE/callbacks/<versão>) é compartilhada entre todos os workers.
+    Uma mudança de versão dos dados descarta as entradas antigas.
+    """
+
+    def __init__(self, nome, max_itens=CACHE_CALLBACKS_MAX_ITENS, ttl=CACHE_CALLBACKS_TTL,
+                 disco=CACHE_CALLBACKS_DISCO):
+        self.nome = nome
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.disco = disco
+        self._itens = OrderedDict()
+        self._versao = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.hits_disco = 0
+        self.misses = 0
+        self.descartes = 0
+
+    # =================================================================
+    # VERSÃO DOS DADOS
+    # =================================================================
+
+    def _pasta_versao(self, versao):
+        return os.path.join(PASTA_CACHE, "callbacks", self.nome, str(versao)[:16])
+
+    def _trocar_versao(self, versao):
+        """
+        Invalida tudo que foi calculado com outra versão dos dados
+
+        Em disco só apaga as versões que apareceram antes da atual: durante uma
+        recarga os workers trocam de versão em momentos diferentes, e um worker
+        atrasado não pode apagar a pasta da versão nova (nem o contrário).
+        """
+        if versao == self._versao:
+            return
+        self._itens.clear()
+        self._versao = versao
+        if self.disco:
+            atual = self._pasta_versao(versao)
+            criada = _marcar_pasta(atual)
+            pasta_nome = os.path.dirname(atual)
+            if criada is None or not os.path.isdir(pasta_nome):
+                return
+            for pasta in os.listdir(pasta_nome):
+                caminho = os.path.join(pasta_nome, pasta)
+                if caminho == atual:
+                    continue
+                outra = _criada_em(caminho)
+                if outra is not None and outra < criada:
+                    _descartar_pasta(caminho)
+
+    # =================================================================
+    # LEITURA / ESCRITA
+    # =================================================================
+
+    def obter(self, chave, versao):
+        """
+        Busca uma saída serializada
+
+        Args:
+            chave (tuple): Chave normalizada (argumentos do callback)
+            versao (str): Versão dos dados
+
+        Returns:
+            str: JSON da saída, ou None se não estiver em cache
+        """
+        agora = time.time()
+        with self._lock:
+            self._trocar_versao(versao)
+            item = self._itens.get(chave)
+            if item is not None:
+                criado, texto = item
+                if self.ttl is None or agora - criado < self.ttl:
+                    self._itens.move_to_end(chave)
+                    self.hits += 1
+                    return texto
+                del self._itens[chave]
+
+        if self.disco:
+            caminho = self._caminho_disco(chave, versao)
+            try:
+                if self.ttl is None or agora - os.path.getmtime(caminho) < self.ttl:
+                    with open(caminho, encoding="utf-8") as arquivo:
+                        texto = arquivo.read()
+                    with self._lock:
+                        self.hits_disco += 1
+                        self._inserir(chave, texto, os.path.getmtime(caminho))
+                    return texto
+            except OSError:
+                pass
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def guardar(self, chave, versao, texto):
+        """Guarda a saída serializada em memória (e em disco, se habilitado)"""
+        with self._lock:
+            self._trocar_versao(versao)
+            self._inserir(chave, texto, time.time())
+
+        if self.disco:
+            caminho = self._caminho_disco(chave, versao)
+            try:
+                os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+                def escrever(tmp):
+                    with open(tmp, "w", encoding="utf-8") as arquivo:
+                        arquivo.write(texto)
+
+                escrever_atomico(caminho, escrever)
+            except OSError as e:
+                print(f"Erro ao gravar cache de callback: {e}")
+
+    def _inserir(self, chave, texto, criado):
+        self._itens[chave] = (criado, texto)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+            self.descartes += 1
+
+    def _caminho_disco(self, chave, versao):
+        nome = hashlib.sha1(repr(chave).encode("utf-8")).hexdigest()
+        return os.path.join(self._pasta_versao(versao), nome + ".json")
+
+    def limpar(self):
+        """Remove todas as entradas em memória"""
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do cache
+
+        Returns:
+            dict: hits, hits em disco, misses, descartes e itens em memória
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "hits_disco": self.hits_disco,
+                "misses": self.misses,
+                "descartes": self.descartes,
+                "itens": len(self._itens),
+                "versao": self._versao,
+            }
+
+
+def memoizar_callback(nome, obter_versao, **opcoes):
+    """
+    Decorador que memoiza as saídas de um callback Dash
+
+    Usar abaixo do @callback. A chave é a tupla normalizada dos filtros mais
+    a versão dos dados retornada por `obter_versao()`.
+
+    Args:
+        nome (str): Nome do cache (identifica o callback)
+        obter_versao (callable): Retorna a versão atual do dataset
+        **opcoes: Parâmetros repassados ao CacheLRU (max_itens, ttl, disco)
+    """
+    cache = CACHES.setdefault(nome, CacheLRU(nome, **opcoes))
+
+    def decorador(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            versao = obter_versao()
+            chave = tuple(normalizar_argumento(a) for a in args)
+
+            with etapa("cache"):
+                texto = cache.obter(chave, versao)
+                if texto is not None:
+                    item = json.loads(texto)
+                    return tuple(item["saida"]) if item["multiplas"] else item["saida"]
+
+            saida = func(*args)
+            if obter_versao() != versao:
+                # Os dados foram recarregados durante o cálculo: a saída pode ser
+                # da versão nova e não deve ficar guardada sob a antiga
+                return saida
+            item = {"multiplas": isinstance(saida, tuple), "saida": saida}
+            with etapa("serializacao"):
+                texto = to_json_plotly(item)
+            cache.guardar(chave, versao, texto)
+            return saida
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorador
+
+
+def estatisticas():
+    """Contadores de todos os caches registrados"""
+    return {nome: cache.estatisticas() for nome, cache in CACHES.items()}
@@ -0,0 +1,157 @@
+"""
+Cache colunar em disco do dataset de consertos
+Evita reprocessar a planilha a cada inicialização de worker
+"""
+
+import hashlib
+import json
+import os
+
+from config import PASTA_CACHE
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow é opcional: sem ele o cache fica desligado
+    feather = None
+
+
+# =====================================================================
+# ASSINATURA DO ARQUIVO FONTE
+# =====================================================================
+
+def calcular_hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo
+
+    Args:
+        caminho (str): Caminho do arquivo
+        tamanho_bloco (int): Tamanho do bloco de leitura em bytes
+
+    Returns:
+        str: Hash hexadecimal do arquivo
+    """
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _caminho_meta(caminho_fonte):
+    return os.path.join(PASTA_CACHE, os.path.basename(caminho_fonte) + ".meta.json")
+
+
+def _ler_meta(caminho_fonte):
+    try:
+        with open(_caminho_meta(caminho_fonte), encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def escrever_atomico(caminho, escrever):
+    """Escreve em arquivo temporário e troca de nome (seguro entre workers)"""
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+# =====================================================================
+# LEITURA / ESCRITA DO CACHE
+# =====================================================================
+
+def _ler_feather(caminho):
+    # memory_map=True: as colunas numéricas são lidas direto das páginas do arquivo
+    return feather.read_table(caminho, memory_map=True).to_pandas()
+
+
+def _salvar_feather(df, caminho):
+    df = df.copy()
+    # Colunas object com tipos mistos (ex.: datas e textos) não são aceitas pelo Arrow
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    escrever_atomico(
+        caminho,
+        lambda tmp: feather.write_feather(df, tmp, compression="uncompressed")
+    )
+
+
+def carregar_com_cache(caminho_fonte, processar, versao_processamento=1):
+    """
+    Carrega o DataFrame processado a partir do cache, reprocessando a fonte só quando ela mudar
+
+    O cache é identificado pelo mtime/tamanho do arquivo fonte e confirmado pelo
+    hash do conteúdo: se só o mtime mudou (ex.: arquivo copiado), o hash evita
+    reprocessar a planilha.
+
+    Args:
+        caminho_fonte (str): Caminho do arquivo de dados (Excel/CSV)
+        processar (callable): Função que recebe o caminho e retorna (DataFrame processado, extras);
+            `extras` é um dict JSON guardado junto ao cache (ex.: assinatura das linhas brutas)
+        versao_processamento (int): Versão da lógica de processamento (invalida caches antigos)
+
+    Returns:
+        tuple: (DataFrame processado, hash do arquivo fonte, extras)
+    """
+    stat = os.stat(caminho_fonte)
+    meta = _ler_meta(caminho_fonte)
+
+    if feather is None:
+        df, extras = processar(caminho_fonte)
+        return df, calcular_hash_arquivo(caminho_fonte), extras
+
+    if meta and meta.get("versao_processamento") == versao_processamento:
+        caminho_cache = os.path.join(PASTA_CACHE, meta["arquivo"])
+        mesma_assinatura = meta["mtime_ns"] == stat.st_mtime_ns and meta["tamanho"] == stat.st_size
+
+        if os.path.exists(caminho_cache):
+            if mesma_assinatura:
+                return _ler_feather(caminho_cache), meta["sha256"], meta.get("extras", {})
+
+            sha = calcular_hash_arquivo(caminho_fonte)
+            if sha == meta["sha256"]:
+                _gravar_meta(caminho_fonte, stat, sha, meta["arquivo"], versao_processamento,
+                             meta.get("extras", {}))
+                return _ler_feather(caminho_cache), sha, meta.get("extras", {})
+
+    sha = calcular_hash_arquivo(caminho_fonte)
+
+    df, extras = processar(caminho_fonte)
+
+    try:
+        os.makedirs(PASTA_CACHE, exist_ok=True)
+        nome_cache = f"{os.path.basename(caminho_fonte)}.{sha[:16]}.v{versao_processamento}.feather"
+        _salvar_feather(df, os.path.join(PASTA_CACHE, nome_cache))
+        _gravar_meta(caminho_fonte, stat, sha, nome_cache, versao_processamento, extras)
+
+        # Remove caches antigos do mesmo arquivo fonte
+        if meta and meta.get("arquivo") != nome_cache:
+            antigo = os.path.join(PASTA_CACHE, meta["arquivo"])
+            if os.path.exists(antigo):
+                os.remove(antigo)
+    except Exception as e:
+        print(f"Erro ao gravar cache de dados: {e}")
+
+    return df, sha, extras
+
+
+def _gravar_meta(caminho_fonte, stat, sha, nome_cache, versao_processamento, extras):
+    meta = {
+        "fonte": os.path.basename(caminho_fonte),
+        "mtime_ns": stat.st_mtime_ns,
+        "tamanho": stat.st_size,
+        "sha256": sha,
+        "arquivo": nome_cache,
+        "versao_processamento": versao_processamento,
+        "extras": extras,
+    }
+
+    def escrever(tmp):
+        with open(tmp, "w", encoding="utf-8") as arquivo:
+            json.dump(meta, arquivo)
+
+    escrever_atomico(_caminho_meta(caminho_fonte), escrever)
@@ -0,0 +1,97 @@
+"""
+Catálogo das opções dos filtros, por versão dos dados
+Guarda as opções completas de cada filtro e responde opções em cascata
+(ex.: categorias com consertos no ano selecionado) a partir dos grupos do
+cubo mensal, sem varrer o DataFrame.
+"""
+
+import functools
+
+import numpy as np
+import pandas as pd
+
+# Filtro do catálogo -> (dimensão do cubo, argumento de filtro correspondente)
+DIMENSOES_OPCOES = {
+    "ano": ("Ano", "ano"),
+    "categoria": ("Categoria", "categorias"),
+    "garantia": ("Garantia", "garantia"),
+    "tipo": ("Tipo", "tipo"),
+    "funcionario": ("Nome", "nomes"),
+}
+
+# Consultas em cascata guardadas por versão dos dados
+MAX_CONSULTAS_CASCATA = 256
+
+
+def _normalizar(valor):
+    # Listas viram tuplas ordenadas para servirem de chave do cache
+    if isinstance(valor, (list, tuple)):
+        return tuple(sorted(valor, key=repr))
+    return valor
+
+
+class CatalogoOpcoes:
+    """
+    Opções dos filtros de uma versão dos dados, com filtragem em cascata
+
+    O índice de co-ocorrência é o próprio cubo: cada grupo é uma combinação
+    (Ano, Mes, Categoria, Garantia, Tipo, Nome) que existe nos dados. Para
+    cada filtro do catálogo guarda a posição da opção de cada grupo; uma
+    consulta em cascata combina as máscaras do índice do cubo e marca as
+    opções presentes nos grupos selecionados.
+    """
+
+    def __init__(self, opcoes, cubo):
+        self.opcoes = opcoes
+        self._indice = cubo.indice
+        self._codigos = {}
+        for chave, (dimensao, _) in DIMENSOES_OPCOES.items():
+            posicao = {opcao["value"]: i for i, opcao in enumerate(opcoes[chave])}
+            codigos, valores = pd.factorize(cubo.grupos[dimensao])
+            # Última posição = -1: códigos nulos (-1) também caem fora das opções
+            tabela = np.array([posicao.get(v, -1) for v in valores.tolist()] + [-1], dtype="int64")
+            self._codigos[chave] = tabela[codigos]
+        self._validas = functools.lru_cache(maxsize=MAX_CONSULTAS_CASCATA)(self._calcular_validas)
+
+    def validas(self, chave, manter=None, ano=None, meses=None, categorias=None, garantia=None, tipo=None,
+                nomes=None):
+        """
+        Opções do filtro `chave` que têm consertos com os demais filtros
+
+        O próprio filtro `chave` é ignorado (a lista mostra as alternativas a
+        ele); opções "Todos" e os valores de `manter` (a seleção atual)
+        sempre ficam na lista.
+
+        Args:
+            chave (str): Filtro do catálogo (ano, categoria, garantia, tipo, funcionario)
+            manter (list): Valores que continuam na lista mesmo sem consertos
+            ano, meses, categorias, garantia, tipo, nomes: Filtros como em IndiceFiltros
+
+        Returns:
+            list: Opções no formato do dcc.Dropdown (compartilhadas: não alterar)
+        """
+        if not isinstance(manter, (list, tuple)):
+            manter = [] if manter is None else [manter]
+        filtros = dict(ano=ano, meses=meses, categorias=categorias, garantia=garantia, tipo=tipo, nomes=nomes)
+        filtros[DIMENSOES_OPCOES[chave][1]] = None
+        return self._validas(chave, _normalizar(manter), *(_normalizar(v) for v in filtros.values()))
+
+    def _calcular_validas(self, chave, manter, ano, meses, categorias, garantia, tipo, nomes):
+        indice = self._indice
+        mascaras = [
+            m for m in (
+                indice.mascara_base(categorias=categorias, garantia=garantia, tipo=tipo, nomes=nomes),
+                indice.mascara_periodo(ano, meses),
+            ) if m is not None
+        ]
+        codigos = self._codigos[chave]
+        if mascaras:
+            codigos = codigos[np.logical_and.reduce(mascaras)]
+
+        opcoes = self.opcoes[chave]
+        presentes = np.zeros(len(opcoes), dtype=bool)
+        presentes[codigos[codigos >= 0]] = True
+        return [
+            opcao for opcao, presente in zip(opcoes, presentes.tolist())
+            if presente or opcao["value"] == "all" or opcao["value"] in manter
+        ]
@@ -2,18 +2,28 @@
 Componentes de filtros reutilizáveis para diferentes páginas
 """
 
+import json
+import threading
+
 from dash import html, dcc
 import dash_bootstrap_components as dbc
-from data import opcoes_filtros
+from plotly.io.json import to_json_plotly
+
+from data import obter_dataset
 
 
-def criar_filtros_consertos():
+def criar_filtros_consertos(dataset=None):
     """
     Cria os filtros específicos para o dashboard de consertos
     
+    Args:
+        dataset (Dataset): Versão dos dados usada nas opções (padrão: a atual)
+    
     Returns:
         html.Div: Container com filtros de consertos
     """
+    opcoes_filtros = (dataset or obter_dataset()).opcoes_filtros
+    
     return html.Div([
         html.Label("Filtros", className="fw-bold text-white mb-3"),
         html.Br(),
@@ -77,13 +87,18 @@ def criar_filtros_consertos():
     ])
 
 
-def criar_filtros_novo_dashboard():
+def criar_filtros_novo_dashboard(dataset=None):
     """
     Cria os filtros específicos para o dashboard de consertos internos
     
+    Args:
+        dataset (Dataset): Versão dos dados usada nas opções (padrão: a atual)
+    
     Returns:
         html.Div: Container com filtros do dashboard interno
     """
+    opcoes_filtros = (dataset or obter_dataset()).opcoes_filtros
+    
     return html.Div([
         html.Label("Filtros - Internos", className="fw-bold text-white mb-3"),
         html.Br(),
@@ -147,28 +162,64 @@ def criar_filtros_novo_dashboard():
     ])
 
 
-def criar_filtros_atividades():
+def _tabelas_atividades():
+    """Funcionários e funções do cache do Supabase ([] se indisponível)"""
+    # Importar aqui para evitar erros se as credenciais ainda não estiverem configuradas
+    # (e para o cliente Supabase só ser carregado no primeiro uso de /atividades)
+    try:
+        from supabase_service import aquecer_cache_tabelas, get_employees_cached, get_functions_cached
+        
+        # Funcionários e funções do cache (atualizado em segundo plano): nunca
+        # espera a rede; antes da primeira carga as listas vêm vazias e a página
+        # de atividades as preenche quando a carga terminar (tabelas_atividades_prontas)
+        aquecer_cache_tabelas()
+        return get_employees_cached(), get_functions_cached()
+    except Exception as e:
+        print(f"Erro ao carregar opções de filtros: {e}")
+        return [], []
+
+
+def tabelas_atividades_prontas():
+    """Indica se funcionários e funções já foram carregados do Supabase"""
+    try:
+        from supabase_service import tabelas_carregadas
+        return tabelas_carregadas()
+    except Exception as e:
+        print(f"Erro ao verificar cache do Supabase: {e}")
+        return False
+
+
+def opcoes_atividades(tabelas=None):
     """
-    Cria os filtros específicos para o dashboard de atividades (Supabase)
+    Opções dos dropdowns de funcionários e funções do dashboard de atividades
+    
+    Args:
+        tabelas (tuple): (funcionários, funções) já obtidos (padrão: do cache do Supabase)
     
     Returns:
-        html.Div: Container com filtros de atividades
+        tuple: (opções de funcionários, opções de funções)
     """
-    # Importar aqui para evitar erros se as credenciais ainda não estiverem configuradas
+    employees, functions = tabelas or _tabelas_atividades()
     try:
-        from supabase_service import get_employees, get_functions
-        
-        # Buscar funcionários e funções do Supabase
-        employees = get_employees()
-        functions = get_functions()
-        
-        # Preparar opções para os dropdowns
         opcoes_funcionarios = [{"label": emp.get('name', ''), "value": emp.get('name', '')} for emp in employees]
         opcoes_funcoes = [{"label": func.get('name', ''), "value": func.get('name', '')} for func in functions]
     except Exception as e:
         print(f"Erro ao carregar opções de filtros: {e}")
-        opcoes_funcionarios = []
-        opcoes_funcoes = []
+        return [], []
+    return opcoes_funcionarios, opcoes_funcoes
+
+
+def criar_filtros_atividades(tabelas=None):
+    """
+    Cria os filtros específicos para o dashboard de atividades (Supabase)
+    
+    Args:
+        tabelas (tuple): (funcionários, funções) já obtidos (padrão: do cache do Supabase)
+    
+    Returns:
+        html.Div: Container com filtros de atividades
+    """
+    opcoes_funcionarios, opcoes_funcoes = opcoes_atividades(tabelas)
     
     return html.Div([
         html.Label("Filtros - Atividades", className="fw-bold text-white mb-3"),
@@ -204,3 +255,62 @@ def criar_filtros_atividades():
         ),
     ])
 
+
+# =====================================================================
+# PAINÉIS DA SIDEBAR
+# =====================================================================
+
+# Páginas cujos filtros dependem só do Dataset (caminho -> função que monta os filtros)
+PAGINAS_FILTROS = {
+    "/": criar_filtros_consertos,
+    "/novo": criar_filtros_novo_dashboard,
+}
+
+_layouts = {}   # página -> (Dataset, layout serializado)
+_lock_layouts = threading.Lock()
+
+
+def layout_filtros(pathname):
+    """
+    Filtros da sidebar da página, já serializados e guardados por versão dos dados
+
+    O layout de cada página é montado e serializado uma vez por Dataset; as
+    cargas seguintes só devolvem a estrutura pronta.
+
+    Args:
+        pathname (str): Caminho da página
+
+    Returns:
+        dict: Componente serializado (None se a página não tem filtros do Dataset)
+    """
+    if pathname not in PAGINAS_FILTROS:
+        return None
+    dataset = obter_dataset()
+    with _lock_layouts:
+        guardado = _layouts.get(pathname)
+        if guardado is not None and guardado[0] is dataset:
+            return guardado[1]
+
+    layout = json.loads(to_json_plotly(PAGINAS_FILTROS[pathname](dataset)))
+    with _lock_layouts:
+        _layouts[pathname] = (dataset, layout)
+    return layout
+
+
+def criar_paineis_filtros():
+    """
+    Painéis de filtros de todas as páginas, já renderizados e ocultos
+
+    O navegador mostra o painel da página atual (callback clientside
+    interface.alternarFiltros), sem ida ao servidor na navegação. As opções
+    de /atividades vêm do Supabase e são preenchidas quando a página abre.
+
+    Returns:
+        list: Um html.Div por página, com id {"type": "filtros-painel", "pagina": caminho}
+    """
+    paineis = [(caminho, layout_filtros(caminho)) for caminho in PAGINAS_FILTROS]
+    paineis.append(("/atividades", criar_filtros_atividades(([], []))))
+    return [
+        html.Div(conteudo, id={"type": "filtros-painel", "pagina": caminho}, style={"display": "none"})
+        for caminho, conteudo in paineis
+    ]
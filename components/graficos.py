@@ -0,0 +1,356 @@
+"""
+Fábrica de figuras dos dashboards
+Monta o dicionário da figura (data + layout) direto dos arrays NumPy, sem
+passar pelo Plotly Express: o resultado é o mesmo JSON que px.bar/px.pie +
+update_traces/update_layout produziam, sem o custo de validar e copiar cada
+propriedade dos objetos go.Figure.
+"""
+
+import numpy as np
+import plotly.io as pio
+from dash import Patch
+
+from config import COLOR_SEQUENCE, COLOR_GRAPH_MAIN
+
+try:
+    # Mesma conversão que go.Figure.to_dict aplica (arrays numéricos -> base64 tipado)
+    from _plotly_utils.utils import convert_to_base64
+except ImportError:  # versões do Plotly anteriores à 6 mandam listas
+    convert_to_base64 = None
+
+_templates = {}
+
+EIXO_X = {"anchor": "y", "domain": [0.0, 1.0]}
+EIXO_Y = {"anchor": "x", "domain": [0.0, 1.0]}
+DOMINIO_PIZZA = {"x": [0.0, 1.0], "y": [0.0, 1.0]}
+MARGEM_PADRAO = {"t": 60}
+ANOTACAO_SEM_DADOS = {"showarrow": False, "text": "Sem dados", "font": {"size": 16}}
+
+
+# =====================================================================
+# AUXILIARES
+# =====================================================================
+
+def template(nome="plotly_white"):
+    """
+    Template do Plotly já convertido em dicionário (calculado uma vez por processo)
+
+    O mesmo objeto é compartilhado por todas as figuras: não deve ser alterado.
+
+    Args:
+        nome (str): Nome do template (None: o padrão do plotly.io)
+
+    Returns:
+        dict: Layout do template
+    """
+    nome = nome or pio.templates.default
+    if nome not in _templates:
+        _templates[nome] = pio.templates[nome].to_plotly_json()
+    return _templates[nome]
+
+
+def _eixo(base, titulo):
+    return dict(base, title={"text": titulo}) if titulo is not None else dict(base)
+
+
+def _converter(traces):
+    if convert_to_base64 is not None:
+        convert_to_base64(traces)
+    return traces
+
+
+def _figura(traces, layout, nome_template="plotly_white"):
+    layout["template"] = template(nome_template)
+    return {"data": _converter(traces), "layout": layout}
+
+
+def atualizar_series(series, campos=None, **layout):
+    """
+    Atualização parcial (dash.Patch) de um dcc.Graph que já tem a figura base
+
+    Só os dados das séries (e as propriedades de layout informadas) vão para o
+    navegador; template, eixos, margens e fontes ficam na figura do layout da
+    página.
+
+    Args:
+        series (list): Séries montadas por series_barras_agrupadas/series_barras_horizontais/series_rosca
+        campos (tuple): Envia só esses campos de cada série (o número de séries
+            não pode mudar); None troca a lista inteira de séries
+        **layout: Propriedades do layout que dependem dos dados (height...)
+
+    Returns:
+        dash.Patch: Saída para a propriedade figure
+    """
+    _converter(series)
+    patch = Patch()
+    if campos is None:
+        patch["data"] = series
+    else:
+        for i, serie in enumerate(series):
+            for campo in campos:
+                patch["data"][i][campo] = serie[campo]
+    for chave, valor in layout.items():
+        patch["layout"][chave] = valor
+    return patch
+
+
+# =====================================================================
+# BARRAS
+# =====================================================================
+
+def series_barras_agrupadas(df, x, y, cor, cores=COLOR_SEQUENCE):
+    """
+    Séries de barras_agrupadas: uma por valor de `cor`, na ordem em que aparecem
+
+    Returns:
+        list: Dicionários das séries (arrays ainda em NumPy)
+    """
+    grupos, valores_grupo = df[cor].factorize(sort=False)
+    categorias = df[x].to_numpy()
+    valores = df[y].to_numpy()
+
+    traces = []
+    for i, grupo in enumerate(valores_grupo):
+        linhas = grupos == i
+        traces.append({
+            "alignmentgroup": "True",
+            "hovertemplate": f"{cor}={grupo}<br>{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>",
+            "legendgroup": grupo,
+            "marker": {"color": cores[i % len(cores)], "pattern": {"shape": ""}},
+            "name": grupo,
+            "offsetgroup": grupo,
+            "orientation": "v",
+            "showlegend": True,
+            "textposition": "auto",
+            "texttemplate": "%{y}",
+            "x": categorias[linhas].tolist(),
+            "xaxis": "x",
+            "y": valores[linhas],
+            "yaxis": "y",
+            "type": "bar",
+        })
+    return traces
+
+
+def barras_agrupadas(df, x, y, cor, titulo_x=None, titulo_y=None, margem=None,
+                     cores=COLOR_SEQUENCE, **layout):
+    """
+    Barras verticais agrupadas por cor, com o valor sobre a barra
+
+    Equivale a px.bar(df, x, y, color=cor, barmode="group", text_auto=True,
+    template="plotly_white"): uma série por valor de `cor`, na ordem em que
+    aparecem, com as cores de `cores` em ciclo.
+
+    Args:
+        df (pd.DataFrame): Dados do gráfico
+        x, y, cor (str): Colunas de categoria, valor e agrupamento
+        titulo_x, titulo_y (str): Títulos dos eixos (None: nome da coluna)
+        margem (dict): Margens do layout
+        cores (list): Sequência de cores das séries
+        **layout: Demais propriedades do layout (font, height...)
+
+    Returns:
+        dict: Figura pronta para o dcc.Graph
+    """
+    traces = series_barras_agrupadas(df, x, y, cor, cores)
+    legenda = {"title": {"text": cor}, "tracegroupgap": 0} if traces else {"tracegroupgap": 0}
+    return _figura(traces, {
+        "xaxis": _eixo(EIXO_X, x if titulo_x is None else titulo_x),
+        "yaxis": _eixo(EIXO_Y, y if titulo_y is None else titulo_y),
+        "legend": legenda,
+        "margin": {**MARGEM_PADRAO, **(margem or {})},
+        "barmode": "group",
+        **layout,
+    })
+
+
+def series_barras_horizontais(df, x, y, cor=COLOR_GRAPH_MAIN):
+    """
+    Série única de barras_horizontais
+
+    Returns:
+        list: Dicionário da série (arrays ainda em NumPy)
+    """
+    valores = df[x].to_numpy()
+    return [{
+        "hovertemplate": f"{x}=%{{text}}<br>{y}=%{{y}}<extra></extra>",
+        "legendgroup": "",
+        "marker": {"color": cor, "pattern": {"shape": ""}},
+        "name": "",
+        "orientation": "h",
+        "showlegend": False,
+        # px guarda o texto da barra como float
+        "text": valores.astype("float64"),
+        "textposition": "outside",
+        "x": valores,
+        "xaxis": "x",
+        "y": df[y].to_numpy().tolist(),
+        "yaxis": "y",
+        "type": "bar",
+    }]
+
+
+def barras_horizontais(df, x, y, titulo_x=None, titulo_y=None, margem=None,
+                       cor=COLOR_GRAPH_MAIN, **layout):
+    """
+    Barras horizontais de uma série, com o valor fora da barra
+
+    Equivale a px.bar(df, x, y, orientation="h", text=x) seguido de
+    update_traces(marker_color=cor, textposition="outside").
+
+    Args:
+        df (pd.DataFrame): Dados já ordenados na ordem de exibição (de baixo para cima)
+        x, y (str): Colunas de valor e de categoria
+        titulo_x, titulo_y (str): Títulos dos eixos (None: nome da coluna)
+        margem (dict): Margens do layout
+        cor (str): Cor das barras
+        **layout: Demais propriedades do layout (font, height, bargap...)
+
+    Returns:
+        dict: Figura pronta para o dcc.Graph
+    """
+    return _figura(series_barras_horizontais(df, x, y, cor), {
+        "xaxis": _eixo(EIXO_X, x if titulo_x is None else titulo_x),
+        "yaxis": _eixo(EIXO_Y, y if titulo_y is None else titulo_y),
+        "legend": {"tracegroupgap": 0},
+        "margin": {**MARGEM_PADRAO, **(margem or {})},
+        "barmode": "relative",
+        **layout,
+    })
+
+
+# =====================================================================
+# PIZZA (ROSCA)
+# =====================================================================
+
+def series_rosca(rotulos, valores, nome_rotulo="label", nome_valor="value", hole=0.6,
+                 textinfo=None, textposition=None):
+    """
+    Série única de rosca
+
+    Returns:
+        list: Dicionário da série (arrays ainda em NumPy)
+    """
+    trace = {
+        "domain": DOMINIO_PIZZA,
+        "hole": hole,
+        "hovertemplate": f"{nome_rotulo}=%{{label}}<br>{nome_valor}=%{{value}}<extra></extra>",
+        "labels": np.asarray(rotulos).tolist(),
+        "legendgroup": "",
+        "name": "",
+        "showlegend": True,
+        "values": np.asarray(valores),
+        "type": "pie",
+    }
+    if textinfo is not None:
+        trace["textinfo"] = textinfo
+    if textposition is not None:
+        trace["textposition"] = textposition
+    return [trace]
+
+
+def rosca(rotulos, valores, nome_rotulo="label", nome_valor="value", hole=0.6, cores=None,
+          textinfo=None, textposition=None, legenda=None, margem=None, **layout):
+    """
+    Gráfico de rosca
+
+    Equivale a px.pie(values=..., names=..., hole=hole,
+    color_discrete_sequence=cores), com textinfo/textposition aplicados como
+    no update_traces.
+
+    Args:
+        rotulos (array): Nome de cada fatia
+        valores (array): Valor de cada fatia
+        nome_rotulo, nome_valor (str): Nomes exibidos no hover (as colunas de origem)
+        hole (float): Tamanho do furo central
+        cores (list): Sequência de cores das fatias (None: cores do template)
+        textinfo, textposition (str): Texto das fatias (None: padrão do Plotly)
+        legenda (dict): Propriedades extras da legenda
+        margem (dict): Margens do layout
+        **layout: Demais propriedades do layout (showlegend, font...)
+
+    Returns:
+        dict: Figura pronta para o dcc.Graph
+    """
+    layout = {
+        "legend": {"tracegroupgap": 0, **(legenda or {})},
+        "margin": {**MARGEM_PADRAO, **(margem or {})},
+        **layout,
+    }
+    if cores is not None:
+        layout["piecolorway"] = list(cores)
+    series = series_rosca(rotulos, valores, nome_rotulo, nome_valor, hole, textinfo, textposition)
+    return _figura(series, layout)
+
+
+# =====================================================================
+# ATUALIZAÇÕES PARCIAIS (dash.Patch)
+# =====================================================================
+
+def atualizar_barras_agrupadas(df, x, y, cor, cores=COLOR_SEQUENCE):
+    """
+    Patch de uma figura montada por barras_agrupadas: troca as séries
+    (o número de anos varia com o filtro) e o título da legenda
+
+    Returns:
+        dash.Patch: Saída para a propriedade figure
+    """
+    series = series_barras_agrupadas(df, x, y, cor, cores)
+    legenda = {"title": {"text": cor}, "tracegroupgap": 0} if series else {"tracegroupgap": 0}
+    return atualizar_series(series, legend=legenda)
+
+
+def atualizar_barras_horizontais(df, x, y, **layout):
+    """
+    Patch de uma figura montada por barras_horizontais: só x, y e texto das barras
+
+    Args:
+        **layout: Propriedades do layout que dependem dos dados (height)
+
+    Returns:
+        dash.Patch: Saída para a propriedade figure
+    """
+    return atualizar_series(series_barras_horizontais(df, x, y), campos=("x", "y", "text"), **layout)
+
+
+def atualizar_rosca(rotulos, valores):
+    """
+    Patch de uma figura montada por rosca: só rótulos e valores das fatias
+
+    Returns:
+        dash.Patch: Saída para a propriedade figure
+    """
+    return atualizar_series(series_rosca(rotulos, valores), campos=("labels", "values"))
+
+
+# =====================================================================
+# FIGURAS VAZIAS
+# =====================================================================
+
+def barras_sem_dados():
+    """Equivale a px.bar(template="plotly_white") com a anotação "Sem dados" """
+    trace = {
+        "hovertemplate": "<extra></extra>",
+        "legendgroup": "",
+        "marker": {"color": "#636efa", "pattern": {"shape": ""}},
+        "name": "",
+        "orientation": "v",
+        "showlegend": False,
+        "textposition": "auto",
+        "xaxis": "x",
+        "yaxis": "y",
+        "type": "bar",
+    }
+    return _figura([trace], {
+        "xaxis": dict(EIXO_X),
+        "yaxis": dict(EIXO_Y),
+        "legend": {"tracegroupgap": 0},
+        "margin": dict(MARGEM_PADRAO),
+        "barmode": "relative",
+        "annotations": [ANOTACAO_SEM_DADOS],
+    })
+
+
+def figura_sem_dados():
+    """Equivale a go.Figure() com a anotação "Sem dados" (template padrão do Plotly)"""
+    return _figura([], {"annotations": [ANOTACAO_SEM_DADOS]}, nome_template=None)
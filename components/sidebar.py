@@ -6,10 +6,13 @@ from dash import html, dcc
 from config import SIDEBAR_STYLE
 
 
-def criar_sidebar():
+def criar_sidebar(filtros=None):
     """
     Cria a barra lateral com navegação entre páginas
     
+    Args:
+        filtros (list): Painéis de filtros das páginas (components.filtros.criar_paineis_filtros)
+    
     Returns:
         html.Div: Componente da sidebar
     """
@@ -44,7 +47,7 @@ def criar_sidebar():
             html.Hr(style={"borderColor": "white", "marginTop": "30px"}),
             
             # Container para filtros específicos de cada página
-            html.Div(id="filtros-container"),
+            html.Div(filtros, id="filtros-container"),
             
 
         ],
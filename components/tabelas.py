@@ -0,0 +1,158 @@
+"""
+Tabelas paginadas no servidor (dash_table.DataTable com page/sort/filter 'custom')
+O navegador recebe só a página visível; ordenação e filtro rodam no servidor
+sobre um DataFrame já agregado.
+"""
+
+import math
+import re
+
+from dash import dash_table
+
+from config import COLOR_TEXT_TITLE, TABELA_LINHAS_POR_PAGINA
+
+# Condição da filter_query do DataTable: {coluna} operador valor
+# (prefixo i/s no operador = sem/com distinção de maiúsculas)
+CONDICAO_FILTRO = re.compile(
+    r"^\{(?P<coluna>[^}]+)\}\s*(?P<caso>[is]?)"
+    r"(?P<operador>contains|datestartswith|eq|ne|lt|le|gt|ge|>=|<=|!=|<|>|=)\s*(?P<valor>.*)$"
+)
+SIMBOLOS = {">=": "ge", "<=": "le", "!=": "ne", "<": "lt", ">": "gt", "=": "eq"}
+
+
+# =====================================================================
+# COMPONENTE
+# =====================================================================
+
+def criar_tabela_paginada(id_tabela, colunas, linhas_por_pagina=TABELA_LINHAS_POR_PAGINA):
+    """
+    Cria um DataTable que pede as páginas ao servidor
+
+    Args:
+        id_tabela (str): ID do componente
+        colunas (list): Pares (nome, tipo) com tipo 'text' ou 'numeric'
+        linhas_por_pagina (int): Tamanho da página
+
+    Returns:
+        dash_table.DataTable: Tabela sem dados (preenchida via callback)
+    """
+    return dash_table.DataTable(
+        id=id_tabela,
+        columns=[{"name": nome, "id": nome, "type": tipo} for nome, tipo in colunas],
+        data=[],
+        page_action="custom",
+        page_current=0,
+        page_size=linhas_por_pagina,
+        page_count=0,
+        sort_action="custom",
+        sort_mode="single",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
+        filter_options={"case": "insensitive", "placeholder_text": "Filtrar..."},
+        style_as_list_view=True,
+        style_table={"overflowX": "auto"},
+        style_cell={"color": "#333", "fontFamily": "inherit", "padding": "8px", "textAlign": "left"},
+        style_header={"fontWeight": "bold", "color": COLOR_TEXT_TITLE, "backgroundColor": "#ffffff"},
+        style_data_conditional=[{"if": {"row_index": "odd"}, "backgroundColor": "#f9f9f9"}],
+    )
+
+
+# =====================================================================
+# FILTRO, ORDENAÇÃO E PAGINAÇÃO
+# =====================================================================
+
+def _valor_filtro(texto):
+    # Só tira as aspas: o tipo do valor depende da coluna (ver _mascara)
+    texto = texto.strip()
+    if len(texto) >= 2 and texto[0] == texto[-1] and texto[0] in "\"'`":
+        return texto[1:-1].replace("\\" + texto[0], texto[0])
+    return texto
+
+
+def _numero(texto):
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+def interpretar_filtro(filter_query):
+    """
+    Separa a filter_query do DataTable em condições
+
+    Ex.: '{Defeito} icontains "gatilho" && {Quantidade} >= 5'. Sem prefixo
+    i/s vale o padrão da tabela (filter_options case insensitive).
+
+    Args:
+        filter_query (str): Texto enviado pelo DataTable
+
+    Returns:
+        list: Tuplas (coluna, operador, valor em texto, sensivel_maiusculas)
+    """
+    condicoes = []
+    for parte in (filter_query or "").split(" && "):
+        encontrado = CONDICAO_FILTRO.match(parte.strip())
+        if encontrado is None:
+            continue
+        operador = SIMBOLOS.get(encontrado["operador"], encontrado["operador"])
+        condicoes.append((encontrado["coluna"], operador, _valor_filtro(encontrado["valor"]),
+                          encontrado["caso"] == "s"))
+    return condicoes
+
+
+def _mascara(serie, operador, valor, sensivel):
+    # O DataTable manda números sem aspas até para colunas de texto
+    # ({Defeito} icontains 1): só colunas numéricas comparam como número
+    if operador == "contains" or operador == "datestartswith":
+        texto = serie.astype(str)
+        if operador == "datestartswith":
+            return texto.str.startswith(valor)
+        return texto.str.contains(valor, case=sensivel, regex=False)
+
+    numero = _numero(valor) if serie.dtype.kind in "iuf" else None
+    if numero is not None:
+        valor = numero
+    else:
+        serie = serie.astype(str)
+        if not sensivel:
+            serie, valor = serie.str.lower(), valor.lower()
+    comparacoes = {
+        "eq": serie.__eq__, "ne": serie.__ne__, "lt": serie.__lt__,
+        "le": serie.__le__, "gt": serie.__gt__, "ge": serie.__ge__,
+    }
+    return comparacoes[operador](valor)
+
+
+def pagina_tabela(df, page_current, page_size, sort_by=None, filter_query=None):
+    """
+    Aplica filtro, ordenação e paginação do DataTable a um DataFrame
+
+    Args:
+        df (pd.DataFrame): Dados completos da tabela (não é alterado)
+        page_current (int): Página pedida (começa em 0)
+        page_size (int): Linhas por página
+        sort_by (list): Ordenação do DataTable ([{"column_id", "direction"}])
+        filter_query (str): Filtro do DataTable
+
+    Returns:
+        tuple: (registros da página, quantidade de páginas, página efetiva)
+    """
+    for coluna, operador, valor, sensivel in interpretar_filtro(filter_query):
+        if coluna in df.columns:
+            df = df[_mascara(df[coluna], operador, valor, sensivel).to_numpy()]
+
+    if sort_by:
+        ordem = [s for s in sort_by if s["column_id"] in df.columns]
+        if ordem:
+            df = df.sort_values(
+                [s["column_id"] for s in ordem],
+                ascending=[s["direction"] == "asc" for s in ordem],
+                kind="stable"
+            )
+
+    page_size = page_size or TABELA_LINHAS_POR_PAGINA
+    paginas = max(1, math.ceil(len(df) / page_size))
+    pagina = min(page_current or 0, paginas - 1)
+    inicio = pagina * page_size
+    return df.iloc[inicio:inicio + page_size].to_dict("records"), paginas, pagina
@@ -2,6 +2,8 @@
 Configurações e constantes do Dashboard
 """
 
+import os
+
 # =====================================================================
 # DADOS
 # =====================================================================
@@ -9,6 +11,46 @@ Configurações e constantes do Dashboard
 NOME_ARQUIVO = "CONSERTOS 20242025.xlsx - rci3040.xls 1.csv"
 NOME_ARQUIVO_EXCEL = "CONSERTOS 20242025.xlsx"
 
+# Pasta do cache colunar (Feather) gerado a partir da planilha; a variável de
+# ambiente DASHBOARD_PASTA_CACHE troca a pasta (ex.: testes em pasta temporária)
+PASTA_CACHE = os.environ.get("DASHBOARD_PASTA_CACHE", ".cache")
+
+# Recarga a quente: intervalo (segundos) entre verificações da planilha
+MONITORAMENTO_ATIVO = True
+MONITORAMENTO_INTERVALO = 30
+
+# Orçamento (segundos) para importar app.py num processo novo, verificado por
+# perfil_inicializacao.py (sai com erro quando estourado)
+ORCAMENTO_INICIALIZACAO = 5.0
+
+# gunicorn: o master publica o dataset em memória compartilhada e os workers
+# mapeiam as mesmas colunas (ver gunicorn.conf.py e dados_compartilhados.py)
+DADOS_COMPARTILHADOS = True
+# Pasta onde o master publica o dataset (None = /dev/shm com um sufixo derivado
+# do caminho absoluto da planilha, para instâncias no mesmo host não se misturarem)
+PASTA_DADOS_COMPARTILHADOS = None
+
+# =====================================================================
+# CACHE DE CALLBACKS
+# =====================================================================
+
+CACHE_CALLBACKS_MAX_ITENS = 512   # Entradas mantidas em memória por worker (LRU)
+CACHE_CALLBACKS_TTL = 3600        # Segundos até uma entrada expirar (None = sem expiração)
+CACHE_CALLBACKS_DISCO = True      # Compartilha as saídas entre workers via PASTA_CACHE
+
+# =====================================================================
+# TABELAS PAGINADAS NO SERVIDOR
+# =====================================================================
+
+TABELA_LINHAS_POR_PAGINA = 25     # Linhas enviadas ao navegador por página
+
+# =====================================================================
+# MÉTRICAS DOS CALLBACKS
+# =====================================================================
+
+METRICAS_ATIVAS = True            # Tempo por etapa e tamanho das respostas (rota /metrics)
+METRICAS_AMOSTRAS = 1024          # Amostras recentes por série usadas nos percentis (buffer circular)
+
 # =====================================================================
 # PALETA DE CORES
 # =====================================================================
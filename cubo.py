@@ -0,0 +1,115 @@
+"""
+Cubo mensal pré-agregado para KPIs, MoM, YoY e evolução mensal
+"""
+
+import pandas as pd
+
+from config import MESES_MAP
+from indices import IndiceFiltros
+
+# Dimensões do cubo (tudo que os filtros das páginas usam, exceto a busca por modelo)
+DIMENSOES = ["Ano", "Mes", "Categoria", "Garantia", "Tipo", "Nome"]
+
+
+def kpis_linhas(dff):
+    """
+    Calcula os KPIs a partir das linhas brutas
+
+    Args:
+        dff (pd.DataFrame): Linhas já filtradas
+
+    Returns:
+        dict: total, media_dias, reincidencias e perc_reincidencia
+    """
+    total = len(dff)
+    reincidencias = int((dff["Reincidencia"] == "Sim").sum()) if total else 0
+    return {
+        "total": total,
+        "media_dias": dff["Dias"].mean() if total else 0,
+        "reincidencias": reincidencias,
+        "perc_reincidencia": (reincidencias / total) * 100 if total else 0,
+    }
+
+
+def evolucao_linhas(dff):
+    """
+    Quantidade de consertos por ano/mês a partir das linhas brutas
+
+    Returns:
+        pd.DataFrame: Colunas Ano, Mes, Mes_nome e Quantidade, ordenadas por Ano/Mes
+    """
+    return dff.groupby(["Ano", "Mes", "Mes_nome"], observed=True).size().reset_index(name="Quantidade").sort_values(["Ano", "Mes"])
+
+
+class CuboMensal:
+    """
+    Rollup por (Ano, Mes, Categoria, Garantia, Tipo, Nome)
+
+    Cada grupo guarda a quantidade de consertos, a soma/contagem de Dias e a
+    quantidade de reincidências. KPIs e evolução mensal são respondidos a
+    partir dos grupos, então o custo depende do número de grupos e não do
+    número de linhas. Com busca por modelo (dimensão que não está no cubo)
+    o cálculo cai para as linhas brutas.
+    """
+
+    def __init__(self, df, indice_linhas):
+        self.indice_linhas = indice_linhas
+
+        medidas = pd.DataFrame({
+            **{dim: df[dim] for dim in DIMENSOES},
+            "quantidade": 1,
+            "soma_dias": df["Dias"].fillna(0),
+            "n_dias": df["Dias"].notna().astype("int64"),
+            "reincidencias": (df["Reincidencia"] == "Sim").astype("int64"),
+        })
+        self.grupos = medidas.groupby(DIMENSOES, observed=True, dropna=False, sort=False).sum().reset_index()
+        self.indice = IndiceFiltros(self.grupos, colunas=DIMENSOES)
+
+    def _grupos(self, ano, meses, filtros):
+        return self.indice.linhas(
+            self.indice.mascara_base(**filtros),
+            self.indice.mascara_periodo(ano, meses)
+        )
+
+    def kpis(self, ano=None, meses=None, **filtros):
+        """
+        KPIs do período para os filtros informados
+
+        Args:
+            ano (int): Ano selecionado ou 'all'
+            meses (list): Meses selecionados
+            **filtros: busca, categorias, garantia, tipo, nomes (como em IndiceFiltros.mascara_base)
+
+        Returns:
+            dict: total, media_dias, reincidencias e perc_reincidencia
+        """
+        if filtros.get("busca"):
+            indice = self.indice_linhas
+            return kpis_linhas(indice.linhas(indice.mascara_base(**filtros), indice.mascara_periodo(ano, meses)))
+
+        grupos = self._grupos(ano, meses, filtros)
+        total = int(grupos["quantidade"].sum())
+        n_dias = grupos["n_dias"].sum()
+        reincidencias = int(grupos["reincidencias"].sum())
+        return {
+            "total": total,
+            "media_dias": grupos["soma_dias"].sum() / n_dias if total and n_dias else 0,
+            "reincidencias": reincidencias,
+            "perc_reincidencia": (reincidencias / total) * 100 if total else 0,
+        }
+
+    def evolucao(self, ano=None, meses=None, **filtros):
+        """
+        Quantidade de consertos por ano/mês para os filtros informados
+
+        Returns:
+            pd.DataFrame: Colunas Ano, Mes, Mes_nome e Quantidade, ordenadas por Ano/Mes
+        """
+        if filtros.get("busca"):
+            indice = self.indice_linhas
+            return evolucao_linhas(indice.linhas(indice.mascara_base(**filtros), indice.mascara_periodo(ano, meses)))
+
+        grupos = self._grupos(ano, meses, filtros)
+        df_chart = grupos.groupby(["Ano", "Mes"])["quantidade"].sum().reset_index(name="Quantidade")
+        df_chart.insert(2, "Mes_nome", df_chart["Mes"].map(MESES_MAP))
+        return df_chart.sort_values(["Ano", "Mes"])
@@ -0,0 +1,268 @@
+"""
+Dataset compartilhado entre os workers do gunicorn
+O master processa a planilha uma vez e publica cada coluna como um arquivo
+NumPy (.npy); os workers mapeiam esses arquivos em memória (somente leitura),
+então as páginas físicas do DataFrame são as mesmas em todos os processos.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache_dados import escrever_atomico
+from config import (
+    PASTA_CACHE, PASTA_DADOS_COMPARTILHADOS, NOME_ARQUIVO, NOME_ARQUIVO_EXCEL, MONITORAMENTO_INTERVALO
+)
+
+# Variável de ambiente que liga o modo compartilhado nos workers (valor = pasta publicada)
+VARIAVEL_AMBIENTE = "DASHBOARD_DADOS_COMPARTILHADOS"
+
+ARQUIVO_PONTEIRO = "atual.json"
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+
+def pasta_padrao():
+    """
+    Pasta onde o dataset é publicado
+
+    PASTA_DADOS_COMPARTILHADOS, se configurada. Senão usa /dev/shm (memória)
+    quando existir, numa subpasta com um hash do caminho absoluto da planilha
+    (cada instância do dashboard no host publica na sua); sem /dev/shm, uma
+    subpasta de PASTA_CACHE, que também funciona porque o mapeamento usa o
+    page cache do sistema.
+    """
+    if PASTA_DADOS_COMPARTILHADOS:
+        return PASTA_DADOS_COMPARTILHADOS
+    if os.path.isdir("/dev/shm"):
+        instancia = hashlib.sha256(os.path.abspath(NOME_ARQUIVO_EXCEL).encode()).hexdigest()[:12]
+        return os.path.join("/dev/shm", f"dashboard-consertos-{instancia}")
+    return os.path.join(PASTA_CACHE, "compartilhado")
+
+
+def pasta_ativa():
+    """Pasta publicada pelo master, ou None se o modo compartilhado estiver desligado"""
+    return os.environ.get(VARIAVEL_AMBIENTE) or None
+
+
+def caminho_ponteiro(pasta):
+    """Arquivo que aponta para a versão publicada (trocado atomicamente a cada publicação)"""
+    return os.path.join(pasta, ARQUIVO_PONTEIRO)
+
+
+# =====================================================================
+# PUBLICAÇÃO (MASTER)
+# =====================================================================
+
+def _colunas_em_arrays(df):
+    """
+    Decompõe o DataFrame em arrays NumPy planos
+
+    Colunas categóricas viram códigos + categorias; colunas de texto são
+    codificadas como categóricas; datas e números são gravados como estão.
+    """
+    for posicao, col in enumerate(df.columns):
+        serie = df[col]
+        if not isinstance(serie.dtype, (pd.CategoricalDtype, np.dtype)):
+            serie = serie.astype("category")
+        elif serie.dtype == object:
+            # Tipos mistos (ex.: datas e textos): mesma conversão do cache Feather
+            serie = serie.where(serie.isna(), serie.astype(str)).astype("category")
+
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            yield posicao, col, serie.cat.codes.to_numpy(), serie.cat.categories.tolist()
+        else:
+            yield posicao, col, serie.to_numpy(), None
+
+
+def publicar(df, versao, extras=None, pasta=None):
+    """
+    Publica o DataFrame processado para os workers
+
+    Cada versão fica em uma subpasta própria; o ponteiro só é trocado depois
+    que todos os arquivos foram gravados, então um worker nunca enxerga uma
+    versão incompleta. Versões anteriores à última são removidas (workers que
+    ainda as mapeiam continuam válidos até soltarem o mapeamento).
+
+    Args:
+        df (pd.DataFrame): DataFrame processado
+        versao (str): Versão dos dados (hash do arquivo fonte)
+        extras (dict): Metadados JSON guardados junto à versão
+        pasta (str): Pasta de publicação (padrão: pasta_padrao())
+
+    Returns:
+        str: Pasta da versão publicada
+    """
+    pasta = pasta or pasta_padrao()
+    nome_versao = f"{str(versao)[:16]}.{os.getpid()}"
+    pasta_versao = os.path.join(pasta, nome_versao)
+    os.makedirs(pasta_versao, exist_ok=True)
+
+    colunas = []
+    for posicao, col, valores, categorias in _colunas_em_arrays(df):
+        arquivo = f"{posicao:03d}.npy"
+        np.save(os.path.join(pasta_versao, arquivo), valores, allow_pickle=False)
+        colunas.append({"nome": col, "arquivo": arquivo, "categorias": categorias})
+
+    indice = None
+    if not isinstance(df.index, pd.RangeIndex):
+        indice = "indice.npy"
+        np.save(os.path.join(pasta_versao, indice), df.index.to_numpy(), allow_pickle=False)
+
+    manifesto = {
+        "versao": versao,
+        "extras": extras or {},
+        "linhas": len(df),
+        "colunas": colunas,
+        "indice": indice,
+    }
+    _gravar_json(os.path.join(pasta_versao, ARQUIVO_MANIFESTO), manifesto)
+
+    anterior = _ler_json(caminho_ponteiro(pasta))
+    _gravar_json(caminho_ponteiro(pasta), {"pasta": nome_versao, "versao": versao})
+
+    manter = {nome_versao, anterior.get("pasta") if anterior else None}
+    for nome in os.listdir(pasta):
+        caminho = os.path.join(pasta, nome)
+        if nome not in manter and os.path.isdir(caminho):
+            shutil.rmtree(caminho, ignore_errors=True)
+
+    return pasta_versao
+
+
+def publicar_em_processo_separado(pasta=None):
+    """
+    Carrega os dados e publica em um processo Python separado
+
+    Usado pelo master do gunicorn: o master não importa data.py (os workers
+    herdariam o módulo já carregado, com uma cópia privada do DataFrame).
+
+    Returns:
+        bool: True se a publicação terminou sem erro
+    """
+    pasta = pasta or pasta_padrao()
+    ambiente = {k: v for k, v in os.environ.items() if k != VARIAVEL_AMBIENTE}
+    resultado = subprocess.run(
+        [sys.executable, "-m", "dados_compartilhados", pasta],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=ambiente,
+    )
+    return resultado.returncode == 0
+
+
+def _assinatura_fontes():
+    # CSV e Excel: o CSV passa a ter prioridade assim que aparecer (ver data.caminho_arquivo_fonte)
+    assinatura = []
+    for caminho in (NOME_ARQUIVO, NOME_ARQUIVO_EXCEL):
+        try:
+            stat = os.stat(caminho)
+            assinatura.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            assinatura.append(None)
+    return tuple(assinatura)
+
+
+def _monitorar_fontes(intervalo, pasta):
+    assinatura = _assinatura_fontes()
+    while True:
+        time.sleep(intervalo)
+        atual = _assinatura_fontes()
+        if atual == assinatura:
+            continue
+        assinatura = atual
+        if not publicar_em_processo_separado(pasta):
+            print("Erro ao republicar dados compartilhados")
+
+
+def iniciar_republicacao(pasta=None, intervalo=MONITORAMENTO_INTERVALO):
+    """
+    Inicia no master a thread que republica os dados quando a planilha muda
+
+    Os workers percebem a troca do ponteiro pelo monitoramento de data.py.
+
+    Args:
+        pasta (str): Pasta de publicação
+        intervalo (float): Segundos entre verificações
+    """
+    thread = threading.Thread(target=_monitorar_fontes, args=(intervalo, pasta or pasta_padrao()),
+                              name="republicar-dados", daemon=True)
+    thread.start()
+    return thread
+
+
+# =====================================================================
+# ANEXAÇÃO (WORKERS)
+# =====================================================================
+
+def anexar(pasta):
+    """
+    Mapeia a versão publicada como um DataFrame somente leitura, sem cópia
+
+    Args:
+        pasta (str): Pasta de publicação
+
+    Returns:
+        tuple: (DataFrame, versão dos dados, extras)
+    """
+    ponteiro = _ler_json(caminho_ponteiro(pasta))
+    if not ponteiro:
+        raise FileNotFoundError(f"Nenhum dataset publicado em {pasta}")
+    pasta_versao = os.path.join(pasta, ponteiro["pasta"])
+    manifesto = _ler_json(os.path.join(pasta_versao, ARQUIVO_MANIFESTO))
+    if not manifesto:
+        raise FileNotFoundError(f"Manifesto ausente em {pasta_versao}")
+
+    colunas = {}
+    for coluna in manifesto["colunas"]:
+        valores = np.load(os.path.join(pasta_versao, coluna["arquivo"]), mmap_mode="r")
+        if coluna["categorias"] is not None:
+            valores = pd.Categorical.from_codes(
+                valores, dtype=pd.CategoricalDtype(coluna["categorias"]), validate=False
+            )
+        colunas[coluna["nome"]] = valores
+
+    indice = None
+    if manifesto["indice"]:
+        indice = pd.Index(np.load(os.path.join(pasta_versao, manifesto["indice"]), mmap_mode="r"), copy=False)
+
+    # copy=False com arrays separados: um bloco por coluna, apontando para o mapeamento
+    df = pd.DataFrame(colunas, index=indice, copy=False)
+    return df, manifesto["versao"], manifesto["extras"]
+
+
+# =====================================================================
+# AUXILIARES
+# =====================================================================
+
+def _ler_json(caminho):
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_json(caminho, conteudo):
+    def escrever(tmp):
+        with open(tmp, "w", encoding="utf-8") as arquivo:
+            json.dump(conteudo, arquivo)
+
+    escrever_atomico(caminho, escrever)
+
+
+if __name__ == "__main__":
+    # python -m dados_compartilhados [pasta]: carrega a planilha (com o cache Feather) e publica
+    os.environ.pop(VARIAVEL_AMBIENTE, None)
+    import data
+
+    dataset = data.obter_dataset()
+    destino = publicar(dataset.df, dataset.versao, dataset.extras,
+                       sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"Dados publicados em {destino} (versão {str(dataset.versao)[:12]})")
@@ -2,8 +2,71 @@
 Módulo de carregamento e processamento de dados
 """
 
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
-from config import NOME_ARQUIVO, NOME_ARQUIVO_EXCEL, MESES_MAP
+from config import NOME_ARQUIVO, NOME_ARQUIVO_EXCEL, MESES_MAP, MONITORAMENTO_INTERVALO
+from cache_dados import carregar_com_cache
+from leitor_xlsx import ler_xlsx
+import dados_compartilhados
+from indices import IndiceFiltros
+from cubo import CuboMensal
+from catalogo_opcoes import CatalogoOpcoes
+
+# Incrementar sempre que a lógica de processamento mudar (invalida o cache em disco)
+VERSAO_PROCESSAMENTO = 4
+
+# Colunas da planilha usadas pelos dashboards (as demais nem são lidas)
+COLUNAS_LIDAS = ["Dt-Saida", "Dias", "Defeito", "Categoria", "Descrição", "Tipo", "Marca", "Garantia",
+                 "Reincidencia", "Nome"]
+
+# Colunas de texto padronizadas (sem espaços nas pontas, só a inicial maiúscula)
+COLUNAS_TEXTO = ["Defeito", "Categoria", "Descrição", "Tipo", "Marca", "Garantia", "Reincidencia"]
+
+# Colunas de baixa cardinalidade guardadas como Categorical (códigos inteiros + dicionário)
+COLUNAS_CATEGORICAS = ["Defeito", "Categoria", "Descrição", "Tipo", "Marca", "Garantia",
+                       "Reincidencia", "Nome", "Mes_nome"]
+
+
+# =====================================================================
+# TEMPOS DA CARGA (relatados por perfil_inicializacao.py)
+# =====================================================================
+
+_tempos_carga = {}
+
+
+@contextmanager
+def _fase(nome):
+    """Soma a duração do bloco na fase `nome` da carga atual"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _tempos_carga[nome] = _tempos_carga.get(nome, 0.0) + time.perf_counter() - inicio
+
+
+def tempos_carga():
+    """
+    Segundos gastos em cada fase da última carga dos dados
+
+    Fases: carga (DataFrame pronto, do cache ou da planilha), leitura, datas,
+    strings e categorias (só quando a planilha é reprocessada), opcoes,
+    indice, cubo e catalogo (estruturas derivadas do Dataset).
+
+    Returns:
+        dict: Fase -> segundos
+    """
+    return {nome: round(segundos, 4) for nome, segundos in _tempos_carga.items()}
+
+
+def caminho_arquivo_fonte():
+    """Arquivo de dados em uso: o CSV se existir, senão o Excel"""
+    return NOME_ARQUIVO if os.path.exists(NOME_ARQUIVO) else NOME_ARQUIVO_EXCEL
 
 
 def carregar_dados():
@@ -13,34 +76,258 @@ def carregar_dados():
     Returns:
         pd.DataFrame: DataFrame processado com os dados de consertos
     """
-    # Tentar carregar CSV primeiro, depois Excel
+    return carregar_dados_versionados()[0]
+
+
+def carregar_dados_versionados(anterior=None):
+    """
+    Carrega os dados processados usando o cache colunar em disco
+    
+    A planilha só é lida novamente quando o arquivo fonte muda; caso contrário
+    o DataFrame já tratado é lido do arquivo Feather em .cache/.
+    
+    Args:
+        anterior (Dataset): Versão atual dos dados; se a planilha só ganhou linhas
+            no final, apenas as linhas novas são processadas
+    
+    Returns:
+        tuple: (DataFrame processado, versão dos dados - hash do arquivo fonte, extras)
+    """
     try:
-        df = pd.read_csv(NOME_ARQUIVO, on_bad_lines='skip')
-    except:
-        try:
-            df = pd.read_excel(NOME_ARQUIVO_EXCEL)
-        except Exception as e:
-            print(f"Erro ao ler arquivo: {e}")
-            df = pd.DataFrame()
+        return carregar_com_cache(caminho_arquivo_fonte(), _processador(anterior), VERSAO_PROCESSAMENTO)
+    except OSError as e:
+        print(f"Erro ao ler arquivo: {e}")
+        return processar_dados(pd.DataFrame()), None, {}
+
+
+def ler_arquivo(caminho):
+    """
+    Lê o arquivo fonte (CSV ou Excel) sem processamento, só com COLUNAS_LIDAS
+    
+    Args:
+        caminho (str): Caminho do arquivo de dados
+        
+    Returns:
+        pd.DataFrame: DataFrame bruto
+    """
+    try:
+        with _fase("leitura"):
+            if caminho.endswith(".csv"):
+                return pd.read_csv(caminho, usecols=lambda c: c in COLUNAS_LIDAS, on_bad_lines='skip')
+            try:
+                # Leitor em fluxo: só as colunas usadas, Dt-Saida já convertida para data
+                return ler_xlsx(caminho, COLUNAS_LIDAS, colunas_data=["Dt-Saida"])
+            except Exception as e:
+                print(f"Erro no leitor rápido de xlsx, usando read_excel: {e}")
+                return pd.read_excel(caminho, usecols=lambda c: c in COLUNAS_LIDAS)
+    except Exception as e:
+        print(f"Erro ao ler arquivo: {e}")
+        return pd.DataFrame()
+
+
+def processar_arquivo(caminho):
+    """
+    Lê o arquivo fonte (CSV ou Excel) e aplica o processamento
+    
+    Args:
+        caminho (str): Caminho do arquivo de dados
+        
+    Returns:
+        pd.DataFrame: DataFrame processado
+    """
+    return processar_dados(ler_arquivo(caminho))
+
+
+def _assinatura_linhas(bruto, quantidade=None):
+    """Hash do conteúdo das primeiras `quantidade` linhas brutas"""
+    hashes = pd.util.hash_pandas_object(bruto.iloc[:quantidade], index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()
+
+
+def _processador(anterior):
+    """
+    Cria a função de processamento usada pelo cache
+    
+    Se as linhas já carregadas em `anterior` continuam iguais no início da
+    planilha (o arquivo só cresceu), processa apenas as linhas novas e as
+    anexa ao DataFrame existente.
+    """
+    def processar(caminho):
+        bruto = ler_arquivo(caminho)
+        extras = {"linhas_brutas": len(bruto), "assinatura_brutas": _assinatura_linhas(bruto)}
+        
+        n = anterior.extras.get("linhas_brutas", 0) if anterior else 0
+        if 0 < n <= len(bruto) and _assinatura_linhas(bruto, n) == anterior.extras.get("assinatura_brutas"):
+            novas = processar_dados(bruto.iloc[n:].copy())
+            return anexar_linhas(anterior.df, novas), extras
+        
+        return processar_dados(bruto), extras
+    
+    return processar
+
+
+def anexar_linhas(df, novas):
+    """
+    Anexa linhas já processadas ao DataFrame, refazendo a codificação categórica
+    
+    Args:
+        df (pd.DataFrame): DataFrame processado atual
+        novas (pd.DataFrame): Linhas novas processadas
+        
+    Returns:
+        pd.DataFrame: DataFrame com as linhas novas no final
+    """
+    if novas.empty:
+        return df
+    resultado = pd.concat([df, novas])
+    for col in COLUNAS_CATEGORICAS:
+        if col in resultado.columns and not isinstance(resultado[col].dtype, pd.CategoricalDtype):
+            resultado[col] = resultado[col].astype("category")
+    return resultado
+
+
+def normalizar_textos(serie):
+    """
+    Aplica strip + capitalize apenas aos valores distintos e devolve a coluna categórica
+    
+    A coluna é fatorada uma vez, o conjunto pequeno de valores únicos é
+    padronizado e os códigos são remapeados para as categorias finais
+    (ordenadas, como no astype("category")). Valores ausentes continuam nulos.
+    
+    Args:
+        serie (pd.Series): Coluna bruta de texto
+        
+    Returns:
+        pd.Series: Coluna categórica padronizada
+    """
+    codigos, unicos = pd.factorize(serie)
+    padronizados = pd.Index(unicos.astype(str), dtype="str").str.strip().str.capitalize()
+    # Valores que só diferiam em espaços/maiúsculas passam a ser a mesma categoria
+    categorias = padronizados.unique().sort_values()
+    remapa = categorias.get_indexer(padronizados)
+    codigos = np.where(codigos >= 0, remapa[codigos], -1)
+    return pd.Series(pd.Categorical.from_codes(codigos, categories=categorias), index=serie.index, name=serie.name)
+
+
+def _bruto_vazio():
+    """DataFrame bruto sem linhas, com as colunas e tipos de COLUNAS_LIDAS"""
+    tipos = {"Dt-Saida": "datetime64[us]", "Dias": "float64"}
+    return pd.DataFrame({col: pd.Series(dtype=tipos.get(col, "str")) for col in COLUNAS_LIDAS})
+
+
+def processar_dados(df):
+    """
+    Trata datas, cria colunas auxiliares e padroniza strings
+    
+    Sem a coluna Dt-Saida (ex.: planilha ausente ou ilegível) devolve um
+    DataFrame vazio com o esquema completo.
+    
+    Args:
+        df (pd.DataFrame): DataFrame bruto lido da planilha
+        
+    Returns:
+        pd.DataFrame: DataFrame processado
+    """
+    # Arquivo ausente ou ilegível (ler_arquivo devolve um DataFrame vazio):
+    # segue com as colunas esperadas e nenhuma linha
+    if "Dt-Saida" not in df.columns:
+        df = _bruto_vazio()
     
     # Tratamento de Datas
-    df["Dt-Saida"] = pd.to_datetime(df["Dt-Saida"], format="%d/%m/%Y", errors="coerce")
-    df = df.dropna(subset=["Dt-Saida"])
+    with _fase("datas"):
+        # O leitor de xlsx já entrega datas; no CSV elas vêm como texto dd/mm/aaaa
+        if not pd.api.types.is_datetime64_any_dtype(df["Dt-Saida"]):
+            df["Dt-Saida"] = pd.to_datetime(df["Dt-Saida"], format="%d/%m/%Y", errors="coerce")
+        df = df.dropna(subset=["Dt-Saida"])
+        
+        # Criando colunas auxiliares
+        df["Ano"] = df["Dt-Saida"].dt.year.astype("int16")
+        df["Mes"] = df["Dt-Saida"].dt.month.astype("int8")
+        df["Mes_nome"] = df["Mes"].map(MESES_MAP)
     
-    # Criando colunas auxiliares
-    df["Ano"] = df["Dt-Saida"].dt.year
-    df["Mes"] = df["Dt-Saida"].dt.month
-    df["Mes_nome"] = df["Mes"].map(MESES_MAP)
+    # Padronização de Strings (já sai categórica; só os valores distintos são tratados)
+    with _fase("strings"):
+        for col in COLUNAS_TEXTO:
+            if col in df.columns:
+                df[col] = normalizar_textos(df[col])
     
-    # Padronização de Strings
-    cols_str = ["Defeito", "Categoria", "Descrição", "Tipo", "Marca", "Garantia", "Reincidencia"]
-    for col in cols_str:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip().str.capitalize()
+    # Codificação categórica: menos memória e comparações/contagens sobre inteiros
+    with _fase("categorias"):
+        for col in COLUNAS_CATEGORICAS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
     
     return df
 
 
+# =====================================================================
+# CONTAGENS SOBRE CÓDIGOS CATEGÓRICOS
+# =====================================================================
+
+def contar_valores(serie):
+    """
+    Equivalente a `serie.value_counts()` calculado sobre os códigos categóricos
+    
+    Só retorna valores presentes na série e, em caso de empate, mantém a ordem
+    da primeira ocorrência (mesmo comportamento do value_counts de strings).
+    
+    Args:
+        serie (pd.Series): Coluna (categórica ou não)
+        
+    Returns:
+        pd.Series: Contagem por valor, em ordem decrescente
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.value_counts()
+    
+    codigos = serie.cat.codes.to_numpy()
+    codigos = codigos[codigos >= 0]
+    presentes, primeira = np.unique(codigos, return_index=True)
+    contagens = np.bincount(codigos, minlength=len(serie.cat.categories))[presentes]
+    ordem = np.lexsort((primeira, -contagens))
+    
+    rotulos = pd.Index(serie.cat.categories[presentes[ordem]], name=serie.name)
+    return pd.Series(contagens[ordem], index=rotulos, name="count")
+
+
+def contar_maiores(serie, k):
+    """
+    Equivalente a `contar_valores(serie).head(k)` sem ordenar todos os valores
+
+    Conta com bincount sobre os códigos categóricos e separa os k maiores com
+    partition; só esses candidatos (mais os empatados no limite) são
+    ordenados, com o mesmo desempate pela primeira ocorrência.
+
+    Args:
+        serie (pd.Series): Coluna (categórica ou não)
+        k (int): Quantidade de valores no ranking
+
+    Returns:
+        pd.Series: Contagem dos k valores mais frequentes, em ordem decrescente
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.value_counts().head(k)
+
+    codigos = serie.cat.codes.to_numpy()
+    codigos = codigos[codigos >= 0]
+    contagens = np.bincount(codigos, minlength=len(serie.cat.categories))
+    candidatos = np.flatnonzero(contagens)
+    if len(candidatos) > k:
+        # k-ésima maior contagem: entram os valores acima dela e todos os empatados com ela
+        posicao = len(candidatos) - k
+        limiar = np.partition(contagens[candidatos], posicao)[posicao]
+        candidatos = candidatos[contagens[candidatos] >= limiar]
+
+    # Candidatos na ordem da primeira ocorrência (hash, sem ordenar a série)
+    eh_candidato = np.zeros(len(contagens), dtype=bool)
+    eh_candidato[candidatos] = True
+    aparicao = pd.unique(codigos[eh_candidato[codigos]])
+    escolhidos = aparicao[np.argsort(-contagens[aparicao], kind="stable")[:k]]
+
+    rotulos = pd.Index(serie.cat.categories[escolhidos], name=serie.name)
+    return pd.Series(contagens[escolhidos], index=rotulos, name="count")
+
+
 def preparar_opcoes_filtros(df):
     """
     Prepara as opções para os filtros do dashboard
@@ -62,16 +349,16 @@ def preparar_opcoes_filtros(df):
     opcoes_categoria = [{"label": c, "value": c} for c in cats_unicas]
     
     opcoes_garantia = [{"label": "Todas", "value": "all"}] + [
-        {"label": str(g), "value": g} for g in df["Garantia"].unique() if str(g) != 'nan'
+        {"label": str(g), "value": g} for g in df["Garantia"].dropna().unique()
     ]
     
     opcoes_tipo = [{"label": "Todos", "value": "all"}] + [
-        {"label": str(t), "value": t} for t in df["Tipo"].unique() if str(t) != 'nan'
+        {"label": str(t), "value": t} for t in df["Tipo"].dropna().unique()
     ]
     
     # Opções de funcionários (para dashboard interno - apenas funcionários com consertos internos)
-    df_internos = df[df["Tipo"].str.capitalize() == "Interno"]
-    funcionarios_unicos = sorted([str(f) for f in df_internos["Nome"].dropna().unique() if str(f) != 'nan'])
+    df_internos = df[df["Tipo"] == "Interno"]
+    funcionarios_unicos = sorted(str(f) for f in df_internos["Nome"].dropna().unique())
     opcoes_funcionario = [{"label": f, "value": f} for f in funcionarios_unicos]
     
     return {
@@ -84,6 +371,171 @@ def preparar_opcoes_filtros(df):
     }
 
 
+# =====================================================================
+# DATASET VERSIONADO E RECARGA A QUENTE
+# =====================================================================
+
+class Dataset:
+    """
+    Uma versão dos dados com as estruturas derivadas (opções, índice, cubo e catálogo)
+    
+    Não é alterada depois de criada: uma recarga monta um novo Dataset e troca
+    a referência global de uma vez, então cada callback trabalha sobre uma
+    versão consistente obtida com obter_dataset().
+    """
+    
+    def __init__(self, df, versao, extras=None):
+        self.df = df
+        self.versao = versao
+        self.extras = extras or {}
+        with _fase("opcoes"):
+            self.opcoes_filtros = preparar_opcoes_filtros(df)
+        with _fase("indice"):
+            self.indice = IndiceFiltros(df)
+        with _fase("cubo"):
+            self.cubo = CuboMensal(df, self.indice)
+        with _fase("catalogo"):
+            self.catalogo = CatalogoOpcoes(self.opcoes_filtros, self.cubo)
+
+
+_dataset = None
+_lock_recarga = threading.Lock()
+_assinatura_fonte = None
+_monitor = None
+
+
+def _caminho_monitorado():
+    # No modo compartilhado o master republica os dados; o worker só observa o ponteiro
+    pasta = dados_compartilhados.pasta_ativa()
+    return dados_compartilhados.caminho_ponteiro(pasta) if pasta else caminho_arquivo_fonte()
+
+
+def _assinatura_arquivo():
+    try:
+        stat = os.stat(_caminho_monitorado())
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def obter_dataset():
+    """
+    Retorna a versão atual dos dados
+    
+    Returns:
+        Dataset: DataFrame, opções de filtros, índice, cubo e catálogo da versão atual
+    """
+    return _dataset
+
+
+def versao_atual():
+    """
+    Versão do dataset carregado (hash do arquivo fonte)
+    
+    Returns:
+        str: Identificador da versão dos dados
+    """
+    return _dataset.versao
+
+
+def _carregar_compartilhado(pasta):
+    """Mapeia o dataset publicado pelo master; cai para a carga local se não houver publicação"""
+    try:
+        return dados_compartilhados.anexar(pasta)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro ao anexar dados compartilhados: {e}")
+        return carregar_dados_versionados()
+
+
+def recarregar_dados():
+    """
+    Recarrega a planilha e publica uma nova versão se o conteúdo mudou
+    
+    Com o modo compartilhado ligado (variável DASHBOARD_DADOS_COMPARTILHADOS,
+    definida pelo gunicorn.conf.py), mapeia as colunas publicadas pelo master
+    em vez de ler a planilha.
+    
+    Returns:
+        bool: True se uma nova versão foi publicada
+    """
+    global _dataset, _assinatura_fonte
+    with _lock_recarga:
+        _tempos_carga.clear()
+        _assinatura_fonte = _assinatura_arquivo()
+        pasta = dados_compartilhados.pasta_ativa()
+        with _fase("carga"):
+            if pasta:
+                df, versao, extras = _carregar_compartilhado(pasta)
+            else:
+                df, versao, extras = carregar_dados_versionados(_dataset)
+        if _dataset is not None and versao == _dataset.versao:
+            return False
+        _dataset = Dataset(df, versao, extras)
+        return True
+
+
+def usar_dados(df, versao, extras=None):
+    """
+    Publica um DataFrame já processado como versão atual, sem ler a planilha
+    
+    Usado com dados sintéticos (benchmark_callbacks.py); o monitoramento da
+    planilha não deve estar ativo, senão uma recarga troca os dados de volta.
+    
+    Args:
+        df (pd.DataFrame): Dados no formato de processar_dados
+        versao (str): Identificador da versão (chave dos caches de callbacks)
+        extras (dict): Metadados guardados no Dataset
+        
+    Returns:
+        Dataset: A versão publicada
+    """
+    global _dataset
+    with _lock_recarga:
+        _dataset = Dataset(df, versao, extras)
+        return _dataset
+
+
+def _monitorar(intervalo):
+    while True:
+        time.sleep(intervalo)
+        if _assinatura_arquivo() == _assinatura_fonte:
+            continue
+        try:
+            if recarregar_dados():
+                print(f"Dados recarregados (versão {versao_atual()[:12]})")
+        except Exception as e:
+            print(f"Erro ao recarregar dados: {e}")
+
+
+def iniciar_monitoramento(intervalo=MONITORAMENTO_INTERVALO):
+    """
+    Inicia a thread que verifica periodicamente se a planilha mudou
+    
+    A verificação é só um stat (mtime/tamanho) do arquivo; quando ele muda, os
+    dados são recarregados em segundo plano e trocados atomicamente. No modo
+    compartilhado o arquivo observado é o ponteiro da versão publicada. Após um
+    fork (workers do gunicorn com --preload) a thread é recriada no filho.
+    
+    Args:
+        intervalo (float): Segundos entre verificações
+    """
+    global _monitor
+    if _monitor is None:
+        os.register_at_fork(after_in_child=lambda: iniciar_monitoramento(intervalo))
+    elif _monitor.is_alive():
+        return
+    _monitor = threading.Thread(target=_monitorar, args=(intervalo,), name="monitor-dados", daemon=True)
+    _monitor.start()
+
+
+def __getattr__(nome):
+    # Compatibilidade: data.df, data.opcoes_filtros, etc. refletem a versão atual
+    if nome in ("df", "opcoes_filtros", "indice", "cubo", "catalogo"):
+        return getattr(_dataset, nome)
+    if nome == "versao_dados":
+        return _dataset.versao
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
 # Carregar dados ao importar o módulo
-df = carregar_dados()
-opcoes_filtros = preparar_opcoes_filtros(df)
+recarregar_dados()
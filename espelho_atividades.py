@@ -0,0 +1,321 @@
+"""
+Espelho local (SQLite) de time_records para o dashboard de Atividades
+time_records é sincronizado de forma incremental (id acima da marca d'água);
+os callbacks filtram e agregam localmente, sem esperar a rede. Funcionários e
+funções dos filtros vêm do cache em memória do supabase_service (CacheTabela).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import supabase_service
+from supabase_config import (
+    ESPELHO_ARQUIVO, ESPELHO_INTERVALO_SYNC, ESPELHO_INTERVALO_COMPLETO
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos, cada processo sincroniza
+    fcntl = None
+
+# Colunas espelhadas de time_records (id é a marca d'água da sincronização)
+COLUNAS_ESPELHO = ["id"] + supabase_service.COLUNAS_TIME_RECORDS
+
+# Ids por requisição ao reconsultar registros em aberto (limita o tamanho da URL)
+LOTE_IDS = 200
+
+ESQUEMA = """
+create table if not exists time_records (
+    id integer primary key,
+    employee_name text,
+    function_name text,
+    start_time text,
+    duration_ms real
+);
+create index if not exists time_records_start_time on time_records (start_time);
+create table if not exists meta (chave text primary key, valor text);
+"""
+
+_estado = {
+    "sincronizacoes": 0,
+    "falhas": 0,
+    "ultimo_erro": None,
+}
+_thread = None
+_offline = False  # Espelho preenchido localmente (carregar_offline): sem sincronização
+
+
+# =====================================================================
+# CONEXÃO
+# =====================================================================
+
+def _conectar(caminho=None):
+    """Conexão de escrita (sincronização): liga o WAL e cria o esquema se preciso"""
+    caminho = caminho or ESPELHO_ARQUIVO
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    conexao = sqlite3.connect(caminho, timeout=30)
+    # WAL: leituras dos callbacks não esperam a escrita da sincronização
+    conexao.execute("pragma journal_mode=wal")
+    conexao.executescript(ESQUEMA)
+    return conexao
+
+
+def _conectar_leitura(caminho=None):
+    """
+    Conexão somente leitura para as consultas dos callbacks
+
+    Não roda DDL nem pragmas que precisem da trava de escrita: o esquema e o
+    WAL são criados pela sincronização (ou por carregar_offline). Falha com
+    sqlite3.OperationalError se o arquivo ainda não existe.
+    """
+    caminho = caminho or ESPELHO_ARQUIVO
+    return sqlite3.connect(Path(caminho).resolve().as_uri() + "?mode=ro", uri=True, timeout=30)
+
+
+def _ler_meta(conexao, chave, padrao=None):
+    linha = conexao.execute("select valor from meta where chave = ?", (chave,)).fetchone()
+    return linha[0] if linha else padrao
+
+
+def _gravar_meta(conexao, chave, valor):
+    conexao.execute("insert or replace into meta (chave, valor) values (?, ?)", (chave, str(valor)))
+
+
+# =====================================================================
+# SINCRONIZAÇÃO
+# =====================================================================
+
+def _linhas_time_records(paginas):
+    for pagina in paginas:
+        yield [tuple(linha.get(col) for col in COLUNAS_ESPELHO) for linha in pagina]
+
+
+def _inserir_time_records(conexao, paginas):
+    quantidade = 0
+    for linhas in _linhas_time_records(paginas):
+        conexao.executemany(
+            f"insert or replace into time_records ({', '.join(COLUNAS_ESPELHO)}) values (?, ?, ?, ?, ?)",
+            linhas
+        )
+        quantidade += len(linhas)
+    return quantidade
+
+
+def sincronizar(completo=False, caminho=None):
+    """
+    Atualiza o espelho a partir do Supabase
+
+    Incremental: busca os registros com id acima da maior id local e
+    reconsulta os registros ainda em aberto (duration_ms nulo), que são
+    completados depois de inseridos. Completo: baixa a tabela inteira e
+    substitui a cópia local (captura edições e exclusões).
+
+    Args:
+        completo (bool): Força a ressincronização completa
+        caminho (str): Arquivo SQLite (padrão: ESPELHO_ARQUIVO)
+
+    Returns:
+        int: Quantidade de registros de time_records gravados
+    """
+    colunas = ",".join(COLUNAS_ESPELHO)
+    conexao = _conectar(caminho)
+    try:
+        ultima_completa = float(_ler_meta(conexao, "ultima_completa", 0))
+        completo = completo or time.time() - ultima_completa >= ESPELHO_INTERVALO_COMPLETO
+
+        # Tudo que vem da rede é lido antes de abrir a transação de escrita
+        if completo:
+            novas = list(supabase_service.iterar_paginas_time_records(colunas))
+            reabertas = []
+        else:
+            marca = conexao.execute("select max(id) from time_records").fetchone()[0]
+            novas = list(supabase_service.iterar_paginas_time_records(colunas, apos_id=marca))
+            em_aberto = [linha[0] for linha in conexao.execute(
+                "select id from time_records where duration_ms is null"
+            )]
+            reabertas = []
+            for inicio in range(0, len(em_aberto), LOTE_IDS):
+                reabertas.extend(supabase_service.iterar_paginas_time_records(
+                    colunas, ids=em_aberto[inicio:inicio + LOTE_IDS]
+                ))
+
+        with conexao:
+            if completo:
+                conexao.execute("delete from time_records")
+            quantidade = _inserir_time_records(conexao, novas + reabertas)
+            agora = time.time()
+            _gravar_meta(conexao, "ultima_sincronizacao", agora)
+            if completo:
+                _gravar_meta(conexao, "ultima_completa", agora)
+        return quantidade
+    finally:
+        conexao.close()
+
+
+def _sincronizar_com_trava():
+    """Sincroniza se nenhum outro processo (worker) estiver sincronizando"""
+    caminho_trava = ESPELHO_ARQUIVO + ".lock"
+    os.makedirs(os.path.dirname(caminho_trava) or ".", exist_ok=True)
+    with open(caminho_trava, "w") as trava:
+        if fcntl is not None:
+            try:
+                fcntl.flock(trava, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return
+        try:
+            sincronizar()
+            _estado["sincronizacoes"] += 1
+        except Exception as e:
+            _estado["falhas"] += 1
+            _estado["ultimo_erro"] = str(e)
+            print(f"Erro ao sincronizar espelho de atividades: {e}")
+
+
+def _laco_sincronizacao(intervalo):
+    while True:
+        _sincronizar_com_trava()
+        time.sleep(intervalo)
+
+
+def iniciar_sincronizacao(intervalo=ESPELHO_INTERVALO_SYNC):
+    """
+    Inicia a thread que mantém o espelho atualizado
+
+    Com vários workers, uma trava de arquivo garante que só um deles
+    sincroniza a cada rodada; todos leem o mesmo arquivo SQLite.
+
+    Args:
+        intervalo (float): Segundos entre sincronizações
+    """
+    global _thread
+    if _offline:
+        return
+    if _thread is None:
+        os.register_at_fork(after_in_child=lambda: iniciar_sincronizacao(intervalo))
+    elif _thread.is_alive():
+        return
+    _thread = threading.Thread(target=_laco_sincronizacao, args=(intervalo,), name="espelho-atividades",
+                               daemon=True)
+    _thread.start()
+
+
+def carregar_offline(registros, caminho):
+    """
+    Preenche um espelho novo com registros prontos e passa a usá-lo
+
+    Para rodar sem rede (benchmark_callbacks.py com dados sintéticos): a
+    sincronização com o Supabase fica desligada neste processo.
+
+    Args:
+        registros (list): Dicionários com as colunas de COLUNAS_ESPELHO
+        caminho (str): Arquivo SQLite (substituído se existir)
+    """
+    global ESPELHO_ARQUIVO, _offline
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+    conexao = _conectar(caminho)
+    try:
+        with conexao:
+            _inserir_time_records(conexao, [registros])
+            _gravar_meta(conexao, "ultima_sincronizacao", time.time())
+    finally:
+        conexao.close()
+    ESPELHO_ARQUIVO = caminho
+    _offline = True
+
+
+# =====================================================================
+# CONSULTAS LOCAIS
+# =====================================================================
+
+def disponivel(caminho=None):
+    """True se o espelho já foi sincronizado ao menos uma vez"""
+    caminho = caminho or ESPELHO_ARQUIVO
+    if not os.path.exists(caminho):
+        return False
+    try:
+        conexao = _conectar_leitura(caminho)
+        try:
+            return _ler_meta(conexao, "ultima_sincronizacao") is not None
+        finally:
+            conexao.close()
+    except sqlite3.Error:
+        return False
+
+
+def _filtros_sql(filtro_funcionarios=None, filtro_funcoes=None, data_inicio=None, data_fim=None):
+    """Mesmos filtros de supabase_service._filtrar_time_records, em SQL"""
+    condicoes, parametros = [], []
+    if filtro_funcionarios:
+        condicoes.append(f"employee_name in ({', '.join('?' * len(filtro_funcionarios))})")
+        parametros.extend(filtro_funcionarios)
+    if filtro_funcoes:
+        condicoes.append(f"function_name in ({', '.join('?' * len(filtro_funcoes))})")
+        parametros.extend(filtro_funcoes)
+    if data_inicio:
+        condicoes.append("start_time >= ?")
+        parametros.append(data_inicio)
+    if data_fim:
+        condicoes.append("start_time <= ?")
+        parametros.append(data_fim + 'T23:59:59')
+    return (" where " + " and ".join(condicoes)) if condicoes else "", parametros
+
+
+def get_resumo_time_records(caminho=None, **filtros):
+    """
+    Totais por funcionário/função calculados no espelho local
+
+    Mesmo formato de supabase_service.get_resumo_time_records, então os
+    cálculos de KPIs e distribuições funcionam sem mudanças.
+
+    Args:
+        caminho (str): Arquivo SQLite (padrão: ESPELHO_ARQUIVO)
+        **filtros: filtro_funcionarios, filtro_funcoes, data_inicio, data_fim
+
+    Returns:
+        pd.DataFrame: Colunas employee_name, function_name, registros e duration_ms (soma)
+    """
+    where, parametros = _filtros_sql(**filtros)
+    where += (" and " if where else " where ") + "duration_ms > 0"
+    conexao = _conectar_leitura(caminho)
+    try:
+        return pd.read_sql_query(
+            "select employee_name, function_name, count(*) as registros, sum(duration_ms) as duration_ms"
+            f" from time_records{where} group by employee_name, function_name",
+            conexao, params=parametros
+        )
+    finally:
+        conexao.close()
+
+
+def estatisticas(caminho=None):
+    """
+    Situação do espelho
+
+    Returns:
+        dict: idade da última sincronização, linhas, marca d'água e falhas
+    """
+    resultado = dict(_estado)
+    if not os.path.exists(caminho or ESPELHO_ARQUIVO):
+        return resultado
+    try:
+        conexao = _conectar_leitura(caminho)
+        try:
+            ultima = _ler_meta(conexao, "ultima_sincronizacao")
+            linhas, marca = conexao.execute("select count(*), max(id) from time_records").fetchone()
+        finally:
+            conexao.close()
+        resultado.update({
+            "idade_segundos": round(time.time() - float(ultima), 1) if ultima else None,
+            "linhas": linhas,
+            "marca_id": marca,
+        })
+    except sqlite3.Error as e:
+        resultado["ultimo_erro"] = str(e)
+    return resultado
@@ -0,0 +1,33 @@
+"""
+Configuração do gunicorn (gunicorn app:server)
+
+Com DADOS_COMPARTILHADOS ligado, o master publica o dataset uma única vez em
+arquivos mapeados em memória e os workers apenas anexam a essas colunas:
+o DataFrame não é duplicado por worker e um worker novo sobe sem ler a planilha.
+"""
+
+import os
+
+import dados_compartilhados
+from config import DADOS_COMPARTILHADOS, MONITORAMENTO_ATIVO
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+# Threads por worker (gthread): um callback esperando o Supabase não prende o worker inteiro
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+
+def on_starting(server):
+    if not DADOS_COMPARTILHADOS:
+        return
+    pasta = dados_compartilhados.pasta_padrao()
+    if dados_compartilhados.publicar_em_processo_separado(pasta):
+        # Herdada pelos workers: data.py passa a anexar em vez de carregar
+        os.environ[dados_compartilhados.VARIAVEL_AMBIENTE] = pasta
+    else:
+        server.log.warning("Falha ao publicar dados compartilhados; cada worker carrega os próprios dados")
+
+
+def when_ready(server):
+    if MONITORAMENTO_ATIVO and dados_compartilhados.pasta_ativa():
+        dados_compartilhados.iniciar_republicacao()
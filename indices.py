@@ -0,0 +1,247 @@
+"""
+Índices pré-computados para filtragem rápida do dataset de consertos
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Colunas usadas nos filtros das páginas
+COLUNAS_INDEXADAS = ("Ano", "Mes", "Categoria", "Garantia", "Tipo", "Nome")
+
+# Até essa cardinalidade cada valor guarda um bitmap pronto; acima, só as posições
+LIMITE_BITMAP = 64
+
+# Consultas de busca guardadas no cache do IndiceBusca
+MAX_CONSULTAS_CACHE = 1024
+
+
+def _posicoes_por_codigo(codigos, quantidade):
+    """Agrupa as posições das linhas por código (códigos negativos = nulos são ignorados)"""
+    ordem = np.argsort(codigos, kind="stable")
+    contagens = np.bincount(codigos[codigos >= 0], minlength=quantidade)
+    inicio = np.searchsorted(codigos[ordem], 0)
+    return np.split(ordem[inicio:], np.cumsum(contagens)[:-1])
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _sem_filtro(valor):
+    """Indica se o valor de um filtro significa 'todos'"""
+    if valor is None or (isinstance(valor, str) and valor == "all"):
+        return True
+    return isinstance(valor, (list, tuple)) and len(valor) == 0
+
+
+class IndiceFiltros:
+    """
+    Índice de máscaras booleanas por valor de filtro
+
+    Para cada valor de Ano, Mes, Categoria, Garantia, Tipo e Nome guarda as
+    posições das linhas (e um bitmap, para colunas de baixa cardinalidade).
+    Uma combinação de filtros vira alguns ANDs entre arrays booleanos, sem
+    varrer nem copiar o DataFrame inteiro.
+    """
+
+    def __init__(self, df, colunas=COLUNAS_INDEXADAS):
+        self.df = df
+        self.n = len(df)
+        self._posicoes = {}
+        self._bitmaps = {}
+        self.busca = IndiceBusca(df["Descrição"]) if "Descrição" in df.columns else None
+
+        for col in colunas:
+            if col not in df.columns:
+                continue
+            codigos, valores = pd.factorize(df[col])
+            grupos = _posicoes_por_codigo(codigos, len(valores))
+            self._posicoes[col] = dict(zip(valores.tolist(), grupos))
+
+            if len(valores) <= LIMITE_BITMAP:
+                bitmaps = {}
+                for i, valor in enumerate(valores.tolist()):
+                    bitmap = codigos == i
+                    bitmap.flags.writeable = False  # compartilhado entre callbacks
+                    bitmaps[valor] = bitmap
+                self._bitmaps[col] = bitmaps
+
+    # =================================================================
+    # MÁSCARAS
+    # =================================================================
+
+    def mascara_valores(self, coluna, valores):
+        """
+        Máscara das linhas cuja coluna está em `valores`
+
+        Args:
+            coluna (str): Nome da coluna indexada
+            valores (list): Valores aceitos
+
+        Returns:
+            np.ndarray: Máscara booleana com uma posição por linha (somente leitura)
+        """
+        if not isinstance(valores, (list, tuple)):
+            valores = [valores]
+
+        bitmaps = self._bitmaps.get(coluna)
+        if bitmaps is not None and len(valores) == 1 and valores[0] in bitmaps:
+            return bitmaps[valores[0]]
+
+        mascara = np.zeros(self.n, dtype=bool)
+        posicoes = self._posicoes[coluna]
+        for valor in valores:
+            pos = posicoes.get(valor)
+            if pos is not None:
+                mascara[pos] = True
+        return mascara
+
+    def mascara_busca(self, busca):
+        """Máscara das linhas cujo modelo (Descrição) contém o texto buscado"""
+        return self.busca.mascara(busca)
+
+    def mascara_base(self, busca=None, categorias=None, garantia=None, tipo=None, nomes=None):
+        """
+        Combina os filtros que não dependem do período
+
+        Args:
+            busca (str): Texto buscado no modelo
+            categorias (list): Categorias selecionadas
+            garantia (str): Valor de garantia ou 'all'
+            tipo (str): Tipo do conserto ou 'all'
+            nomes (list): Funcionários selecionados
+
+        Returns:
+            np.ndarray: Máscara booleana (None quando nenhum filtro está ativo)
+        """
+        mascaras = []
+        if busca:
+            mascaras.append(self.mascara_busca(busca))
+        for coluna, valor in (("Categoria", categorias), ("Garantia", garantia),
+                              ("Tipo", tipo), ("Nome", nomes)):
+            if not _sem_filtro(valor):
+                mascaras.append(self.mascara_valores(coluna, valor))
+        return self._combinar(mascaras)
+
+    def mascara_periodo(self, ano=None, meses=None):
+        """
+        Máscara do período (ano e meses)
+
+        Args:
+            ano (int): Ano selecionado ou 'all'
+            meses (list): Meses selecionados
+
+        Returns:
+            np.ndarray: Máscara booleana (None quando não há filtro de período)
+        """
+        mascaras = []
+        if not _sem_filtro(ano):
+            mascaras.append(self.mascara_valores("Ano", ano))
+        if not _sem_filtro(meses):
+            mascaras.append(self.mascara_valores("Mes", meses))
+        return self._combinar(mascaras)
+
+    @staticmethod
+    def _combinar(mascaras):
+        if not mascaras:
+            return None
+        resultado = mascaras[0]
+        for mascara in mascaras[1:]:
+            resultado = resultado & mascara
+        return resultado
+
+    # =================================================================
+    # FATIAS DO DATAFRAME
+    # =================================================================
+
+    def linhas(self, *mascaras):
+        """
+        Retorna as linhas que satisfazem todas as máscaras (None = sem filtro)
+
+        Returns:
+            pd.DataFrame: Fatia do DataFrame indexado
+        """
+        mascara = self._combinar([m for m in mascaras if m is not None])
+        if mascara is None:
+            return self.df
+        return self.df.iloc[np.flatnonzero(mascara)]
+
+
+class IndiceBusca:
+    """
+    Índice de trigramas para busca por substring em uma coluna de texto
+
+    Indexa apenas os valores distintos (modelos): cada trigrama aponta para
+    os valores que o contêm e cada valor já conhece as posições das suas
+    linhas. A busca é literal e sem diferenciar maiúsculas/minúsculas; os
+    valores que casam com cada consulta ficam em um cache LRU.
+    """
+
+    def __init__(self, serie, max_consultas=MAX_CONSULTAS_CACHE):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.codes.to_numpy()
+            valores = serie.cat.categories
+        else:
+            codigos, valores = pd.factorize(serie)
+
+        self.n = len(serie)
+        self._valores = [str(v).lower() for v in valores]
+        self._posicoes = _posicoes_por_codigo(codigos, len(valores))
+        self._max_consultas = max_consultas
+        self._consultas = OrderedDict()
+        self._lock = threading.Lock()
+
+        indice = {}
+        for codigo, valor in enumerate(self._valores):
+            for trigrama in _trigramas(valor):
+                indice.setdefault(trigrama, []).append(codigo)
+        self._trigramas = {t: frozenset(c) for t, c in indice.items()}
+
+    def codigos(self, consulta):
+        """
+        Códigos dos valores distintos que contêm a consulta
+
+        Args:
+            consulta (str): Texto buscado
+
+        Returns:
+            list: Códigos (posições nas categorias) dos valores encontrados
+        """
+        consulta = consulta.lower()
+        with self._lock:
+            if consulta in self._consultas:
+                self._consultas.move_to_end(consulta)
+                return self._consultas[consulta]
+
+        if len(consulta) < 3:
+            candidatos = range(len(self._valores))
+        else:
+            conjuntos = sorted(
+                (self._trigramas.get(t, frozenset()) for t in _trigramas(consulta)), key=len
+            )
+            candidatos = sorted(frozenset.intersection(*conjuntos))
+        encontrados = [c for c in candidatos if consulta in self._valores[c]]
+
+        with self._lock:
+            self._consultas[consulta] = encontrados
+            while len(self._consultas) > self._max_consultas:
+                self._consultas.popitem(last=False)
+        return encontrados
+
+    def posicoes(self, consulta):
+        """Posições (ordenadas) das linhas cujo valor contém a consulta"""
+        grupos = [self._posicoes[c] for c in self.codigos(consulta)]
+        if not grupos:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(grupos))
+
+    def mascara(self, consulta):
+        """Máscara booleana das linhas cujo valor contém a consulta"""
+        mascara = np.zeros(self.n, dtype=bool)
+        for codigo in self.codigos(consulta):
+            mascara[self._posicoes[codigo]] = True
+        return mascara
@@ -0,0 +1,254 @@
+"""
+Leitura rápida de planilhas .xlsx (somente leitura, em fluxo)
+Lê o XML da planilha direto do arquivo zip numa passada do expat (estilo
+SAX), guardando apenas as colunas pedidas e convertendo as datas durante a
+leitura, sem montar o modelo de células completo do openpyxl.
+"""
+
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+import numpy as np
+import pandas as pd
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PACOTE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+TAG_TEXTO = NS + "t"
+TAG_SI = NS + "si"
+TAG_TRECHO = NS + "r"
+
+# Dia zero das datas seriais do Excel (sistema 1900, com o falso 29/02/1900, e 1904)
+ORIGEM_1900 = np.datetime64("1899-12-30")
+ORIGEM_1904 = np.datetime64("1904-01-01")
+
+_DIGITOS = "0123456789"
+
+
+# =====================================================================
+# ESTRUTURA DO ARQUIVO
+# =====================================================================
+
+def _caminho_planilha(zip_xlsx, planilha):
+    """Caminho do XML da planilha (por posição ou nome) e se o arquivo usa datas 1904"""
+    workbook = ET.fromstring(zip_xlsx.read("xl/workbook.xml"))
+    propriedades = workbook.find(NS + "workbookPr")
+    data_1904 = propriedades is not None and propriedades.get("date1904") in ("1", "true")
+
+    planilhas = workbook.find(NS + "sheets").findall(NS + "sheet")
+    if isinstance(planilha, int):
+        escolhida = planilhas[planilha]
+    else:
+        escolhida = next(p for p in planilhas if p.get("name") == planilha)
+
+    relacoes = ET.fromstring(zip_xlsx.read("xl/_rels/workbook.xml.rels"))
+    alvo = next(r.get("Target") for r in relacoes.iter(NS_PACOTE + "Relationship")
+                if r.get("Id") == escolhida.get(NS_REL + "id"))
+    caminho = alvo.lstrip("/") if alvo.startswith("/") else posixpath.normpath(posixpath.join("xl", alvo))
+    return caminho, data_1904
+
+
+def _textos_compartilhados(zip_xlsx):
+    """Tabela sharedStrings (texto de cada <si>, juntando os trechos com formatação)"""
+    if "xl/sharedStrings.xml" not in zip_xlsx.namelist():
+        return []
+    textos = []
+    with zip_xlsx.open("xl/sharedStrings.xml") as arquivo:
+        for _, elem in ET.iterparse(arquivo):
+            if elem.tag == TAG_SI:
+                textos.append(_texto_si(elem))
+                elem.clear()
+    return textos
+
+
+def _texto_si(si):
+    # Texto simples (<t>) ou trechos com formatação (<r><t>); guias fonéticas (<rPh>) ficam de fora
+    texto = si.find(TAG_TEXTO)
+    if texto is not None:
+        return texto.text or ""
+    return "".join(trecho.findtext(TAG_TEXTO) or "" for trecho in si.iter(TAG_TRECHO))
+
+
+def _indice_coluna(letras):
+    indice = 0
+    for letra in letras:
+        indice = indice * 26 + ord(letra) - 64
+    return indice - 1
+
+
+# =====================================================================
+# LEITURA
+# =====================================================================
+
+def _converter(texto, tipo, textos):
+    if tipo == "s":
+        texto = textos[int(texto)]
+    elif tipo == "b":
+        return texto == "1"
+    elif tipo == "e":
+        return None
+    elif tipo not in ("str", "inlineStr"):
+        # Numérico: inteiro quando escrito sem parte decimal (como o openpyxl)
+        if "." in texto or "E" in texto or "e" in texto:
+            return float(texto)
+        return int(texto)
+    # Texto vazio conta como célula vazia (como no read_excel)
+    return texto or None
+
+
+class _LeitorPlanilha:
+    """
+    Handler do expat para o XML de uma planilha (uma passada, estilo SAX)
+
+    Só o texto de <v> (ou <is><t>) das células das colunas selecionadas é
+    acumulado. Para chamar o Python o mínimo possível não há handler de fim
+    de elemento: a célula é fechada quando começa a próxima (ou a próxima
+    linha), e o texto só é capturado até o início de outro elemento.
+    """
+
+    def __init__(self, textos, colunas, prefixo=""):
+        self.textos = textos
+        self.colunas = colunas
+        self.cabecalho = None   # letras da coluna -> nome
+        self.selecionadas = {}  # letras da coluna -> lista de valores
+        self.linhas = 0
+        # Nomes dos elementos com o prefixo usado no arquivo (ex.: <c> ou <x:c>)
+        self._c, self._row, self._v, self._t = (prefixo + nome for nome in ("c", "row", "v", "t"))
+        self._celulas = None
+        self._coluna = None
+        self._tipo = None
+        self._partes = []
+        self._capturando = False
+
+    def inicio(self, nome, atributos):
+        if nome == self._c:
+            if self._coluna is not None:
+                self._fechar_celula()
+            letras = atributos["r"].rstrip(_DIGITOS)
+            if self.cabecalho is None or letras in self.selecionadas:
+                self._coluna = letras
+                self._tipo = atributos.get("t")
+                self._partes = []
+            self._capturando = False
+        elif nome == self._v or nome == self._t:
+            self._capturando = self._coluna is not None
+        elif nome == self._row:
+            self.concluir()
+            self._celulas = {}
+        else:
+            self._capturando = False
+
+    def texto(self, dados):
+        if self._capturando:
+            self._partes.append(dados)
+
+    def _fechar_celula(self):
+        texto = "".join(self._partes)
+        self._celulas[self._coluna] = _converter(texto, self._tipo, self.textos) if texto else None
+        self._coluna = None
+
+    def concluir(self):
+        """Fecha a linha em andamento (chamado no início de cada linha e no fim do arquivo)"""
+        if self._coluna is not None:
+            self._fechar_celula()
+        self._capturando = False
+        celulas, self._celulas = self._celulas, None
+        if celulas is None:
+            return
+        if self.cabecalho is None:
+            self.cabecalho = {letras: str(nome) for letras, nome in celulas.items() if nome is not None}
+            self.selecionadas = {
+                letras: [] for letras, nome in self.cabecalho.items()
+                if self.colunas is None or nome in self.colunas
+            }
+        elif any(v is not None for v in celulas.values()):
+            for letras, valores in self.selecionadas.items():
+                valores.append(celulas.get(letras))
+            self.linhas += 1
+
+
+def _prefixo(inicio_xml):
+    """Prefixo de namespace do elemento raiz (ex.: 'x:' em <x:worksheet>), ou ''"""
+    encontrado = re.search(rb"<(?:([A-Za-z_][\w.-]*):)?worksheet[\s>]", inicio_xml)
+    return encontrado.group(1).decode() + ":" if encontrado and encontrado.group(1) else ""
+
+
+def _coluna_datas(valores, origem, formato_data):
+    """Seriais do Excel viram datas; textos são lidos com `formato_data`; o resto vira NaT"""
+    seriais = np.array([v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+                        for v in valores], dtype="float64")
+    # Resolução de segundos: seriais com fração de dia (horas) são preservados.
+    # Só os seriais válidos passam pelo cast para inteiro (NaN não tem inteiro)
+    validos = ~np.isnan(seriais)
+    datas = np.full(len(seriais), np.datetime64("NaT"), dtype="datetime64[us]")
+    segundos = (seriais[validos] * 86400).round().astype("int64")
+    datas[validos] = (origem + segundos.astype("timedelta64[s]")).astype("datetime64[us]")
+
+    textos = [i for i, v in enumerate(valores) if isinstance(v, str)]
+    if textos:
+        convertidas = pd.to_datetime(pd.Series([valores[i] for i in textos]), format=formato_data, errors="coerce")
+        datas[textos] = convertidas.to_numpy(dtype="datetime64[us]")
+    return pd.Series(datas)
+
+
+def _coluna(valores):
+    """Monta a coluna com o tipo mais estreito: inteiro, decimal, texto ou misto"""
+    presentes = [v for v in valores if v is not None]
+    if presentes and all(isinstance(v, int) and not isinstance(v, bool) for v in presentes):
+        if len(presentes) == len(valores):
+            return pd.Series(valores, dtype="int64")
+        return pd.Series([np.nan if v is None else v for v in valores], dtype="float64")
+    if presentes and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in presentes):
+        return pd.Series([np.nan if v is None else v for v in valores], dtype="float64")
+    if all(isinstance(v, str) for v in presentes):
+        return pd.Series(valores, dtype="str")
+    return pd.Series(valores, dtype=object)
+
+
+def ler_xlsx(caminho, colunas=None, colunas_data=(), planilha=0, formato_data="%d/%m/%Y"):
+    """
+    Lê uma planilha .xlsx em fluxo, apenas com as colunas pedidas
+
+    A primeira linha é o cabeçalho. Células das colunas não pedidas são
+    descartadas sem conversão. As colunas de `colunas_data` já saem como
+    datetime64: seriais do Excel são convertidos e textos são interpretados
+    com `formato_data` (valores inválidos viram NaT).
+
+    Args:
+        caminho (str): Arquivo .xlsx
+        colunas (list): Nomes das colunas a ler (None = todas)
+        colunas_data (list): Colunas convertidas para data durante a leitura
+        planilha (int | str): Posição ou nome da planilha
+        formato_data (str): Formato das datas gravadas como texto
+
+    Returns:
+        pd.DataFrame: Colunas na ordem do cabeçalho da planilha
+    """
+    with zipfile.ZipFile(caminho) as zip_xlsx:
+        caminho_planilha, data_1904 = _caminho_planilha(zip_xlsx, planilha)
+        textos = _textos_compartilhados(zip_xlsx)
+
+        with zip_xlsx.open(caminho_planilha) as arquivo:
+            leitor = _LeitorPlanilha(textos, colunas, _prefixo(arquivo.peek(4096)[:4096]))
+            # Sem processamento de namespaces: o expat fica duas vezes mais rápido
+            parser = expat.ParserCreate()
+            parser.buffer_text = True
+            parser.StartElementHandler = leitor.inicio
+            parser.CharacterDataHandler = leitor.texto
+            parser.ParseFile(arquivo)
+        leitor.concluir()
+
+    if leitor.cabecalho is None:
+        return pd.DataFrame(columns=colunas or [])
+
+    origem = ORIGEM_1904 if data_1904 else ORIGEM_1900
+    dados = {}
+    for letras in sorted(leitor.selecionadas, key=_indice_coluna):
+        nome = leitor.cabecalho[letras]
+        valores = leitor.selecionadas[letras]
+        dados[nome] = _coluna_datas(valores, origem, formato_data) if nome in colunas_data else _coluna(valores)
+    return pd.DataFrame(dados, index=pd.RangeIndex(leitor.linhas))
@@ -0,0 +1,256 @@
+"""
+Métricas de latência dos callbacks do dashboard
+Tempo de cada etapa (filtro, KPIs, MoM/YoY, figuras, serialização...) e
+tamanho das respostas, em buffers circulares por processo, com p50/p95/p99
+expostos em /metrics no formato texto do Prometheus.
+
+Com METRICAS_ATIVAS desligado, medir_callback devolve a própria função e
+etapa() devolve um contexto vazio: nada é medido nem guardado.
+"""
+
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+import numpy as np
+from flask import g, has_request_context
+
+from config import METRICAS_ATIVAS, METRICAS_AMOSTRAS
+
+QUANTIS = (0.5, 0.95, 0.99)
+
+# Callback em execução na thread/contexto atual (etapa() registra nele)
+_callback_atual = ContextVar("callback_atual", default=None)
+_SEM_MEDICAO = nullcontext()
+
+_lock = threading.Lock()
+_duracoes = {}   # (callback, etapa) -> SerieAmostras (segundos)
+_tamanhos = {}   # callback -> SerieAmostras (bytes da resposta)
+
+
+class SerieAmostras:
+    """
+    Amostras recentes de uma medida (buffer circular) mais soma e contagem totais
+
+    Os percentis usam só as últimas `max_amostras` amostras; soma e contagem
+    acumulam desde o início do processo (semântica de summary do Prometheus).
+    """
+
+    def __init__(self, max_amostras=METRICAS_AMOSTRAS):
+        self.amostras = deque(maxlen=max_amostras)
+        self.soma = 0.0
+        self.contagem = 0
+
+    def registrar(self, valor):
+        self.amostras.append(valor)
+        self.soma += valor
+        self.contagem += 1
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Percentis das amostras recentes, soma e contagem
+        """
+        percentis = np.percentile(np.fromiter(self.amostras, float), [q * 100 for q in QUANTIS])
+        return {
+            "quantis": dict(zip(QUANTIS, percentis.tolist())),
+            "soma": self.soma,
+            "contagem": self.contagem,
+        }
+
+
+# =====================================================================
+# REGISTRO
+# =====================================================================
+
+def _registrar(series, chave, valor):
+    with _lock:
+        serie = series.get(chave)
+        if serie is None:
+            serie = series[chave] = SerieAmostras()
+        serie.registrar(valor)
+
+
+def registrar_duracao(callback, etapa, segundos):
+    """Registra a duração de uma etapa de um callback"""
+    _registrar(_duracoes, (callback, etapa), segundos)
+
+
+def registrar_tamanho(callback, tamanho):
+    """Registra o tamanho (bytes) de uma resposta de um callback"""
+    _registrar(_tamanhos, callback, tamanho)
+
+
+@contextmanager
+def _medir_etapa(callback, nome):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_duracao(callback, nome, time.perf_counter() - inicio)
+
+
+def etapa(nome):
+    """
+    Contexto que mede uma etapa do callback em execução
+
+    Fora de um callback decorado com medir_callback (ou com as métricas
+    desligadas) não mede nada.
+
+    Args:
+        nome (str): Nome da etapa (ex.: "filtro", "kpis", "figuras")
+
+    Ex.:
+        with etapa("kpis"):
+            kpis = cubo.kpis(...)
+    """
+    callback = _callback_atual.get() if METRICAS_ATIVAS else None
+    if callback is None:
+        return _SEM_MEDICAO
+    return _medir_etapa(callback, nome)
+
+
+def medir_callback(nome):
+    """
+    Decorador que mede o tempo total de um callback Dash (etapa "total")
+
+    Usar logo abaixo do @callback (acima do memoizar_callback, para contar
+    também as respostas vindas do cache). As etapas internas são marcadas
+    com `etapa()`; o tamanho da resposta e o tempo da requisição inteira
+    (incluindo a serialização feita pelo Dash) vêm dos ganchos de instalar().
+
+    Args:
+        nome (str): Nome do callback nas métricas
+    """
+    def decorador(func):
+        if not METRICAS_ATIVAS:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if has_request_context():
+                g.metricas_callback = nome
+            token = _callback_atual.set(nome)
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registrar_duracao(nome, "total", time.perf_counter() - inicio)
+                _callback_atual.reset(token)
+
+        return wrapper
+
+    return decorador
+
+
+# =====================================================================
+# REQUISIÇÕES DO DASH
+# =====================================================================
+
+def instalar(server):
+    """
+    Mede cada requisição de callback no servidor Flask
+
+    Registra a etapa "requisicao" (da chegada ao envio, com a serialização do
+    Dash) e o tamanho da resposta, atribuídos ao callback medido na requisição.
+
+    Args:
+        server (flask.Flask): Servidor do app Dash
+    """
+    if not METRICAS_ATIVAS:
+        return
+
+    @server.before_request
+    def _inicio_requisicao():
+        g.metricas_inicio = time.perf_counter()
+
+    @server.after_request
+    def _fim_requisicao(resposta):
+        callback = g.get("metricas_callback")
+        if callback is not None:
+            registrar_duracao(callback, "requisicao", time.perf_counter() - g.metricas_inicio)
+            tamanho = resposta.calculate_content_length()
+            if tamanho is not None:
+                registrar_tamanho(callback, tamanho)
+        return resposta
+
+
+# =====================================================================
+# EXPOSIÇÃO
+# =====================================================================
+
+def _rotulos(**rotulos):
+    pares = []
+    for chave, valor in rotulos.items():
+        valor = str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pares.append(f'{chave}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+def _summary(linhas, nome, descricao, series):
+    linhas.append(f"# HELP {nome} {descricao}")
+    linhas.append(f"# TYPE {nome} summary")
+    for rotulos, serie in series:
+        resumo = serie.resumo()
+        for quantil, valor in resumo["quantis"].items():
+            linhas.append(f"{nome}{_rotulos(**rotulos, quantile=quantil)} {valor:.6g}")
+        linhas.append(f"{nome}_sum{_rotulos(**rotulos)} {resumo['soma']:.6g}")
+        linhas.append(f"{nome}_count{_rotulos(**rotulos)} {resumo['contagem']}")
+
+
+def estatisticas():
+    """
+    Resumo das séries registradas neste processo
+
+    Returns:
+        dict: {"etapas": {callback: {etapa: resumo}}, "tamanhos": {callback: resumo}}
+    """
+    with _lock:
+        etapas = {}
+        for (callback, nome), serie in _duracoes.items():
+            etapas.setdefault(callback, {})[nome] = serie.resumo()
+        return {
+            "etapas": etapas,
+            "tamanhos": {callback: serie.resumo() for callback, serie in _tamanhos.items()},
+        }
+
+
+def texto_prometheus(caches=None):
+    """
+    Métricas no formato texto do Prometheus (0.0.4)
+
+    Os valores são do processo que atendeu a requisição (cada worker do
+    gunicorn tem os próprios buffers).
+
+    Args:
+        caches (dict): Contadores dos caches de callbacks (cache_callbacks.estatisticas())
+
+    Returns:
+        str: Corpo da resposta de /metrics
+    """
+    with _lock:
+        duracoes = [({"callback": c, "etapa": e}, s) for (c, e), s in sorted(_duracoes.items())]
+        tamanhos = [({"callback": c}, s) for c, s in sorted(_tamanhos.items())]
+        linhas = []
+        _summary(linhas, "dashboard_callback_etapa_segundos",
+                 "Duração das etapas dos callbacks (percentis das amostras recentes)", duracoes)
+        _summary(linhas, "dashboard_callback_resposta_bytes",
+                 "Tamanho das respostas dos callbacks", tamanhos)
+
+    if caches:
+        linhas.append("# HELP dashboard_cache_callbacks_total Consultas aos caches de callbacks por resultado")
+        linhas.append("# TYPE dashboard_cache_callbacks_total counter")
+        for nome, contadores in sorted(caches.items()):
+            for resultado in ("hits", "hits_disco", "misses", "descartes"):
+                linhas.append(
+                    f"dashboard_cache_callbacks_total{_rotulos(cache=nome, resultado=resultado)} {contadores[resultado]}"
+                )
+        linhas.append("# HELP dashboard_cache_callbacks_itens Entradas em memória nos caches de callbacks")
+        linhas.append("# TYPE dashboard_cache_callbacks_itens gauge")
+        for nome, contadores in sorted(caches.items()):
+            linhas.append(f"dashboard_cache_callbacks_itens{_rotulos(cache=nome)} {contadores['itens']}")
+
+    return "\n".join(linhas) + "\n"
@@ -6,16 +6,15 @@ Utiliza dados do Supabase para exibir atividades de funcionários
 import dash
 from dash import html, dcc, Input, Output, callback
 import dash_bootstrap_components as dbc
-import plotly.express as px
 
 from config import CONTENT_STYLE, CARD_STYLE, COLOR_TEXT_TITLE, COLOR_GRAPH_MAIN, COLOR_SEQUENCE
-from supabase_service import (
-    get_time_records, 
-    calculate_kpis, 
-    get_distribuicao_por_funcao,
-    get_distribuicao_por_funcionario
+from supabase_config import (
+    SUPABASE_AGREGACAO_RPC, ESPELHO_ATIVO, SUPABASE_CACHE_CONSULTA_MS, SUPABASE_CACHE_MAX_CONSULTAS
 )
+from metricas import medir_callback, etapa
 from components.cards import criar_kpi_card
+from components import graficos
+from components.filtros import opcoes_atividades, tabelas_atividades_prontas
 
 # Registrar a página
 dash.register_page(__name__, path='/atividades', name='Dashboard de Atividades')
@@ -66,6 +65,13 @@ layout = html.Div(
                     dcc.Graph(id="grafico-funcionario", style={"height": "400px"}, config={"displayModeBar": False})
                 ], style=CARD_STYLE), width=12, lg=6, className="mb-3")
         ]),
+
+        # Confere se funcionários/funções já chegaram do Supabase (desligado depois da carga)
+        dcc.Interval(
+            id="intervalo-opcoes-atividades",
+            interval=SUPABASE_CACHE_CONSULTA_MS,
+            max_intervals=SUPABASE_CACHE_MAX_CONSULTAS
+        ),
     ],
     style=CONTENT_STYLE
 )
@@ -75,6 +81,24 @@ layout = html.Div(
 # CALLBACKS
 # =====================================================================
 
+@callback(
+    [Output("filtro-funcionarios-atividades", "options"),
+     Output("filtro-funcoes-atividades", "options"),
+     Output("intervalo-opcoes-atividades", "disabled")],
+    Input("intervalo-opcoes-atividades", "n_intervals")  # dispara quando a página é montada
+)
+def carregar_opcoes_filtros(_):
+    """
+    Preenche os filtros da sidebar (já renderizados) com funcionários e funções do Supabase
+
+    Não espera a rede: devolve o que está no cache (vazio antes da primeira
+    carga) e continua conferindo até a carga em segundo plano terminar.
+    """
+    prontas = tabelas_atividades_prontas()
+    opcoes_funcionarios, opcoes_funcoes = opcoes_atividades()
+    return opcoes_funcionarios, opcoes_funcoes, prontas
+
+
 @callback(
     [Output("kpi-total-registros", "children"),
      Output("kpi-total-horas", "children"),
@@ -87,91 +111,92 @@ layout = html.Div(
      Input("filtro-periodo-atividades", "start_date"),
      Input("filtro-periodo-atividades", "end_date")]
 )
+@medir_callback("atividades")
 def update_dashboard_atividades(filtro_funcionarios, filtro_funcoes, data_inicio, data_fim):
     """Atualiza todos os KPIs e gráficos baseado nos filtros"""
     
-    # Buscar dados do Supabase com filtros aplicados
-    records = get_time_records(
-        filtro_funcionarios=filtro_funcionarios,
-        filtro_funcoes=filtro_funcoes,
-        data_inicio=data_inicio,
-        data_fim=data_fim
-    )
+    # Importados no primeiro uso da página (o cliente Supabase é pesado)
+    import espelho_atividades
+    from supabase_service import get_time_records_df, get_resumo_time_records, agregar_registros
+    
+    # Espelho local de time_records (sincronização incremental em fundo)
+    if ESPELHO_ATIVO:
+        espelho_atividades.iniciar_sincronizacao()
+    
+    # Totais do espelho local quando já sincronizado; senão busca no Supabase:
+    # agregados no banco (RPC) ou só as colunas necessárias, paginadas
+    if ESPELHO_ATIVO and espelho_atividades.disponivel():
+        buscar = espelho_atividades.get_resumo_time_records
+    elif SUPABASE_AGREGACAO_RPC:
+        buscar = get_resumo_time_records
+    else:
+        buscar = get_time_records_df
+    with etapa("consulta"):
+        records = buscar(
+            filtro_funcionarios=filtro_funcionarios,
+            filtro_funcoes=filtro_funcoes,
+            data_inicio=data_inicio,
+            data_fim=data_fim
+        )
     
-    # Calcular KPIs
-    kpis = calculate_kpis(records)
+    # KPIs e distribuições em uma única passada sobre os registros
+    with etapa("agregacao"):
+        resumo = agregar_registros(records)
     
     # Formatar valores dos KPIs
-    total_registros = kpis['total_registros']
-    total_horas = f"{kpis['total_horas']:.2f}h"
-    qtd_funcionarios = kpis['qtd_funcionarios']
-    qtd_funcoes = kpis['qtd_funcoes']
+    total_registros = resumo.total_registros
+    total_horas = f"{resumo.total_horas:.2f}h"
+    qtd_funcionarios = resumo.qtd_funcionarios
+    qtd_funcoes = resumo.qtd_funcoes
     
-    # Gráfico de Pizza - Distribuição por Função
-    df_funcao = get_distribuicao_por_funcao(records)
+    with etapa("figuras"):
+        # Gráfico de Pizza - Distribuição por Função
+        df_funcao = resumo.por_funcao
     
-    if not df_funcao.empty:
-        fig_funcao = px.pie(
-            df_funcao, 
-            values="total_horas", 
-            names="function_name",
-            hole=0.6, 
-            template="plotly_white",
-            color_discrete_sequence=COLOR_SEQUENCE
-        )
-        fig_funcao.update_traces(textposition='outside', textinfo='percent+label')
-        fig_funcao.update_layout(
-            margin=dict(l=20, r=20, t=20, b=20),
-            showlegend=True,
-            font={"color": COLOR_TEXT_TITLE},
-            legend=dict(orientation="v", yanchor="middle", y=0.5)
-        )
-    else:
-        # Gráfico vazio se não houver dados
-        fig_funcao = px.pie(
-            values=[1], 
-            names=["Sem dados"],
-            hole=0.6,
-            template="plotly_white"
-        )
-        fig_funcao.update_layout(
-            margin=dict(l=20, r=20, t=20, b=20),
-            showlegend=False,
-            font={"color": COLOR_TEXT_TITLE}
-        )
+        if not df_funcao.empty:
+            fig_funcao = graficos.rosca(
+                df_funcao["function_name"], df_funcao["total_horas"],
+                nome_rotulo="function_name", nome_valor="total_horas",
+                hole=0.6, cores=COLOR_SEQUENCE,
+                textposition='outside', textinfo='percent+label',
+                margem=dict(l=20, r=20, t=20, b=20),
+                showlegend=True,
+                font={"color": COLOR_TEXT_TITLE},
+                legenda=dict(orientation="v", yanchor="middle", y=0.5)
+            )
+        else:
+            # Gráfico vazio se não houver dados
+            fig_funcao = graficos.rosca(
+                ["Sem dados"], [1],
+                hole=0.6,
+                margem=dict(l=20, r=20, t=20, b=20),
+                showlegend=False,
+                font={"color": COLOR_TEXT_TITLE}
+            )
     
-    # Gráfico de Pizza - Distribuição por Funcionário
-    df_funcionario = get_distribuicao_por_funcionario(records)
+        # Gráfico de Pizza - Distribuição por Funcionário
+        df_funcionario = resumo.por_funcionario
     
-    if not df_funcionario.empty:
-        fig_funcionario = px.pie(
-            df_funcionario, 
-            values="total_horas", 
-            names="employee_name",
-            hole=0.6, 
-            template="plotly_white",
-            color_discrete_sequence=COLOR_SEQUENCE
-        )
-        fig_funcionario.update_traces(textposition='outside', textinfo='percent+label')
-        fig_funcionario.update_layout(
-            margin=dict(l=20, r=20, t=20, b=20),
-            showlegend=True,
-            font={"color": COLOR_TEXT_TITLE},
-            legend=dict(orientation="v", yanchor="middle", y=0.5)
-        )
-    else:
-        # Gráfico vazio se não houver dados
-        fig_funcionario = px.pie(
-            values=[1], 
-            names=["Sem dados"],
-            hole=0.6,
-            template="plotly_white"
-        )
-        fig_funcionario.update_layout(
-            margin=dict(l=20, r=20, t=20, b=20),
-            showlegend=False,
-            font={"color": COLOR_TEXT_TITLE}
-        )
+        if not df_funcionario.empty:
+            fig_funcionario = graficos.rosca(
+                df_funcionario["employee_name"], df_funcionario["total_horas"],
+                nome_rotulo="employee_name", nome_valor="total_horas",
+                hole=0.6, cores=COLOR_SEQUENCE,
+                textposition='outside', textinfo='percent+label',
+                margem=dict(l=20, r=20, t=20, b=20),
+                showlegend=True,
+                font={"color": COLOR_TEXT_TITLE},
+                legenda=dict(orientation="v", yanchor="middle", y=0.5)
+            )
+        else:
+            # Gráfico vazio se não houver dados
+            fig_funcionario = graficos.rosca(
+                ["Sem dados"], [1],
+                hole=0.6,
+                margem=dict(l=20, r=20, t=20, b=20),
+                showlegend=False,
+                font={"color": COLOR_TEXT_TITLE}
+            )
     
     return (total_registros, total_horas, qtd_funcionarios, qtd_funcoes, 
             fig_funcao, fig_funcionario)
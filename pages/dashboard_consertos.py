@@ -2,20 +2,70 @@
 Página: Dashboard de Performance de Consertos
 """
 
+import functools
+
 import dash
-from dash import html, dcc, Input, Output, callback, no_update
+from dash import html, dcc, Input, Output, State, callback, clientside_callback, ClientsideFunction, ctx
 import dash_bootstrap_components as dbc
-import plotly.express as px
-import plotly.graph_objects as go
+import pandas as pd
 
 from config import CONTENT_STYLE, CARD_STYLE, COLOR_TEXT_TITLE, COLOR_GRAPH_MAIN, COLOR_SEQUENCE
-from data import df
+from data import obter_dataset, contar_valores, contar_maiores, versao_atual
+from cache_callbacks import memoizar_callback, normalizar_argumento
+from metricas import medir_callback, etapa
 from components.cards import criar_kpi_card
+from components import graficos
+from components.tabelas import criar_tabela_paginada, pagina_tabela
 
 # Registrar a página
 dash.register_page(__name__, path='/', name='Performance de Consertos')
 
 
+# =====================================================================
+# FIGURAS BASE
+# =====================================================================
+
+# Template, eixos, margens e fontes vão uma vez com o layout; os callbacks
+# só preenchem os dados das séries (dash.Patch)
+FONTE = {"color": COLOR_TEXT_TITLE}
+
+FIGURA_EVOLUCAO = graficos.barras_agrupadas(
+    pd.DataFrame(columns=["Mes_nome", "Quantidade", "Ano"]),
+    x="Mes_nome", y="Quantidade", cor="Ano",
+    cores=COLOR_SEQUENCE, titulo_x="", titulo_y="Qtd",
+    margem=dict(l=20, r=20, t=30, b=20),
+    font=FONTE
+)
+
+FIGURA_MODELOS = graficos.barras_horizontais(
+    pd.DataFrame(columns=["Modelo", "Quantidade"]),
+    x="Quantidade", y="Modelo",
+    cor=COLOR_GRAPH_MAIN, titulo_x="", titulo_y="",
+    margem=dict(l=10, r=20, t=20, b=10),
+    font=FONTE,
+    height=450,
+    autosize=True,
+    bargap=0.2
+)
+
+FIGURA_CATEGORIAS = graficos.barras_horizontais(
+    pd.DataFrame(columns=["Categoria", "Quantidade"]),
+    x="Quantidade", y="Categoria",
+    cor=COLOR_GRAPH_MAIN, titulo_x="", titulo_y="",
+    margem=dict(l=20, r=20, t=20, b=20),
+    font=FONTE
+)
+
+FIGURA_TIPO = graficos.rosca(
+    [], [],
+    nome_rotulo="Tipo", nome_valor="Quantidade",
+    hole=0.6, cores=COLOR_SEQUENCE,
+    margem=dict(l=20, r=20, t=20, b=20),
+    showlegend=True,
+    font=FONTE
+)
+
+
 # =====================================================================
 # LAYOUT DA PÁGINA
 # =====================================================================
@@ -55,7 +105,7 @@ layout = html.Div(
         dbc.Row([
             dbc.Col(html.Div([
                     html.H5("Evolução de Consertos", className="mb-3", style={"color": COLOR_TEXT_TITLE}),
-                    dcc.Graph(id="grafico-principal", style={"height": "350px"}, config={"displayModeBar": False})
+                    dcc.Graph(id="grafico-principal", figure=FIGURA_EVOLUCAO, style={"height": "350px"}, config={"displayModeBar": False})
                 ], style=CARD_STYLE), width=12, className="mb-4")
         ]),
 
@@ -70,6 +120,7 @@ layout = html.Div(
                     html.Div(
                         dcc.Graph(
                             id="grafico-modelos",
+                            figure=FIGURA_MODELOS,
                             config={"displayModeBar": False},
                             style={"margin": "0"}
                         ),
@@ -91,12 +142,12 @@ layout = html.Div(
         dbc.Row([
             dbc.Col(html.Div([
                     html.H5("Top Categorias", className="mb-3", style={"color": COLOR_TEXT_TITLE}),
-                    dcc.Graph(id="grafico-categorias", style={"height": "350px"}, config={"displayModeBar": False})
+                    dcc.Graph(id="grafico-categorias", figure=FIGURA_CATEGORIAS, style={"height": "350px"}, config={"displayModeBar": False})
                 ], style=CARD_STYLE), width=12, lg=6, className="mb-3"),
             
             dbc.Col(html.Div([
                     html.H5("Distribuição por Tipo", className="mb-3", style={"color": COLOR_TEXT_TITLE}),
-                    dcc.Graph(id="grafico-tipo", style={"height": "350px"}, config={"displayModeBar": False})
+                    dcc.Graph(id="grafico-tipo", figure=FIGURA_TIPO, style={"height": "350px"}, config={"displayModeBar": False})
                 ], style=CARD_STYLE), width=12, lg=6, className="mb-3")
         ]),
 
@@ -104,7 +155,11 @@ layout = html.Div(
         dbc.Row([
             dbc.Col(html.Div([
                     html.H5("Tabela de Defeitos", className="mb-3", style={"color": COLOR_TEXT_TITLE}),
-                    html.Div(id="tabela-defeitos-container", style={"maxHeight": "400px", "overflowY": "auto"})
+                    html.P("Sem dados.", id="tabela-defeitos-vazia", className="text-muted", hidden=True),
+                    html.Div(
+                        criar_tabela_paginada("tabela-defeitos", [("Defeito", "text"), ("Quantidade", "numeric")]),
+                        id="tabela-defeitos-container", style={"maxHeight": "400px", "overflowY": "auto"}
+                    )
                 ], style=CARD_STYLE), width=12, className="mb-4")
         ])
     ],
@@ -116,16 +171,120 @@ layout = html.Div(
 # CALLBACKS
 # =====================================================================
 
-@callback(
+# Clique no gráfico de modelos preenche a busca (no navegador, assets/interface.js)
+clientside_callback(
+    ClientsideFunction(namespace="interface", function_name="selecionarModelo"),
     Output("filtro-busca", "value"),
     Input("grafico-modelos", "clickData"),
     prevent_initial_call=True
 )
-def selecionar_modelo_grafico(clickData):
-    """Atualiza o filtro de busca quando clicar no gráfico de modelos"""
-    if clickData:
-        return clickData['points'][0]['y']
-    return no_update
+
+
+@callback(
+    Output("filtro-categoria", "options"),
+    Input("filtro-ano", "value"),
+    Input("filtro-mes", "value"),
+    Input("filtro-garantia", "value"),
+    Input("filtro-tipo", "value"),
+    State("filtro-categoria", "value"),
+    prevent_initial_call=True
+)
+def atualizar_opcoes_categoria(filtro_ano, filtro_mes, filtro_garantia, filtro_tipo, selecionadas):
+    """Mostra só as categorias com consertos no período/garantia/tipo (catálogo de opções)"""
+    return obter_dataset().catalogo.validas(
+        "categoria", manter=selecionadas, ano=filtro_ano, meses=filtro_mes,
+        garantia=filtro_garantia, tipo=filtro_tipo
+    )
+
+
+# Modelos exibidos no ranking de incidência
+TOP_MODELOS = 50
+
+FILTROS = [
+    Input("filtro-busca", "value"),
+    Input("filtro-ano", "value"),
+    Input("filtro-mes", "value"),
+    Input("filtro-categoria", "value"),
+    Input("filtro-garantia", "value"),
+    Input("filtro-tipo", "value")
+]
+
+
+_dataset_em_cache = None
+
+
+def _chave_filtros(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo):
+    # O Dataset é lido uma vez e faz parte da chave: uma recarga no meio do
+    # callback não guarda linhas da versão nova sob a chave da antiga
+    global _dataset_em_cache
+    dataset = obter_dataset()
+    if dataset is not _dataset_em_cache:
+        # Versão nova: descarta as fatias da anterior (e a referência a ela)
+        for cache in (_linhas_filtradas, _ranking_modelos, _contagem_defeitos):
+            cache.cache_clear()
+        _dataset_em_cache = dataset
+    argumentos = (busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo)
+    return (dataset, *(normalizar_argumento(a) for a in argumentos))
+
+
+@functools.lru_cache(maxsize=8)
+def _linhas_filtradas(dataset, busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo):
+    indice = dataset.indice
+    filtros = dict(
+        busca=busca_modelo, categorias=filtro_categoria,
+        garantia=filtro_garantia, tipo=filtro_tipo
+    )
+    return indice.linhas(indice.mascara_base(**filtros), indice.mascara_periodo(filtro_ano, filtro_mes))
+
+
+@functools.lru_cache(maxsize=32)
+def _ranking_modelos(*chave):
+    return contar_maiores(_linhas_filtradas(*chave)["Descrição"], TOP_MODELOS)
+
+
+@functools.lru_cache(maxsize=32)
+def _contagem_defeitos(*chave):
+    df_defeitos = contar_valores(_linhas_filtradas(*chave)["Defeito"]).reset_index()
+    df_defeitos.columns = ["Defeito", "Quantidade"]
+    return df_defeitos
+
+
+def linhas_filtradas(*filtros):
+    """
+    Linhas que atendem aos filtros (máscaras pré-computadas)
+
+    Os callbacks da página disparam juntos com os mesmos filtros; a fatia é
+    calculada uma vez e reaproveitada por todos.
+
+    Returns:
+        pd.DataFrame: Fatia do DataFrame da versão atual
+    """
+    return _linhas_filtradas(*_chave_filtros(*filtros))
+
+
+def ranking_modelos(*filtros):
+    """
+    Modelos com mais consertos para os filtros (top TOP_MODELOS)
+
+    Calculado uma vez por combinação de filtros e usado pelo gráfico de
+    ranking e pelo KPI "Modelo Crítico".
+
+    Returns:
+        pd.Series: Quantidade por modelo, em ordem decrescente
+    """
+    return _ranking_modelos(*_chave_filtros(*filtros))
+
+
+def contagem_defeitos(*filtros):
+    """
+    Quantidade por defeito para os filtros (em cache por combinação de filtros)
+
+    Trocar de página, ordenar ou filtrar a tabela reaproveita a contagem.
+
+    Returns:
+        pd.DataFrame: Colunas Defeito e Quantidade, em ordem decrescente
+    """
+    return _contagem_defeitos(*_chave_filtros(*filtros))
 
 
 @callback(
@@ -138,53 +297,40 @@ def selecionar_modelo_grafico(clickData):
      Output("kpi-modelo", "children"),
      Output("kpi-reincidencia", "children"),
      Output("kpi-reincidencia-mom", "children"),
-     Output("kpi-reincidencia-yoy", "children"),
-     Output("grafico-principal", "figure"),
-     Output("grafico-modelos", "figure"),
-     Output("grafico-categorias", "figure"),
-     Output("grafico-tipo", "figure"),
-     Output("tabela-defeitos-container", "children")],
-    [Input("filtro-busca", "value"),
-     Input("filtro-ano", "value"),
-     Input("filtro-mes", "value"),
-     Input("filtro-categoria", "value"),
-     Input("filtro-garantia", "value"),
-     Input("filtro-tipo", "value")]
+     Output("kpi-reincidencia-yoy", "children")],
+    FILTROS
 )
-def update_dashboard(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo):
-    """Atualiza todos os gráficos e KPIs baseado nos filtros"""
-    
-    dff = df.copy()
+@medir_callback("consertos_kpis")
+@memoizar_callback("consertos_kpis", versao_atual)
+def atualizar_kpis(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo):
+    """Atualiza os KPIs e os indicadores MoM/YoY"""
     
-    # Aplicar Filtros
-    if busca_modelo:
-        dff = dff[dff["Descrição"].str.contains(busca_modelo, case=False, na=False)]
-    if filtro_ano != "all":
-        dff = dff[dff["Ano"] == filtro_ano]
-    if filtro_mes and len(filtro_mes) > 0:
-        dff = dff[dff["Mes"].isin(filtro_mes)]
-    if filtro_categoria and len(filtro_categoria) > 0:
-        dff = dff[dff["Categoria"].isin(filtro_categoria)]
-    if filtro_garantia != "all":
-        dff = dff[dff["Garantia"] == filtro_garantia]
-    if filtro_tipo != "all":
-        dff = dff[dff["Tipo"] == filtro_tipo]
-
-    # Calcular KPIs
-    total = len(dff)
-    media_diaria = f"{dff['Dias'].mean():.1f} dias" if not dff.empty and "Dias" in dff.columns else "0 dias"
-    media_diaria_valor = dff['Dias'].mean() if not dff.empty and "Dias" in dff.columns else 0
+    # Versão atual dos dados (pode ter sido recarregada desde o último callback)
+    cubo = obter_dataset().cubo
+    filtros = dict(
+        busca=busca_modelo, categorias=filtro_categoria,
+        garantia=filtro_garantia, tipo=filtro_tipo
+    )
+
+    # Calcular KPIs (cubo mensal pré-agregado; com busca por modelo usa as linhas brutas)
+    with etapa("kpis"):
+        kpis = cubo.kpis(filtro_ano, filtro_mes, **filtros)
+        total = kpis["total"]
+        media_diaria = f"{kpis['media_dias']:.1f} dias" if total else "0 dias"
+        media_diaria_valor = kpis["media_dias"]
     
+    with etapa("ranking"):
+        ranking = ranking_modelos(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo)
     top_modelo = "-"
-    if not dff.empty:
-        top_modelo = dff["Descrição"].value_counts().idxmax()
+    if not ranking.empty:
+        top_modelo = ranking.index[0]
         if len(top_modelo) > 25:
             top_modelo = top_modelo[:25] + "..."
         
     reincidencia_txt = "0%"
     perc_r = 0
-    if not dff.empty and "Reincidencia" in dff.columns:
-        perc_r = (dff[dff["Reincidencia"] == "Sim"].shape[0] / total) * 100
+    if total:
+        perc_r = kpis["perc_reincidencia"]
         reincidencia_txt = f"{perc_r:.1f}%"
     
     # ======== CALCULAR MÊS ANTERIOR (MoM) ========
@@ -192,217 +338,198 @@ def update_dashboard(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, fil
     mom_media = None
     mom_reincidencia = None
     
-    if filtro_mes and len(filtro_mes) == 1:
-        mes_atual = filtro_mes[0]
-        ano_atual = filtro_ano if filtro_ano != "all" else None
-        
-        # Calcular mês anterior
-        mes_anterior = mes_atual - 1 if mes_atual > 1 else 12
-        ano_anterior = ano_atual if mes_atual > 1 else (ano_atual - 1 if ano_atual else None)
-        
-        # Filtrar dados para mês anterior
-        dff_prev = df.copy()
-        if busca_modelo:
-            dff_prev = dff_prev[dff_prev["Descrição"].str.contains(busca_modelo, case=False, na=False)]
-        if filtro_categoria and len(filtro_categoria) > 0:
-            dff_prev = dff_prev[dff_prev["Categoria"].isin(filtro_categoria)]
-        if filtro_garantia != "all":
-            dff_prev = dff_prev[dff_prev["Garantia"] == filtro_garantia]
-        if filtro_tipo != "all":
-            dff_prev = dff_prev[dff_prev["Tipo"] == filtro_tipo]
+    with etapa("mom"):
+        if filtro_mes and len(filtro_mes) == 1:
+            mes_atual = filtro_mes[0]
+            ano_atual = filtro_ano if filtro_ano != "all" else None
         
-        # Aplicar filtro de ano e mês anterior
-        dff_prev = dff_prev[dff_prev["Mes"] == mes_anterior]
-        if ano_anterior:
-            dff_prev = dff_prev[dff_prev["Ano"] == ano_anterior]
+            # Calcular mês anterior
+            mes_anterior = mes_atual - 1 if mes_atual > 1 else 12
+            ano_anterior = ano_atual if mes_atual > 1 else (ano_atual - 1 if ano_atual else None)
         
-        # Calcular métricas do mês anterior
-        if not dff_prev.empty:
-            total_prev = len(dff_prev)
-            media_prev = dff_prev['Dias'].mean() if "Dias" in dff_prev.columns else 0
-            
-            perc_r_prev = 0
-            if "Reincidencia" in dff_prev.columns:
-                perc_r_prev = (dff_prev[dff_prev["Reincidencia"] == "Sim"].shape[0] / total_prev) * 100 if total_prev > 0 else 0
+            # Calcular métricas do mês anterior (mesmos filtros, troca apenas o período)
+            kpis_prev = cubo.kpis(ano_anterior, [mes_anterior], **filtros)
+            if kpis_prev["total"] > 0:
+                total_prev = kpis_prev["total"]
+                media_prev = kpis_prev["media_dias"]
+                perc_r_prev = kpis_prev["perc_reincidencia"]
             
-            # Criar indicadores MoM
-            def criar_mom_indicator(valor_atual, valor_prev, eh_percentual=False, inverter=False):
-                """Cria indicador MoM com ícone e cor"""
-                diff = valor_atual - valor_prev
-                is_increase = diff > 0
+                # Criar indicadores MoM
+                def criar_mom_indicator(valor_atual, valor_prev, eh_percentual=False, inverter=False):
+                    """Cria indicador MoM com ícone e cor"""
+                    diff = valor_atual - valor_prev
+                    is_increase = diff > 0
                 
-                # Para todas as métricas, diminuição é bom (verde)
-                if inverter:
-                    is_good = not is_increase
-                else:
-                    is_good = is_increase
+                    # Para todas as métricas, diminuição é bom (verde)
+                    if inverter:
+                        is_good = not is_increase
+                    else:
+                        is_good = is_increase
                 
-                icon = "▲" if is_increase else "▼"
-                color = "#28a745" if is_good else "#dc3545"
+                    icon = "▲" if is_increase else "▼"
+                    color = "#28a745" if is_good else "#dc3545"
                 
-                if eh_percentual:
-                    texto = f"{valor_prev:.1f}%"
-                elif isinstance(valor_prev, float):
-                    texto = f"{valor_prev:.1f}"
-                else:
-                    texto = str(int(valor_prev))
+                    if eh_percentual:
+                        texto = f"{valor_prev:.1f}%"
+                    elif isinstance(valor_prev, float):
+                        texto = f"{valor_prev:.1f}"
+                    else:
+                        texto = str(int(valor_prev))
                 
-                return html.Div([
-                    html.Div(icon, style={"color": color, "fontSize": "0.9rem", "fontWeight": "bold"}),
-                    html.Div(f"Mês ant.: {texto}", style={"color": "#6c757d", "fontSize": "0.7rem"})
-                ])
+                    return html.Div([
+                        html.Div(icon, style={"color": color, "fontSize": "0.9rem", "fontWeight": "bold"}),
+                        html.Div(f"Mês ant.: {texto}", style={"color": "#6c757d", "fontSize": "0.7rem"})
+                    ])
             
-            mom_total = criar_mom_indicator(total, total_prev, inverter=True)
-            mom_media = criar_mom_indicator(media_diaria_valor, media_prev, inverter=True)
-            mom_reincidencia = criar_mom_indicator(perc_r, perc_r_prev, eh_percentual=True, inverter=True)
+                mom_total = criar_mom_indicator(total, total_prev, inverter=True)
+                mom_media = criar_mom_indicator(media_diaria_valor, media_prev, inverter=True)
+                mom_reincidencia = criar_mom_indicator(perc_r, perc_r_prev, eh_percentual=True, inverter=True)
     
     # ======== CALCULAR ANO ANTERIOR (YoY) ========
     yoy_total = None
     yoy_media = None
     yoy_reincidencia = None
     
-    if filtro_ano and filtro_ano != "all":
-        ano_atual = filtro_ano
-        ano_anterior = ano_atual - 1
+    with etapa("yoy"):
+        if filtro_ano and filtro_ano != "all":
+            ano_atual = filtro_ano
+            ano_anterior = ano_atual - 1
         
-        # Filtrar dados para ano anterior
-        dff_yoy = df.copy()
-        if busca_modelo:
-            dff_yoy = dff_yoy[dff_yoy["Descrição"].str.contains(busca_modelo, case=False, na=False)]
-        if filtro_categoria and len(filtro_categoria) > 0:
-            dff_yoy = dff_yoy[dff_yoy["Categoria"].isin(filtro_categoria)]
-        if filtro_garantia != "all":
-            dff_yoy = dff_yoy[dff_yoy["Garantia"] == filtro_garantia]
-        if filtro_tipo != "all":
-            dff_yoy = dff_yoy[dff_yoy["Tipo"] == filtro_tipo]
-        
-        # Aplicar filtro de ano anterior
-        dff_yoy = dff_yoy[dff_yoy["Ano"] == ano_anterior]
-        
-        # Se tiver um mês específico selecionado, filtrar pelo mesmo mês
-        if filtro_mes and len(filtro_mes) == 1:
-            mes_atual = filtro_mes[0]
-            dff_yoy = dff_yoy[dff_yoy["Mes"] == mes_atual]
-        # Se não tiver mês selecionado ou múltiplos meses, pega o ano inteiro (sem filtro de mês)
-        
-        # Calcular métricas do ano anterior
-        if not dff_yoy.empty:
-            total_yoy = len(dff_yoy)
-            media_yoy = dff_yoy['Dias'].mean() if "Dias" in dff_yoy.columns else 0
-            
-            perc_r_yoy = 0
-            if "Reincidencia" in dff_yoy.columns:
-                perc_r_yoy = (dff_yoy[dff_yoy["Reincidencia"] == "Sim"].shape[0] / total_yoy) * 100 if total_yoy > 0 else 0
+            # Calcular métricas do ano anterior (mesmos filtros, troca apenas o período)
+            # Se tiver um mês específico selecionado, filtrar pelo mesmo mês;
+            # se não tiver mês selecionado ou múltiplos meses, pega o ano inteiro
+            meses_yoy = filtro_mes if filtro_mes and len(filtro_mes) == 1 else None
+            kpis_yoy = cubo.kpis(ano_anterior, meses_yoy, **filtros)
+            if kpis_yoy["total"] > 0:
+                total_yoy = kpis_yoy["total"]
+                media_yoy = kpis_yoy["media_dias"]
+                perc_r_yoy = kpis_yoy["perc_reincidencia"]
             
-            # Criar indicadores YoY
-            def criar_yoy_indicator(valor_atual, valor_prev, eh_percentual=False, inverter=False):
-                """Cria indicador YoY com ícone e cor"""
-                diff = valor_atual - valor_prev
-                is_increase = diff > 0
+                # Criar indicadores YoY
+                def criar_yoy_indicator(valor_atual, valor_prev, eh_percentual=False, inverter=False):
+                    """Cria indicador YoY com ícone e cor"""
+                    diff = valor_atual - valor_prev
+                    is_increase = diff > 0
                 
-                # Para todas as métricas, diminuição é bom (verde)
-                if inverter:
-                    is_good = not is_increase
-                else:
-                    is_good = is_increase
+                    # Para todas as métricas, diminuição é bom (verde)
+                    if inverter:
+                        is_good = not is_increase
+                    else:
+                        is_good = is_increase
                 
-                icon = "▲" if is_increase else "▼"
-                color = "#28a745" if is_good else "#dc3545"
+                    icon = "▲" if is_increase else "▼"
+                    color = "#28a745" if is_good else "#dc3545"
                 
-                if eh_percentual:
-                    texto = f"{valor_prev:.1f}%"
-                elif isinstance(valor_prev, float):
-                    texto = f"{valor_prev:.1f}"
-                else:
-                    texto = str(int(valor_prev))
+                    if eh_percentual:
+                        texto = f"{valor_prev:.1f}%"
+                    elif isinstance(valor_prev, float):
+                        texto = f"{valor_prev:.1f}"
+                    else:
+                        texto = str(int(valor_prev))
                 
-                return html.Div([
-                    html.Div(icon, style={"color": color, "fontSize": "0.9rem", "fontWeight": "bold"}),
-                    html.Div(f"Ano ant.: {texto}", style={"color": "#6c757d", "fontSize": "0.7rem"})
-                ])
+                    return html.Div([
+                        html.Div(icon, style={"color": color, "fontSize": "0.9rem", "fontWeight": "bold"}),
+                        html.Div(f"Ano ant.: {texto}", style={"color": "#6c757d", "fontSize": "0.7rem"})
+                    ])
             
-            yoy_total = criar_yoy_indicator(total, total_yoy, inverter=True)
-            yoy_media = criar_yoy_indicator(media_diaria_valor, media_yoy, inverter=True)
-            yoy_reincidencia = criar_yoy_indicator(perc_r, perc_r_yoy, eh_percentual=True, inverter=True)
-
-    # Gráfico Principal - Evolução
-    df_chart = dff.groupby(["Ano", "Mes", "Mes_nome"]).size().reset_index(name="Quantidade").sort_values(["Ano", "Mes"])
-    df_chart["Ano"] = df_chart["Ano"].astype(str)
-    fig_main = px.bar(
-        df_chart, x="Mes_nome", y="Quantidade", color="Ano",
-        barmode="group", text_auto=True, template="plotly_white",
-        color_discrete_sequence=COLOR_SEQUENCE
-    )
-    fig_main.update_layout(
-        xaxis={"title": ""}, yaxis={"title": "Qtd"},
-        margin=dict(l=20, r=20, t=30, b=20),
-        font={"color": COLOR_TEXT_TITLE}
-    )
+                yoy_total = criar_yoy_indicator(total, total_yoy, inverter=True)
+                yoy_media = criar_yoy_indicator(media_diaria_valor, media_yoy, inverter=True)
+                yoy_reincidencia = criar_yoy_indicator(perc_r, perc_r_yoy, eh_percentual=True, inverter=True)
 
-    # Gráfico de Modelos (com scroll)
-    df_modelos = dff["Descrição"].value_counts().head(50).reset_index()
+    return (total, mom_total or "", yoy_total or "",
+            media_diaria, mom_media or "", yoy_media or "",
+            top_modelo,
+            reincidencia_txt, mom_reincidencia or "", yoy_reincidencia or "")
+
+
+# Os gráficos já vêm montados no layout (FIGURA_*); os callbacks abaixo
+# devolvem dash.Patch só com os dados das séries
+
+@callback(Output("grafico-principal", "figure"), FILTROS)
+@medir_callback("consertos_evolucao")
+@memoizar_callback("consertos_evolucao", versao_atual)
+def atualizar_evolucao(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo):
+    """Gráfico Principal - Evolução (cubo mensal pré-agregado)"""
+    with etapa("agregacao"):
+        df_chart = obter_dataset().cubo.evolucao(
+            filtro_ano, filtro_mes, busca=busca_modelo, categorias=filtro_categoria,
+            garantia=filtro_garantia, tipo=filtro_tipo
+        )
+        df_chart["Ano"] = df_chart["Ano"].astype(str)
+    with etapa("figuras"):
+        return graficos.atualizar_barras_agrupadas(df_chart, x="Mes_nome", y="Quantidade", cor="Ano")
+
+
+@callback(Output("grafico-modelos", "figure"), FILTROS)
+@medir_callback("consertos_modelos")
+@memoizar_callback("consertos_modelos", versao_atual)
+def atualizar_modelos(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo):
+    """Gráfico de Modelos (Top TOP_MODELOS, com scroll)"""
+    with etapa("ranking"):
+        df_modelos = ranking_modelos(
+            busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo
+        ).reset_index()
     df_modelos.columns = ["Modelo", "Quantidade"]
     df_modelos = df_modelos.sort_values("Quantidade", ascending=True)
 
     altura_linha = 35
     altura_total = max(450, len(df_modelos) * altura_linha)
+    with etapa("figuras"):
+        return graficos.atualizar_barras_horizontais(df_modelos, x="Quantidade", y="Modelo", height=altura_total)
 
-    fig_modelos = px.bar(
-        df_modelos, x="Quantidade", y="Modelo", orientation='h',
-        text="Quantidade", template="plotly_white"
-    )
-    fig_modelos.update_traces(marker_color=COLOR_GRAPH_MAIN, textposition="outside")
-    fig_modelos.update_layout(
-        height=altura_total,
-        autosize=True,
-        yaxis={"title": ""}, xaxis={"title": ""},
-        margin=dict(l=10, r=20, t=20, b=10),
-        font={"color": COLOR_TEXT_TITLE},
-        bargap=0.2
-    )
 
-    # Gráfico de Categorias
-    df_cat = dff["Categoria"].value_counts().head(10).reset_index()
-    df_cat.columns = ["Categoria", "Quantidade"]
-    fig_cat = px.bar(
-        df_cat.sort_values("Quantidade", ascending=True),
-        x="Quantidade", y="Categoria", orientation="h",
-        text="Quantidade", template="plotly_white"
-    )
-    fig_cat.update_traces(marker_color=COLOR_GRAPH_MAIN, textposition="outside")
-    fig_cat.update_layout(
-        yaxis={"title": ""}, xaxis={"title": ""},
-        margin=dict(l=20, r=20, t=20, b=20),
-        font={"color": COLOR_TEXT_TITLE}
-    )
+@callback(
+    [Output("grafico-categorias", "figure"),
+     Output("grafico-tipo", "figure")],
+    FILTROS
+)
+@medir_callback("consertos_secundarios")
+@memoizar_callback("consertos_secundarios", versao_atual)
+def atualizar_secundarios(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo):
+    """Gráficos de Categorias (Top 10) e de Tipo (pizza)"""
+    with etapa("filtro"):
+        dff = linhas_filtradas(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo)
 
-    # Gráfico de Tipo (Pizza)
-    df_tipo_chart = dff["Tipo"].value_counts().reset_index()
-    df_tipo_chart.columns = ["Tipo", "Quantidade"]
-    fig_tipo = px.pie(
-        df_tipo_chart, values="Quantidade", names="Tipo",
-        hole=0.6, template="plotly_white",
-        color_discrete_sequence=COLOR_SEQUENCE
-    )
-    fig_tipo.update_layout(
-        margin=dict(l=20, r=20, t=20, b=20),
-        showlegend=True,
-        font={"color": COLOR_TEXT_TITLE}
-    )
+    with etapa("agregacao"):
+        df_cat = contar_maiores(dff["Categoria"], 10).reset_index()
+        df_cat.columns = ["Categoria", "Quantidade"]
+        df_tipo_chart = contar_valores(dff["Tipo"]).reset_index()
+        df_tipo_chart.columns = ["Tipo", "Quantidade"]
 
-    # Tabela de Defeitos
-    if not dff.empty:
-        df_defeitos = dff["Defeito"].value_counts().reset_index()
-        df_defeitos.columns = ["Defeito", "Quantidade"]
-        table = dbc.Table.from_dataframe(
-            df_defeitos, striped=True, bordered=True, hover=True,
-            style={"color": "#333"}
+    with etapa("figuras"):
+        fig_cat = graficos.atualizar_barras_horizontais(
+            df_cat.sort_values("Quantidade", ascending=True), x="Quantidade", y="Categoria"
         )
-    else:
-        table = html.P("Sem dados.", className="text-muted")
+        fig_tipo = graficos.atualizar_rosca(df_tipo_chart["Tipo"], df_tipo_chart["Quantidade"])
 
-    return (total, mom_total or "", yoy_total or "",
-            media_diaria, mom_media or "", yoy_media or "",
-            top_modelo,
-            reincidencia_txt, mom_reincidencia or "", yoy_reincidencia or "",
-            fig_main, fig_modelos, fig_cat, fig_tipo, table)
+    return fig_cat, fig_tipo
+
+
+@callback(
+    [Output("tabela-defeitos", "data"),
+     Output("tabela-defeitos", "page_count"),
+     Output("tabela-defeitos", "page_current"),
+     Output("tabela-defeitos-container", "hidden"),
+     Output("tabela-defeitos-vazia", "hidden")],
+    FILTROS + [
+        Input("tabela-defeitos", "page_current"),
+        Input("tabela-defeitos", "page_size"),
+        Input("tabela-defeitos", "sort_by"),
+        Input("tabela-defeitos", "filter_query")
+    ]
+)
+@medir_callback("consertos_tabela")
+def atualizar_tabela_defeitos(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo,
+                              page_current, page_size, sort_by, filter_query):
+    """Tabela de Defeitos: envia só a página visível ("Sem dados." quando os filtros não têm consertos)"""
+    # Qualquer mudança que não seja a troca de página volta para a primeira
+    if "tabela-defeitos.page_current" not in ctx.triggered_prop_ids:
+        page_current = 0
+
+    with etapa("agregacao"):
+        df_defeitos = contagem_defeitos(busca_modelo, filtro_ano, filtro_mes, filtro_categoria, filtro_garantia, filtro_tipo)
+    # O filtro da própria tabela não esconde a tabela (senão sumiria o campo do filtro)
+    vazia = df_defeitos.empty
+    with etapa("pagina"):
+        data, page_count, page_current = pagina_tabela(df_defeitos, page_current, page_size, sort_by, filter_query)
+    return data, page_count, page_current, vazia, not vazia
@@ -0,0 +1,132 @@
+"""
+Perfil da inicialização do dashboard (import de app.py num processo novo)
+
+Roda `import app` com `python -X importtime` e imprime um JSON com o tempo
+total, os módulos mais lentos (tempo próprio e acumulado), o tempo dos
+módulos do projeto, as fases da carga de dados (data.tempos_carga) e se o
+cliente Supabase foi importado. Sai com código 1 se o tempo total passar do
+orçamento (ORCAMENTO_INICIALIZACAO) ou se o Supabase for importado na
+inicialização; serve de verificação automática de regressão.
+
+Uso:
+    python perfil_inicializacao.py [--orcamento 5] [--modulos 15]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from config import ORCAMENTO_INICIALIZACAO
+
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+# Executado no processo filho: mede o import e coleta o estado depois dele
+CODIGO_FILHO = """
+import json, sys, time
+inicio = time.perf_counter()
+import app
+total = time.perf_counter() - inicio
+import data
+print(json.dumps({
+    "total_s": round(total, 3),
+    "fases_carga_s": data.tempos_carga(),
+    "supabase_importado": "supabase" in sys.modules,
+}))
+"""
+
+
+def _modulos_projeto():
+    """Nomes de primeiro nível dos módulos e pacotes do projeto"""
+    nomes = set()
+    for nome in os.listdir(PASTA_PROJETO):
+        if nome.endswith(".py"):
+            nomes.add(nome[:-3])
+        elif os.path.isfile(os.path.join(PASTA_PROJETO, nome, "__init__.py")):
+            nomes.add(nome)
+    return nomes
+
+
+def ler_importtime(saida):
+    """
+    Interpreta as linhas de `-X importtime`
+
+    Args:
+        saida (str): stderr do processo filho
+
+    Returns:
+        list: Dicionários com modulo, proprio_ms e acumulado_ms (na ordem de import)
+    """
+    modulos = []
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        if not proprio.strip().isdigit():  # cabeçalho
+            continue
+        modulos.append({
+            "modulo": nome.strip(),
+            "proprio_ms": int(proprio) / 1000,
+            "acumulado_ms": int(acumulado) / 1000,
+        })
+    return modulos
+
+
+def perfilar(quantidade_modulos=15, ambiente=None):
+    """
+    Importa app.py num processo novo e mede a inicialização
+
+    Args:
+        quantidade_modulos (int): Quantos módulos listar em mais_lentos
+        ambiente (dict): Variáveis de ambiente extras do processo filho
+            (ex.: DASHBOARD_PASTA_CACHE)
+
+    Returns:
+        dict: Relatório da inicialização
+    """
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CODIGO_FILHO],
+        cwd=PASTA_PROJETO, capture_output=True, text=True,
+        env={**os.environ, **(ambiente or {})}
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar app.py:\n{processo.stderr[-2000:]}")
+
+    # A última linha do stdout é o JSON (linhas anteriores são avisos do app)
+    relatorio = json.loads(processo.stdout.strip().splitlines()[-1])
+    modulos = ler_importtime(processo.stderr)
+    projeto = _modulos_projeto()
+
+    relatorio["mais_lentos"] = sorted(modulos, key=lambda m: m["proprio_ms"], reverse=True)[:quantidade_modulos]
+    relatorio["projeto"] = sorted(
+        (m for m in modulos if m["modulo"].split(".")[0] in projeto),
+        key=lambda m: m["acumulado_ms"], reverse=True
+    )
+    relatorio["modulos_importados"] = len(modulos)
+    return relatorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orcamento", type=float, default=ORCAMENTO_INICIALIZACAO,
+                        help="Segundos permitidos para importar app.py")
+    parser.add_argument("--modulos", type=int, default=15, help="Quantidade de módulos mais lentos")
+    args = parser.parse_args()
+
+    relatorio = perfilar(args.modulos)
+    relatorio["orcamento_s"] = args.orcamento
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+    falhas = []
+    if relatorio["total_s"] > args.orcamento:
+        falhas.append(f"inicialização levou {relatorio['total_s']:.2f}s (orçamento {args.orcamento:.2f}s)")
+    if relatorio["supabase_importado"]:
+        falhas.append("o cliente Supabase foi importado na inicialização")
+    for falha in falhas:
+        print(f"Erro: {falha}", file=sys.stderr)
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
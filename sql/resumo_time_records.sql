@@ -0,0 +1,35 @@
+-- Totais de time_records por funcionário/função, calculados no banco
+-- Usado por supabase_service.get_resumo_time_records (SUPABASE_AGREGACAO_RPC = True)
+-- Executar no SQL Editor do projeto Supabase
+
+create or replace function resumo_time_records(
+    funcionarios text[] default null,
+    funcoes text[] default null,
+    data_inicio timestamptz default null,
+    data_fim timestamptz default null
+)
+returns table (
+    employee_name text,
+    function_name text,
+    registros bigint,
+    duration_ms numeric
+)
+language sql
+stable
+as $$
+    select
+        t.employee_name,
+        t.function_name,
+        count(*) as registros,
+        sum(t.duration_ms) as duration_ms
+    from time_records t
+    where t.duration_ms > 0
+      and (funcionarios is null or t.employee_name = any(funcionarios))
+      and (funcoes is null or t.function_name = any(funcoes))
+      and (data_inicio is null or t.start_time >= data_inicio)
+      and (data_fim is null or t.start_time <= data_fim)
+    group by t.employee_name, t.function_name;
+$$;
+
+-- Índice para os filtros de período
+create index if not exists time_records_start_time_idx on time_records (start_time);
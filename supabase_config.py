@@ -3,6 +3,10 @@ Configuração do Supabase
 Insira suas credenciais do Supabase aqui
 """
 
+import os
+
+from config import PASTA_CACHE
+
 # =====================================================================
 # CREDENCIAIS SUPABASE
 # =====================================================================
@@ -14,3 +18,47 @@ SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJpc3MiOiJzdXBhYmFzZSIsInJ
 # Exemplo:
 # SUPABASE_URL = "https://xxxxxxxxxxx.supabase.co"
 # SUPABASE_KEY = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.ey..."
+
+# =====================================================================
+# CONEXÃO HTTP (cliente único por processo, com pool e keep-alive)
+# =====================================================================
+
+SUPABASE_POOL_CONEXOES = 10        # Conexões simultâneas por processo
+SUPABASE_POOL_KEEPALIVE = 5        # Conexões ociosas mantidas abertas
+SUPABASE_KEEPALIVE_EXPIRA = 60     # Segundos até fechar uma conexão ociosa
+SUPABASE_TIMEOUT_CONEXAO = 5       # Segundos para abrir a conexão (TCP + TLS)
+SUPABASE_TIMEOUT_LEITURA = 30      # Segundos para a resposta de uma consulta
+SUPABASE_MAX_THREADS = 8           # Requisições em paralelo (páginas, tabelas) por processo
+
+# =====================================================================
+# CACHE DAS TABELAS DE APOIO (employees, functions)
+# =====================================================================
+
+SUPABASE_CACHE_TTL = 300               # Segundos até a lista ser considerada velha
+SUPABASE_CACHE_INTERVALO_FALHA = 30    # Segundos entre novas tentativas após uma falha
+SUPABASE_CACHE_CONSULTA_MS = 1000     # Intervalo (ms) com que /atividades confere se a primeira carga terminou
+SUPABASE_CACHE_MAX_CONSULTAS = 30      # Desiste de conferir depois de tantas tentativas (ex.: Supabase fora do ar)
+
+# =====================================================================
+# CONSULTA DE time_records
+# =====================================================================
+
+# Linhas por página (o PostgREST do Supabase corta respostas em 1000 linhas por padrão)
+SUPABASE_TAMANHO_PAGINA = 1000
+
+# Limite de páginas quando o servidor não informa a contagem (proteção contra
+# servidores que ignoram o intervalo pedido e repetem sempre a mesma página)
+SUPABASE_MAX_PAGINAS = 10000
+
+# Agregar no banco pela função resumo_time_records (sql/resumo_time_records.sql):
+# só os totais por funcionário/função trafegam pela rede
+SUPABASE_AGREGACAO_RPC = False
+
+# =====================================================================
+# ESPELHO LOCAL (SQLite) DE time_records
+# =====================================================================
+
+ESPELHO_ATIVO = True                          # Página de Atividades consulta o espelho local
+ESPELHO_ARQUIVO = os.path.join(PASTA_CACHE, "atividades.sqlite")
+ESPELHO_INTERVALO_SYNC = 60                   # Segundos entre sincronizações incrementais
+ESPELHO_INTERVALO_COMPLETO = 6 * 3600         # Segundos entre ressincronizações completas (edições/exclusões)
@@ -3,8 +3,23 @@ Serviço de integração com Supabase
 Gerencia todas as operações de leitura/escrita no banco de dados
 """
 
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import httpx
+from postgrest.types import CountMethod
 from supabase import create_client, Client
-from supabase_config import SUPABASE_URL, SUPABASE_KEY
+from supabase.lib.client_options import SyncClientOptions
+from supabase_config import (
+    SUPABASE_URL, SUPABASE_KEY, SUPABASE_POOL_CONEXOES, SUPABASE_POOL_KEEPALIVE,
+    SUPABASE_KEEPALIVE_EXPIRA, SUPABASE_TIMEOUT_CONEXAO, SUPABASE_TIMEOUT_LEITURA,
+    SUPABASE_CACHE_TTL, SUPABASE_CACHE_INTERVALO_FALHA, SUPABASE_TAMANHO_PAGINA, SUPABASE_MAX_PAGINAS,
+    SUPABASE_MAX_THREADS
+)
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -13,25 +28,208 @@ from datetime import datetime
 # CONEXÃO
 # =====================================================================
 
+_cliente = None
+_lock_cliente = threading.Lock()
+
+
+def _criar_http_client():
+    """Cliente HTTP com pool de conexões persistentes (keep-alive) compartilhado pelas consultas"""
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=SUPABASE_POOL_CONEXOES,
+            max_keepalive_connections=SUPABASE_POOL_KEEPALIVE,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRA,
+        ),
+        timeout=httpx.Timeout(SUPABASE_TIMEOUT_LEITURA, connect=SUPABASE_TIMEOUT_CONEXAO),
+        follow_redirects=True,
+    )
+
+
 def get_supabase_client() -> Client:
     """
-    Retorna uma instância configurada do cliente Supabase
+    Retorna o cliente Supabase do processo
+    
+    O cliente é criado na primeira chamada e reutilizado depois, junto com o
+    pool de conexões HTTP: as consultas seguintes não repetem o handshake
+    TCP/TLS. É seguro entre threads.
     
     Returns:
         Client: Cliente Supabase configurado
     """
-    try:
-        supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-        return supabase
-    except Exception as e:
-        print(f"Erro ao conectar com Supabase: {e}")
-        return None
+    global _cliente
+    if _cliente is not None:
+        return _cliente
+    
+    with _lock_cliente:
+        if _cliente is None:
+            try:
+                opcoes = SyncClientOptions(httpx_client=_criar_http_client())
+                _cliente = create_client(SUPABASE_URL, SUPABASE_KEY, options=opcoes)
+            except Exception as e:
+                print(f"Erro ao conectar com Supabase: {e}")
+                return None
+        return _cliente
+
+
+def fechar_cliente():
+    """Fecha as conexões do pool; a próxima consulta cria um cliente novo"""
+    global _cliente
+    with _lock_cliente:
+        if _cliente is not None:
+            _cliente.options.httpx_client.close()
+        _cliente = None
+
+
+def _descartar_cliente_no_filho():
+    # Após um fork, os sockets do pool pertencem ao processo pai: o filho abre os próprios
+    global _cliente, _lock_cliente, _executor
+    _cliente = None
+    _lock_cliente = threading.Lock()
+    _executor = None
+    for cache in CACHES_TABELAS.values():
+        cache.reiniciar_apos_fork()
+    for chamada in CHAMADAS_UNICAS.values():
+        chamada.reiniciar_apos_fork()
+
+
+os.register_at_fork(after_in_child=_descartar_cliente_no_filho)
+
+
+# =====================================================================
+# CONCORRÊNCIA (pool de threads e coalescência de requisições)
+# =====================================================================
+
+_executor = None
+
+
+def executor():
+    """
+    Pool de threads para as requisições ao Supabase
+    
+    As threads só esperam a rede (o GIL é liberado durante o I/O), então
+    várias requisições do mesmo callback andam em paralelo. Só tarefas
+    "folha" (uma requisição HTTP) devem ser enviadas ao pool.
+    
+    Returns:
+        ThreadPoolExecutor: Pool compartilhado do processo
+    """
+    global _executor
+    if _executor is None:
+        with _lock_cliente:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SUPABASE_MAX_THREADS, thread_name_prefix="supabase")
+    return _executor
+
+
+class ChamadaUnica:
+    """
+    Coalescência de requisições ("single flight")
+    
+    Enquanto uma chamada com a mesma chave está em andamento, as chamadas
+    seguintes esperam por ela e recebem o mesmo resultado (ou a mesma exceção)
+    em vez de abrir outra requisição. O resultado é compartilhado: quem recebe
+    não deve alterá-lo.
+    """
+    
+    def __init__(self, nome):
+        self.nome = nome
+        self.executadas = 0
+        self.coalescidas = 0
+        self.reiniciar_apos_fork()
+    
+    def reiniciar_apos_fork(self):
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+    
+    def executar(self, chave, funcao):
+        """
+        Executa `funcao()` ou aguarda a execução idêntica já em andamento
+        
+        Args:
+            chave (hashable): Identifica a requisição (ex.: filtros normalizados)
+            funcao (callable): Faz a requisição
+        """
+        with self._lock:
+            futuro = self._em_andamento.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = self._em_andamento[chave] = Future()
+                self.executadas += 1
+            else:
+                self.coalescidas += 1
+        
+        if not lider:
+            return futuro.result()
+        
+        try:
+            resultado = funcao()
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+    
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "executadas": self.executadas,
+                "coalescidas": self.coalescidas,
+                "em_andamento": len(self._em_andamento),
+            }
+
+
+CHAMADAS_UNICAS = {}
+
+
+def coalescer(nome):
+    """
+    Decorador: chamadas simultâneas com os mesmos argumentos compartilham uma requisição
+    
+    Args:
+        nome (str): Nome exposto nas estatísticas
+    """
+    chamada = CHAMADAS_UNICAS.setdefault(nome, ChamadaUnica(nome))
+    
+    def decorador(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            chave = (tuple(_chave_argumento(a) for a in args),
+                     tuple(sorted((k, _chave_argumento(v)) for k, v in kwargs.items())))
+            return chamada.executar(chave, lambda: func(*args, **kwargs))
+        
+        return wrapper
+    
+    return decorador
+
+
+def _chave_argumento(valor):
+    # Listas de filtros: a ordem da seleção não muda a consulta
+    if isinstance(valor, (list, tuple)):
+        return tuple(sorted(valor, key=repr))
+    return valor
+
+
+def estatisticas_concorrencia():
+    """Requisições executadas e coalescidas por função"""
+    return {nome: chamada.estatisticas() for nome, chamada in CHAMADAS_UNICAS.items()}
 
 
 # =====================================================================
 # FUNÇÕES DE LEITURA
 # =====================================================================
 
+def _buscar_tabela(tabela):
+    """Busca todas as linhas de uma tabela (propaga erros de rede/API)"""
+    supabase = get_supabase_client()
+    if supabase is None:
+        raise ConnectionError("Cliente Supabase indisponível")
+    return supabase.table(tabela).select('*').execute().data
+
+
 def get_employees():
     """
     Busca todos os funcionários da tabela employees
@@ -40,9 +238,7 @@ def get_employees():
         list: Lista de dicionários com dados dos funcionários
     """
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('employees').select('*').execute()
-        return response.data
+        return _buscar_tabela('employees')
     except Exception as e:
         print(f"Erro ao buscar funcionários: {e}")
         return []
@@ -56,14 +252,112 @@ def get_functions():
         list: Lista de dicionários com dados das funções
     """
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('functions').select('*').execute()
-        return response.data
+        return _buscar_tabela('functions')
     except Exception as e:
         print(f"Erro ao buscar funções: {e}")
         return []
 
 
+# Colunas usadas pelo dashboard de Atividades
+COLUNAS_TIME_RECORDS = ["employee_name", "function_name", "start_time", "duration_ms"]
+
+
+def _filtrar_time_records(query, filtro_funcionarios=None, filtro_funcoes=None, data_inicio=None, data_fim=None):
+    """Aplica os filtros do dashboard a uma consulta de time_records"""
+    if filtro_funcionarios and len(filtro_funcionarios) > 0:
+        query = query.in_('employee_name', filtro_funcionarios)
+    
+    if filtro_funcoes and len(filtro_funcoes) > 0:
+        query = query.in_('function_name', filtro_funcoes)
+    
+    if data_inicio:
+        query = query.gte('start_time', data_inicio)
+    
+    if data_fim:
+        # Adicionar 1 dia para incluir registros do último dia
+        query = query.lte('start_time', data_fim + 'T23:59:59')
+    
+    return query
+
+
+def _consulta_time_records(supabase, colunas, apos_id=None, ids=None, contar=False, **filtros):
+    query = supabase.table('time_records').select(colunas, count=CountMethod.exact if contar else None)
+    query = _filtrar_time_records(query, **filtros)
+    if apos_id is not None:
+        query = query.gt('id', apos_id)
+    if ids is not None:
+        query = query.in_('id', ids)
+    return query.order('id')
+
+
+def iterar_paginas_time_records(colunas='*', tamanho_pagina=SUPABASE_TAMANHO_PAGINA, apos_id=None, ids=None,
+                                **filtros):
+    """
+    Percorre time_records em páginas (offset/limit), sem depender do limite do PostgREST
+    
+    A primeira página pede a contagem exata de linhas; as demais são pedidas
+    em paralelo no pool de threads e entregues em ordem. Sem contagem, as
+    páginas são pedidas uma a uma até vir uma incompleta, repetida (mesmo
+    primeiro id) ou até SUPABASE_MAX_PAGINAS. O tamanho da página
+    segue o que o servidor devolveu na primeira (se ele limitar abaixo do
+    pedido). As páginas são ordenadas por id para que a paginação seja estável.
+    
+    Args:
+        colunas (str): Colunas do select (ex.: 'employee_name,duration_ms')
+        tamanho_pagina (int): Linhas por requisição
+        apos_id (int): Só registros com id maior (sincronização incremental)
+        ids (list): Só os registros com esses ids
+        **filtros: filtro_funcionarios, filtro_funcoes, data_inicio, data_fim
+        
+    Yields:
+        list: Linhas de uma página (lista de dicionários)
+    """
+    supabase = get_supabase_client()
+    if supabase is None:
+        raise ConnectionError("Cliente Supabase indisponível")
+    
+    def pagina(inicio, tamanho, contar=False):
+        consulta = _consulta_time_records(supabase, colunas, apos_id, ids, contar, **filtros)
+        return consulta.range(inicio, inicio + tamanho - 1).execute()
+    
+    primeira = pagina(0, tamanho_pagina, contar=True)
+    if primeira.data:
+        yield primeira.data
+    
+    passo = len(primeira.data)
+    total = primeira.count
+    if not passo or (total is not None and total <= passo):
+        return
+    
+    if total is None:
+        # Servidor sem contagem: segue página a página até vir uma incompleta.
+        # Se o servidor ignorar o intervalo pedido, a página seguinte começa no
+        # mesmo id da anterior; o limite de páginas cobre o caso sem id
+        inicio = passo
+        primeiro_id = primeira.data[0].get("id")
+        for _ in range(SUPABASE_MAX_PAGINAS - 1):
+            dados = pagina(inicio, passo).data
+            if not dados or (primeiro_id is not None and dados[0].get("id") == primeiro_id):
+                return
+            yield dados
+            if len(dados) < passo:
+                return
+            primeiro_id = dados[0].get("id")
+            inicio += len(dados)
+        print(f"Erro ao paginar time_records: limite de {SUPABASE_MAX_PAGINAS} páginas atingido")
+        return
+    
+    futuros = [executor().submit(pagina, inicio, passo) for inicio in range(passo, total, passo)]
+    try:
+        for futuro in futuros:
+            dados = futuro.result().data
+            if dados:
+                yield dados
+    finally:
+        for futuro in futuros:
+            futuro.cancel()
+
+
 def get_time_records(filtro_funcionarios=None, filtro_funcoes=None, data_inicio=None, data_fim=None):
     """
     Busca registros de tempo da tabela time_records com filtros opcionais
@@ -77,118 +371,370 @@ def get_time_records(filtro_funcionarios=None, filtro_funcoes=None, data_inicio=
     Returns:
         list: Lista de dicionários com registros de tempo
     """
+    try:
+        records = []
+        for pagina in iterar_paginas_time_records(
+            filtro_funcionarios=filtro_funcionarios, filtro_funcoes=filtro_funcoes,
+            data_inicio=data_inicio, data_fim=data_fim
+        ):
+            records.extend(pagina)
+        return records
+    except Exception as e:
+        print(f"Erro ao buscar registros de tempo: {e}")
+        return []
+
+
+@coalescer("time_records")
+def get_time_records_df(filtro_funcionarios=None, filtro_funcoes=None, data_inicio=None, data_fim=None):
+    """
+    Busca só as colunas usadas pelo dashboard, página a página, em formato colunar
+    
+    Cada página é descarregada direto em listas por coluna (sem acumular a
+    lista de dicionários inteira) e o DataFrame é montado uma única vez no final.
+    
+    Args:
+        filtro_funcionarios (list): Lista de nomes de funcionários para filtrar
+        filtro_funcoes (list): Lista de nomes de funções para filtrar
+        data_inicio (str): Data inicial no formato 'YYYY-MM-DD'
+        data_fim (str): Data final no formato 'YYYY-MM-DD'
+        
+    Returns:
+        pd.DataFrame: Colunas employee_name, function_name, start_time e duration_ms
+    """
+    colunas = {col: [] for col in COLUNAS_TIME_RECORDS}
+    try:
+        for pagina in iterar_paginas_time_records(
+            ",".join(COLUNAS_TIME_RECORDS),
+            filtro_funcionarios=filtro_funcionarios, filtro_funcoes=filtro_funcoes,
+            data_inicio=data_inicio, data_fim=data_fim
+        ):
+            for col, valores in colunas.items():
+                valores.extend(linha.get(col) for linha in pagina)
+    except Exception as e:
+        print(f"Erro ao buscar registros de tempo: {e}")
+        colunas = {col: [] for col in COLUNAS_TIME_RECORDS}
+    
+    return pd.DataFrame({
+        "employee_name": pd.Series(colunas["employee_name"], dtype="str"),
+        "function_name": pd.Series(colunas["function_name"], dtype="str"),
+        "start_time": pd.to_datetime(pd.Series(colunas["start_time"], dtype="str"), format="ISO8601",
+                                     utc=True, errors="coerce"),
+        "duration_ms": pd.Series(colunas["duration_ms"], dtype="float64"),
+    })
+
+
+@coalescer("resumo_time_records")
+def get_resumo_time_records(filtro_funcionarios=None, filtro_funcoes=None, data_inicio=None, data_fim=None):
+    """
+    Totais por funcionário/função calculados no banco (função resumo_time_records)
+    
+    Só os agregados trafegam pela rede. Requer a função SQL de
+    sql/resumo_time_records.sql criada no projeto Supabase.
+    
+    Returns:
+        pd.DataFrame: Colunas employee_name, function_name, registros e duration_ms (soma)
+    """
     try:
         supabase = get_supabase_client()
-        query = supabase.table('time_records').select('*')
+        response = supabase.rpc('resumo_time_records', {
+            "funcionarios": filtro_funcionarios or None,
+            "funcoes": filtro_funcoes or None,
+            "data_inicio": data_inicio or None,
+            "data_fim": data_fim + 'T23:59:59' if data_fim else None,
+        }).execute()
+        resumo = pd.DataFrame(response.data, columns=["employee_name", "function_name", "registros", "duration_ms"])
+        resumo["duration_ms"] = pd.to_numeric(resumo["duration_ms"])
+        return resumo
+    except Exception as e:
+        print(f"Erro ao buscar resumo de registros de tempo: {e}")
+        return pd.DataFrame(columns=["employee_name", "function_name", "registros", "duration_ms"])
+
+
+# =====================================================================
+# CACHE DAS TABELAS DE APOIO (stale-while-revalidate)
+# =====================================================================
+
+class CacheTabela:
+    """
+    Cache de uma tabela pequena que muda pouco (employees, functions)
+    
+    obter() não espera a rede: devolve a última lista carregada e, se ela
+    passou do TTL, dispara a atualização em uma thread de fundo. Se a
+    atualização falhar, a lista anterior continua sendo servida e a próxima
+    tentativa só acontece depois de SUPABASE_CACHE_INTERVALO_FALHA segundos.
+    A exceção é a primeira carga do processo, que pode ser aguardada por
+    alguns segundos (argumento `espera`).
+    """
+    
+    def __init__(self, tabela, ttl=SUPABASE_CACHE_TTL, intervalo_falha=SUPABASE_CACHE_INTERVALO_FALHA):
+        self.tabela = tabela
+        self.ttl = ttl
+        self.intervalo_falha = intervalo_falha
+        self.reiniciar_apos_fork()
+        self._valor = None
+        self._atualizado_em = None
+        self.atualizacoes = 0
+        self.falhas = 0
+        self.falhas_seguidas = 0
+        self.ultimo_erro = None
+    
+    def reiniciar_apos_fork(self):
+        # A thread de atualização não sobrevive ao fork: libera o estado "atualizando"
+        self._lock = threading.Lock()
+        self._atualizando = False
+        self._proxima_tentativa = 0
+        self._tentativa_concluida = threading.Event()
+    
+    def obter(self, espera=0):
+        """
+        Retorna a lista em cache, disparando a atualização em fundo se necessário
         
-        # Aplicar filtros se fornecidos
-        if filtro_funcionarios and len(filtro_funcionarios) > 0:
-            query = query.in_('employee_name', filtro_funcionarios)
+        Args:
+            espera (float): Segundos que a primeira carga pode ser aguardada
+                (ignorado quando já existe uma lista em cache)
         
-        if filtro_funcoes and len(filtro_funcoes) > 0:
-            query = query.in_('function_name', filtro_funcoes)
+        Returns:
+            list: Linhas da tabela ([] enquanto a primeira carga não terminar)
+        """
+        agora = time.time()
+        with self._lock:
+            velho = self._atualizado_em is None or agora - self._atualizado_em >= self.ttl
+            if velho and not self._atualizando and agora >= self._proxima_tentativa:
+                self._atualizando = True
+                self._tentativa_concluida.clear()
+                threading.Thread(target=self._atualizar, name=f"cache-{self.tabela}", daemon=True).start()
+            if self._valor is not None or not espera or not self._atualizando:
+                return self._valor if self._valor is not None else []
+            tentativa = self._tentativa_concluida
         
-        if data_inicio:
-            query = query.gte('start_time', data_inicio)
+        tentativa.wait(espera)
+        with self._lock:
+            return self._valor if self._valor is not None else []
+    
+    def _atualizar(self):
+        try:
+            valor = _buscar_tabela(self.tabela)
+        except Exception as e:
+            print(f"Erro ao atualizar cache de {self.tabela}: {e}")
+            with self._lock:
+                self.falhas += 1
+                self.falhas_seguidas += 1
+                self.ultimo_erro = str(e)
+                self._proxima_tentativa = time.time() + self.intervalo_falha
+                self._atualizando = False
+                self._tentativa_concluida.set()
+            return
         
-        if data_fim:
-            # Adicionar 1 dia para incluir registros do último dia
-            query = query.lte('start_time', data_fim + 'T23:59:59')
+        with self._lock:
+            self._valor = valor
+            self._atualizado_em = time.time()
+            self.atualizacoes += 1
+            self.falhas_seguidas = 0
+            self._atualizando = False
+            self._tentativa_concluida.set()
+    
+    def carregada(self):
+        """Indica se a primeira carga da tabela já terminou com sucesso"""
+        with self._lock:
+            return self._atualizado_em is not None
+    
+    def estatisticas(self):
+        """
+        Idade da lista em cache e contadores de atualização
         
-        response = query.execute()
-        return response.data
-    except Exception as e:
-        print(f"Erro ao buscar registros de tempo: {e}")
-        return []
+        Returns:
+            dict: idade_segundos (None se nunca carregou), itens, atualizações e falhas
+        """
+        with self._lock:
+            return {
+                "idade_segundos": round(time.time() - self._atualizado_em, 1) if self._atualizado_em else None,
+                "itens": len(self._valor) if self._valor is not None else 0,
+                "atualizacoes": self.atualizacoes,
+                "falhas": self.falhas,
+                "falhas_seguidas": self.falhas_seguidas,
+                "ultimo_erro": self.ultimo_erro,
+                "atualizando": self._atualizando,
+            }
 
 
-# =====================================================================
-# FUNÇÕES DE CÁLCULO
-# =====================================================================
+CACHES_TABELAS = {
+    "employees": CacheTabela("employees"),
+    "functions": CacheTabela("functions"),
+}
 
-def calculate_kpis(records):
+
+def get_employees_cached(espera=0):
     """
-    Calcula os KPIs baseados nos registros de tempo
+    Funcionários para os filtros, servidos do cache (não bloqueia na rede)
     
     Args:
-        records (list): Lista de registros de tempo
-        
+        espera (float): Segundos que a primeira carga do processo pode ser aguardada
+    
     Returns:
-        dict: Dicionário com os KPIs calculados
+        list: Lista de dicionários com dados dos funcionários
     """
-    if not records or len(records) == 0:
-        return {
-            'total_registros': 0,
-            'total_horas': 0,
-            'qtd_funcionarios': 0,
-            'qtd_funcoes': 0
-        }
+    return CACHES_TABELAS["employees"].obter(espera)
+
+
+def get_functions_cached(espera=0):
+    """
+    Funções para os filtros, servidas do cache (não bloqueia na rede)
     
-    # Converter para DataFrame para facilitar cálculos
-    df = pd.DataFrame(records)
+    Args:
+        espera (float): Segundos que a primeira carga do processo pode ser aguardada
     
-    # Filtrar apenas registros com duration_ms válido (não nulo e maior que 0)
-    if 'duration_ms' in df.columns:
-        df = df[df['duration_ms'].notna()]  # Remove valores nulos
-        df = df[df['duration_ms'] > 0]  # Remove valores negativos ou zero
+    Returns:
+        list: Lista de dicionários com dados das funções
+    """
+    return CACHES_TABELAS["functions"].obter(espera)
+
+
+def aquecer_cache_tabelas():
+    """Dispara a primeira carga das tabelas de apoio em segundo plano"""
+    for cache in CACHES_TABELAS.values():
+        cache.obter()
+
+
+def tabelas_carregadas():
+    """Indica se employees e functions já foram carregadas (sem disparar nem esperar a rede)"""
+    return all(cache.carregada() for cache in CACHES_TABELAS.values())
+
+
+def estatisticas_cache_tabelas():
+    """Idade e falhas de atualização de cada tabela em cache"""
+    return {nome: cache.estatisticas() for nome, cache in CACHES_TABELAS.items()}
+
+
+# =====================================================================
+# FUNÇÕES DE CÁLCULO
+# =====================================================================
+
+MS_POR_HORA = 1000 * 60 * 60
+
+
+def _coluna(records, nome, dtype=None):
+    """Extrai uma coluna de uma lista de dicionários ou de um DataFrame como array NumPy"""
+    if isinstance(records, pd.DataFrame):
+        if nome not in records.columns:
+            return None
+        valores = records[nome]
+        return valores.to_numpy(dtype=dtype, na_value=np.nan) if dtype else valores.to_numpy(dtype=object)
+    if not records or nome not in records[0]:
+        return None
+    valores = [linha.get(nome) for linha in records]
+    if dtype:
+        return np.array([np.nan if v is None else v for v in valores], dtype=dtype)
+    return np.array(valores, dtype=object)
+
+
+def _somar_por_grupo(nomes, duracao_ms, coluna):
+    """Horas por valor de `coluna` (bincount sobre os códigos), do maior para o menor"""
+    codigos, rotulos = pd.factorize(nomes)
+    validos = codigos >= 0
+    soma_ms = np.bincount(codigos[validos], weights=duracao_ms[validos], minlength=len(rotulos))
     
-    # Total de registros (após filtragem)
-    total_registros = len(df)
+    # Mesma ordem do groupby + sort_values usados antes: por nome e depois por horas
+    grupos = pd.DataFrame({coluna: rotulos, "total_horas": soma_ms / MS_POR_HORA})
+    grupos = grupos.sort_values(coluna).reset_index(drop=True)
+    return grupos.sort_values("total_horas", ascending=False)
+
+
+class ResumoAtividades:
+    """
+    KPIs e distribuições dos registros de tempo, calculados em uma única passada
     
-    # Total de horas (converter duration_ms para horas)
-    # duration_ms / (1000 * 60 * 60) = horas
-    if total_registros > 0:
-        total_horas = df['duration_ms'].sum() / (1000 * 60 * 60)
-    else:
-        total_horas = 0
+    Os registros são convertidos uma vez para arrays (duração, funcionário,
+    função); o filtro de duração válida, os totais, as contagens distintas e
+    as duas somas por grupo saem dos mesmos arrays.
     
-    # Quantidade de funcionários únicos
-    qtd_funcionarios = df['employee_name'].nunique() if total_registros > 0 else 0
+    Aceita a lista de dicionários do Supabase, o DataFrame colunar de
+    get_time_records_df ou o resumo agregado (coluna 'registros' com a
+    contagem de cada linha).
+    """
     
-    # Quantidade de funções únicas
-    qtd_funcoes = df['function_name'].nunique() if total_registros > 0 else 0
+    def __init__(self, records):
+        self.total_registros = 0
+        self.total_horas = 0
+        self.qtd_funcionarios = 0
+        self.qtd_funcoes = 0
+        self.por_funcao = pd.DataFrame(columns=['function_name', 'total_horas'])
+        self.por_funcionario = pd.DataFrame(columns=['employee_name', 'total_horas'])
+        
+        if records is None or len(records) == 0:
+            return
+        
+        duracao = _coluna(records, 'duration_ms', "float64")
+        if duracao is None:
+            return
+        
+        # Apenas registros com duration_ms válido (não nulo e maior que 0)
+        validos = duracao > 0
+        duracao = duracao[validos]
+        if not len(duracao):
+            return
+        
+        pesos = _coluna(records, 'registros', "float64")
+        funcionarios = _coluna(records, 'employee_name')[validos]
+        funcoes = _coluna(records, 'function_name')[validos]
+        
+        self.total_registros = int(pesos[validos].sum()) if pesos is not None else len(duracao)
+        self.total_horas = round(duracao.sum() / MS_POR_HORA, 2)
+        self.por_funcionario = _somar_por_grupo(funcionarios, duracao, 'employee_name')
+        self.por_funcao = _somar_por_grupo(funcoes, duracao, 'function_name')
+        self.qtd_funcionarios = len(self.por_funcionario)
+        self.qtd_funcoes = len(self.por_funcao)
     
-    return {
-        'total_registros': total_registros,
-        'total_horas': round(total_horas, 2),
-        'qtd_funcionarios': qtd_funcionarios,
-        'qtd_funcoes': qtd_funcoes
-    }
+    def kpis(self):
+        """
+        Returns:
+            dict: total_registros, total_horas, qtd_funcionarios e qtd_funcoes
+        """
+        return {
+            'total_registros': self.total_registros,
+            'total_horas': self.total_horas,
+            'qtd_funcionarios': self.qtd_funcionarios,
+            'qtd_funcoes': self.qtd_funcoes
+        }
 
 
+def agregar_registros(records):
+    """
+    Calcula KPIs e distribuições de uma vez
+    
+    Args:
+        records (list | pd.DataFrame): Registros de tempo, DataFrame colunar
+            ou resumo agregado (com a coluna 'registros')
+        
+    Returns:
+        ResumoAtividades: Totais, contagens distintas e horas por função/funcionário
+    """
+    return ResumoAtividades(records)
+
+
+def calculate_kpis(records):
+    """
+    Calcula os KPIs baseados nos registros de tempo
+    
+    Args:
+        records (list | pd.DataFrame): Registros de tempo (ou resumo agregado)
+        
+    Returns:
+        dict: Dicionário com os KPIs calculados
+    """
+    return agregar_registros(records).kpis()
+
 
 def get_distribuicao_por_funcao(records):
     """
     Calcula a distribuição de horas por função
     
     Args:
-        records (list): Lista de registros de tempo
+        records (list | pd.DataFrame): Registros de tempo (ou resumo agregado)
         
     Returns:
         pd.DataFrame: DataFrame com colunas 'function_name' e 'total_horas'
     """
-    if not records or len(records) == 0:
-        return pd.DataFrame(columns=['function_name', 'total_horas'])
-    
-    df = pd.DataFrame(records)
-    
-    # Filtrar apenas registros com duration_ms válido
-    if 'duration_ms' in df.columns:
-        df = df[df['duration_ms'].notna()]
-        df = df[df['duration_ms'] > 0]
-    
-    if df.empty:
-        return pd.DataFrame(columns=['function_name', 'total_horas'])
-    
-    # Converter duration_ms para horas
-    df['horas'] = df['duration_ms'] / (1000 * 60 * 60)
-    
-    # Agrupar por função
-    df_grouped = df.groupby('function_name')['horas'].sum().reset_index()
-    df_grouped.columns = ['function_name', 'total_horas']
-    df_grouped = df_grouped.sort_values('total_horas', ascending=False)
-    
-    return df_grouped
+    return agregar_registros(records).por_funcao
 
 
 def get_distribuicao_por_funcionario(records):
@@ -196,30 +742,9 @@ def get_distribuicao_por_funcionario(records):
     Calcula a distribuição de horas por funcionário
     
     Args:
-        records (list): Lista de registros de tempo
+        records (list | pd.DataFrame): Registros de tempo (ou resumo agregado)
         
     Returns:
         pd.DataFrame: DataFrame com colunas 'employee_name' e 'total_horas'
     """
-    if not records or len(records) == 0:
-        return pd.DataFrame(columns=['employee_name', 'total_horas'])
-    
-    df = pd.DataFrame(records)
-    
-    # Filtrar apenas registros com duration_ms válido
-    if 'duration_ms' in df.columns:
-        df = df[df['duration_ms'].notna()]
-        df = df[df['duration_ms'] > 0]
-    
-    if df.empty:
-        return pd.DataFrame(columns=['employee_name', 'total_horas'])
-    
-    # Converter duration_ms para horas
-    df['horas'] = df['duration_ms'] / (1000 * 60 * 60)
-    
-    # Agrupar por funcionário
-    df_grouped = df.groupby('employee_name')['horas'].sum().reset_index()
-    df_grouped.columns = ['employee_name', 'total_horas']
-    df_grouped = df_grouped.sort_values('total_horas', ascending=False)
-    
-    return df_grouped
+    return agregar_registros(records).por_funcionario
@@ -0,0 +1,53 @@
+"""
+Testes da limpeza das versões antigas no cache de callbacks em disco
+"""
+
+import os
+import time
+
+import cache_callbacks
+from cache_callbacks import CacheLRU
+
+
+def test_versao_antiga_e_descartada(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_callbacks, "PASTA_CACHE", str(tmp_path))
+    cache = CacheLRU("teste", disco=True)
+
+    cache.guardar(("a",), "versao-1", "{}")
+    time.sleep(0.01)
+    cache.guardar(("a",), "versao-2", "{}")
+    assert not os.path.exists(cache._caminho_disco(("a",), "versao-1"))
+    assert os.path.isfile(cache._caminho_disco(("a",), "versao-2"))
+
+
+def test_worker_atrasado_nao_apaga_versao_nova(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_callbacks, "PASTA_CACHE", str(tmp_path))
+    atrasado = CacheLRU("teste", disco=True)
+    novo = CacheLRU("teste", disco=True)
+
+    atrasado.guardar(("a",), "versao-1", "{}")
+    time.sleep(0.01)
+    novo.guardar(("a",), "versao-2", "{}")
+
+    # Worker que só agora chega à versão 1 (já substituída) não apaga a 2
+    atrasado._versao = None
+    atrasado.guardar(("b",), "versao-1", "{}")
+    assert novo.obter(("a",), "versao-2") == "{}"
+    novo.limpar()
+    assert novo.obter(("a",), "versao-2") == "{}"
+
+
+def test_saida_nao_e_guardada_se_a_versao_mudou_no_calculo(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_callbacks, "PASTA_CACHE", str(tmp_path))
+    dados = {"versao": "versao-1"}
+
+    @cache_callbacks.memoizar_callback("teste_recarga", lambda: dados["versao"], disco=False)
+    def calcular(filtro):
+        # Recarga no meio do cálculo: o resultado já é da versão 2
+        dados["versao"] = "versao-2"
+        return "resultado-2"
+
+    assert calcular("x") == "resultado-2"
+    assert calcular.cache.estatisticas()["itens"] == 0
+    calcular("x")
+    assert calcular.cache.estatisticas()["itens"] == 1
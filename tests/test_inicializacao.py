@@ -0,0 +1,22 @@
+"""
+Inicialização: importar app.py num processo novo (perfil_inicializacao.py)
+
+O orçamento de tempo fica no próprio perfil_inicializacao.py (depende da
+máquina); aqui só o que é determinístico.
+"""
+
+import os
+
+from perfil_inicializacao import perfilar
+
+
+def test_inicializacao_nao_importa_supabase(tmp_path):
+    relatorio = perfilar(quantidade_modulos=5, ambiente={"DASHBOARD_PASTA_CACHE": str(tmp_path)})
+    assert relatorio["supabase_importado"] is False, "o cliente Supabase foi importado na inicialização"
+    assert any(m["modulo"] == "app" for m in relatorio["projeto"])
+
+
+def test_cache_da_inicializacao_fica_na_pasta_configurada(tmp_path):
+    pasta = tmp_path / "cache"
+    perfilar(quantidade_modulos=5, ambiente={"DASHBOARD_PASTA_CACHE": str(pasta)})
+    assert os.listdir(pasta), "a carga dos dados não gravou o cache na pasta configurada"
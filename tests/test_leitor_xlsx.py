@@ -0,0 +1,21 @@
+"""
+Testes do leitor de .xlsx em fluxo
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from leitor_xlsx import ORIGEM_1900, _coluna_datas
+
+
+def test_coluna_datas_com_vazios_e_textos_sem_aviso():
+    valores = [45658, None, "05/01/2025", 45658.5, "inválida"]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        datas = _coluna_datas(valores, ORIGEM_1900, "%d/%m/%Y")
+    esperado = pd.Series(np.array(
+        ["2025-01-01", "NaT", "2025-01-05", "2025-01-01T12:00:00", "NaT"], dtype="datetime64[us]"
+    ))
+    pd.testing.assert_series_equal(datas, esperado)
@@ -0,0 +1,43 @@
+"""
+Testes do filtro/ordenação/paginação das tabelas paginadas no servidor
+"""
+
+import pandas as pd
+
+from components.tabelas import interpretar_filtro, pagina_tabela
+
+DEFEITOS = pd.DataFrame({
+    "Defeito": ["Gatilho 1", "Mola 12", "Cano", "gatilho 2"],
+    "Quantidade": [10, 5, 3, 1],
+})
+
+
+def test_interpretar_filtro_mantem_texto_sem_aspas():
+    condicoes = interpretar_filtro('{Defeito} icontains 1 && {Quantidade} >= 5 && {Defeito} s= "Cano"')
+    assert condicoes == [
+        ("Defeito", "contains", "1", False),
+        ("Quantidade", "ge", "5", False),
+        ("Defeito", "eq", "Cano", True),
+    ]
+
+
+def test_contains_numerico_em_coluna_de_texto():
+    registros, paginas, pagina = pagina_tabela(DEFEITOS, 0, 10, None, "{Defeito} icontains 1")
+    assert [r["Defeito"] for r in registros] == ["Gatilho 1", "Mola 12"]
+    assert (paginas, pagina) == (1, 0)
+
+
+def test_comparacao_numerica_e_texto_sem_maiusculas():
+    registros, _, _ = pagina_tabela(DEFEITOS, 0, 10, None, "{Quantidade} > 3")
+    assert [r["Quantidade"] for r in registros] == [10, 5]
+
+    registros, _, _ = pagina_tabela(DEFEITOS, 0, 10, None, "{Defeito} = cano")
+    assert [r["Defeito"] for r in registros] == ["Cano"]
+
+
+def test_ordenacao_e_paginacao():
+    ordem = [{"column_id": "Quantidade", "direction": "asc"}]
+    registros, paginas, pagina = pagina_tabela(DEFEITOS, 5, 3, ordem)
+    # Página além do fim cai na última
+    assert (paginas, pagina) == (2, 1)
+    assert [r["Quantidade"] for r in registros] == [10]